@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分析器压测脚本
+
+使用本地LLM替身（不访问网络）在不同并发数和批量大小下运行ArxivAnalyzer，
+对比吞吐量和延迟，用于调优分析流程参数。
+"""
+
+import os
+import sys
+import logging
+from typing import Any, Dict, List
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from arxiv_tracker.analyzer import ArxivAnalyzer
+from arxiv_tracker.utils.config import load_config
+
+# 设置日志
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+def make_papers(count: int) -> List[Dict[str, Any]]:
+    """生成合成论文数据
+
+    Args:
+        count: 论文数量
+
+    Returns:
+        论文列表
+    """
+    return [
+        {
+            'arxiv_id': f"9999.{i:05d}",
+            'title': f"Synthetic Benchmark Paper {i}",
+            'authors': ['Alice Example', 'Bob Example'],
+            'abstract': "We study a synthetic problem. " * 30
+        }
+        for i in range(count)
+    ]
+
+def run_benchmark(count: int, concurrency: int, batch_size: int, stub: Dict[str, Any]) -> Dict[str, Any]:
+    """在给定参数下运行一次分析
+
+    Args:
+        count: 论文数量
+        concurrency: 最大在途请求数
+        batch_size: 每个请求的论文数
+        stub: 替身参数
+
+    Returns:
+        运行统计信息
+    """
+    config = load_config()
+    config.update({
+        'llm_backend': 'stub',
+        'llm_stub': stub,
+        'llm_cache_enabled': False,
+        'analysis_rpm': 0,
+        'analysis_tpm': 0,
+        'analysis_concurrency': concurrency,
+        'analysis_batch_size': batch_size
+    })
+
+    analyzer = ArxivAnalyzer(config)
+    papers = analyzer.analyze(make_papers(count))
+
+    stats = dict(analyzer.run_stats)
+    stats['analyzed'] = sum(1 for paper in papers if 'score' in paper)
+    stats['retries'] = analyzer.get_metrics()['retries']
+    return stats
+
+def main():
+    """主函数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="使用本地LLM替身压测分析器")
+    parser.add_argument('--papers', type=int, default=100, help="论文数量")
+    parser.add_argument('--concurrency', type=str, default="1,4,8,16", help="并发数列表，逗号分隔")
+    parser.add_argument('--batch-sizes', type=str, default="1,4", help="批量大小列表，逗号分隔")
+    parser.add_argument('--first-token-latency', type=float, default=0.5, help="首token延迟中位数（秒）")
+    parser.add_argument('--per-token-latency', type=float, default=0.002, help="每个输出token的耗时（秒）")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="500错误概率")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="429限流概率")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+
+    args = parser.parse_args()
+
+    stub = {
+        'first_token_latency': args.first_token_latency,
+        'per_token_latency': args.per_token_latency,
+        'error_rate': args.error_rate,
+        'throttle_rate': args.throttle_rate,
+        'seed': args.seed
+    }
+
+    print(f"{'并发':>6} {'批量':>6} {'请求数':>8} {'成功':>6} {'重试':>6} {'耗时(s)':>9} {'篇/分钟':>9} {'p50':>7} {'p90':>7} {'p99':>7}")
+    for batch_size in [int(x) for x in args.batch_sizes.split(',')]:
+        for concurrency in [int(x) for x in args.concurrency.split(',')]:
+            stats = run_benchmark(args.papers, concurrency, batch_size, stub)
+            print(
+                f"{concurrency:>6} {batch_size:>6} {stats['requests']:>8} {stats['analyzed']:>6} "
+                f"{stats['retries']:>6} {stats['elapsed']:>9.2f} {stats['papers_per_minute']:>9.1f} "
+                f"{stats['p50']:>7.2f} {stats['p90']:>7.2f} {stats['p99']:>7.2f}"
+            )
+
+if __name__ == "__main__":
+    main()
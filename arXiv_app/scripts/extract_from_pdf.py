@@ -6,14 +6,16 @@ PDF信息提取脚本
 
 import os
 import sys
+import json
 import logging
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterator, Set
 
 # 添加src目录到路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from arxiv_tracker.extractor import ArxivExtractor
+from arxiv_tracker.extractor import ArxivExtractor, _read_pdf_pages
 from arxiv_tracker.utils.config import load_config
+from arxiv_tracker.utils.sandbox import SandboxedPool, STATUS_OK
 
 # 设置日志
 logging.basicConfig(
@@ -22,118 +24,252 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 工作进程内复用的提取器实例
+_extractor = None
+
+def _get_extractor() -> ArxivExtractor:
+    global _extractor
+    if _extractor is None:
+        _extractor = ArxivExtractor(load_config())
+    return _extractor
+
+def _extract_metadata(pdf_path: str) -> Dict[str, Any]:
+    """读取PDF前5页并提取标题、作者和摘要（可在工作进程中执行）
+
+    Args:
+        pdf_path: PDF文件路径
+
+    Returns:
+        提取的字段，无法提取文本时为空字典
+    """
+    text = "".join(_read_pdf_pages(pdf_path, 5))
+    if not text:
+        return {}
+
+    extractor = _get_extractor()
+    metadata = {}
+
+    title = extractor._extract_title(text)
+    if title:
+        metadata['title'] = title
+
+    authors = extractor._extract_authors(text)
+    if authors:
+        metadata['authors'] = authors
+
+    abstract = extractor._extract_abstract(text)
+    if abstract:
+        metadata['abstract'] = abstract
+
+    return metadata
+
 def extract_from_pdf(pdf_path: str) -> Dict[str, Any]:
     """从单个PDF文件提取信息
-    
+
     Args:
         pdf_path: PDF文件路径
-    
+
     Returns:
         提取的信息
     """
     logger.info(f"开始从PDF文件提取信息: {pdf_path}")
-    
-    # 加载配置
-    config = load_config()
-    
-    # 创建提取器
-    extractor = ArxivExtractor(config)
-    
+
     # 构建论文对象
     arxiv_id = os.path.basename(pdf_path).replace('.pdf', '')
     paper = {
         'arxiv_id': arxiv_id,
         'pdf_path': pdf_path
     }
-    
+
     try:
-        # 从PDF文件中提取文本
-        import PyPDF2
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            # 读取前5页
-            for page_num in range(min(5, len(reader.pages))):
-                page = reader.pages[page_num]
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text
-        
-        if not text:
+        metadata = _extract_metadata(pdf_path)
+        if not metadata:
             logger.warning("无法从PDF文件中提取文本")
             return paper
-        
-        # 提取信息
-        title = extractor._extract_title(text)
-        authors = extractor._extract_authors(text)
-        abstract = extractor._extract_abstract(text)
-        
-        # 更新论文信息
-        if title:
-            paper['title'] = title
-            logger.info(f"成功提取标题: {title[:50]}...")
-        
-        if authors:
-            paper['authors'] = authors
-            logger.info(f"成功提取作者: {authors[:2]}...")
-        
-        if abstract:
-            paper['abstract'] = abstract
-            logger.info(f"成功提取摘要: {abstract[:100]}...")
-        
+
+        paper.update(metadata)
+
+        if 'title' in metadata:
+            logger.info(f"成功提取标题: {metadata['title'][:50]}...")
+
+        if 'authors' in metadata:
+            logger.info(f"成功提取作者: {metadata['authors'][:2]}...")
+
+        if 'abstract' in metadata:
+            logger.info(f"成功提取摘要: {metadata['abstract'][:100]}...")
+
     except Exception as e:
         logger.error(f"从PDF文件中提取信息失败: {e}")
         import traceback
         logger.error(traceback.format_exc())
-    
+
     return paper
 
-def batch_extract(pdf_dir: str) -> List[Dict[str, Any]]:
-    """批量从PDF文件提取信息
-    
+def iter_pdf_files(root: str) -> Iterator[str]:
+    """递归遍历目录树中的PDF文件
+
     Args:
-        pdf_dir: PDF文件目录
-    
+        root: 根目录
+
+    Yields:
+        PDF文件路径
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        # 保证遍历顺序稳定，便于断点续传
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith('.pdf'):
+                yield os.path.join(dirpath, filename)
+
+def load_completed(output_path: str) -> Set[str]:
+    """读取已有输出文件中处理过的PDF路径
+
+    进程中断时最后一行可能不完整，该行会被截断，之后从该文件继续追加。
+
+    Args:
+        output_path: JSONL输出文件路径
+
     Returns:
-        提取的信息列表
+        已处理的PDF路径集合
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    valid_size = 0
+    with open(output_path, 'rb') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if not line.endswith(b'\n'):
+                break
+            completed.add(record.get('pdf_path'))
+            valid_size += len(line)
+
+    if valid_size < os.path.getsize(output_path):
+        logger.warning(f"输出文件末尾不完整，截断到 {valid_size} 字节")
+        with open(output_path, 'r+b') as f:
+            f.truncate(valid_size)
+
+    return completed
+
+def batch_extract(pdf_dir: str, output_path: str, workers: int = None,
+                  timeout: float = None, resume: bool = False) -> int:
+    """批量从PDF文件提取信息，并将结果以JSONL格式流式写入
+
+    Args:
+        pdf_dir: PDF文件目录（递归遍历）
+        output_path: JSONL输出文件路径
+        workers: 工作进程数量
+        timeout: 单个PDF的超时时间（秒）
+        resume: 是否跳过输出文件中已有的PDF
+
+    Returns:
+        本次处理的PDF文件数量
     """
     logger.info(f"开始批量从PDF文件提取信息: {pdf_dir}")
-    
-    results = []
-    
-    if os.path.exists(pdf_dir):
-        for filename in os.listdir(pdf_dir):
-            if filename.endswith('.pdf'):
-                pdf_path = os.path.join(pdf_dir, filename)
-                result = extract_from_pdf(pdf_path)
-                results.append(result)
-    else:
+
+    if not os.path.isdir(pdf_dir):
         logger.error(f"PDF目录不存在: {pdf_dir}")
-    
-    logger.info(f"批量提取完成，处理了 {len(results)} 个PDF文件")
-    return results
+        return 0
+
+    config = load_config()
+    completed = load_completed(output_path) if resume else set()
+    if completed:
+        logger.info(f"断点续传，跳过已处理的 {len(completed)} 个PDF文件")
+
+    tasks = (
+        (pdf_path, (pdf_path,))
+        for pdf_path in iter_pdf_files(pdf_dir)
+        if pdf_path not in completed
+    )
+
+    pool = SandboxedPool(
+        _extract_metadata,
+        max_workers=workers or config.get('extract_workers', config.get('max_workers', 4)),
+        timeout=timeout or config.get('extract_timeout', 120),
+        max_rss_mb=config.get('extract_max_rss_mb', 1024)
+    )
+
+    processed = 0
+    failed = 0
+
+    # 行缓冲写入，每完成一个文件立即落盘
+    with pool, open(output_path, 'a' if resume else 'w', encoding='utf-8', buffering=1) as out:
+        for pdf_path, status, result in pool.imap(tasks):
+            record = {
+                'arxiv_id': os.path.splitext(os.path.basename(pdf_path))[0],
+                'pdf_path': pdf_path,
+                'status': status
+            }
+            if status == STATUS_OK:
+                record.update(result)
+            else:
+                record['error'] = result
+                failed += 1
+
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            processed += 1
+
+            if processed % 1000 == 0:
+                logger.info(f"已处理 {processed} 个PDF文件，失败 {failed} 个")
+
+    logger.info(f"批量提取完成，处理了 {processed} 个PDF文件，失败 {failed} 个")
+    return processed
 
 def main():
     """主函数"""
     import argparse
-    
+
     parser = argparse.ArgumentParser(description="从PDF文件提取信息")
     parser.add_argument(
         'path',
         type=str,
         help="PDF文件路径或目录"
     )
-    
+    parser.add_argument(
+        '-o', '--output',
+        type=str,
+        default='extract_results.jsonl',
+        help="批量模式的JSONL输出文件"
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help="批量模式的工作进程数量"
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=None,
+        help="单个PDF的超时时间（秒）"
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        default=False,
+        help="跳过输出文件中已处理的PDF，继续追加"
+    )
+
     args = parser.parse_args()
-    
+
     if os.path.isfile(args.path) and args.path.endswith('.pdf'):
         # 处理单个文件
         result = extract_from_pdf(args.path)
         logger.info(f"提取结果: {result}")
     elif os.path.isdir(args.path):
         # 处理目录
-        results = batch_extract(args.path)
-        logger.info(f"共提取 {len(results)} 个PDF文件")
+        count = batch_extract(
+            args.path,
+            args.output,
+            workers=args.workers,
+            timeout=args.timeout,
+            resume=args.resume
+        )
+        logger.info(f"共提取 {count} 个PDF文件，结果已写入: {args.output}")
     else:
         logger.error("无效的路径，请提供PDF文件或目录")
 
@@ -13,6 +13,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from arxiv_tracker.utils.state_manager import get_state_manager
 from arxiv_tracker.utils.cache_manager import get_cache_manager
+from arxiv_tracker.utils.quarantine import get_quarantine_list
+from arxiv_tracker.utils.stage_journal import get_stage_journal, STAGES
 
 # 设置日志
 logging.basicConfig(
@@ -35,6 +37,16 @@ def reset_all_states():
     cache_manager.clear()
     logger.info("系统缓存已清空")
     
+    # 清空PDF隔离列表
+    quarantine = get_quarantine_list()
+    quarantine.clear()
+    logger.info("PDF隔离列表已清空")
+    
+    # 清空论文处理阶段日志
+    with get_stage_journal() as journal:
+        journal.reset()
+    logger.info("阶段日志已清空")
+    
     # 清理日志文件
     log_dir = os.path.join(
         os.path.dirname(__file__),
@@ -57,19 +69,36 @@ def reset_all_states():
     
     logger.info("所有状态已重置完成")
 
-def reset_specific_step(step):
+def reset_specific_step(step, date=None):
     """重置指定步骤
     
+    阶段日志中该阶段及其之后的阶段都会被重置，下次使用--resume运行时重新处理。
+    
     Args:
         step: 步骤名称
+        date: 运行日期 (YYYYMMDD)，默认重置所有日期
     """
     logger.info(f"开始重置步骤: {step}")
     
     state_manager = get_state_manager()
     state_manager.reset_step(step)
     
+    if step in STAGES:
+        with get_stage_journal() as journal:
+            journal.reset_stage(step, run=date)
+    
     logger.info(f"步骤 {step} 已重置")
 
+def reset_run(date):
+    """清空指定日期的阶段日志
+    
+    Args:
+        date: 运行日期 (YYYYMMDD)
+    """
+    with get_stage_journal() as journal:
+        journal.reset(run=date)
+    logger.info(f"{date} 的阶段日志已清空")
+
 def main():
     """主函数"""
     import argparse
@@ -79,13 +108,21 @@ def main():
         '--step',
         type=str,
         default=None,
-        help="指定要重置的步骤"
+        help=f"指定要重置的步骤（阶段日志中的步骤: {', '.join(STAGES)}）"
+    )
+    parser.add_argument(
+        '--date',
+        type=str,
+        default=None,
+        help="只重置指定日期 (YYYYMMDD) 的阶段日志"
     )
     
     args = parser.parse_args()
     
     if args.step:
-        reset_specific_step(args.step)
+        reset_specific_step(args.step, args.date)
+    elif args.date:
+        reset_run(args.date)
     else:
         reset_all_states()
 
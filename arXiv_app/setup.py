@@ -16,9 +16,14 @@ setup(
         "psutil>=5.9.6",
         "dashscope>=1.17.0",
         "PyPDF2>=3.0.1",
-        "markdown>=3.4.4"
+        "markdown>=3.4.4",
+        "numpy>=1.21.0"
     ],
     extras_require={
+        "fast": [
+            "msgpack>=1.0.5",
+            "orjson>=3.9.0"
+        ],
         "dev": [
             "pytest>=7.4.0",
             "black>=23.11.0",
@@ -4,6 +4,8 @@ from .crawler import ArxivCrawler
 from .downloader import ArxivDownloader
 from .extractor import ArxivExtractor
 from .analyzer import ArxivAnalyzer
+from .ranker import ArxivRanker
+from .clusterer import ArxivClusterer
 from .reporter import ArxivReporter
 from .cli import main
 
@@ -13,6 +15,8 @@ __all__ = [
     "ArxivDownloader",
     "ArxivExtractor",
     "ArxivAnalyzer",
+    "ArxivRanker",
+    "ArxivClusterer",
     "ArxivReporter",
     "main"
 ]
@@ -35,6 +39,8 @@ class ArxivTracker:
         self.crawler = ArxivCrawler(self.config)
         self.downloader = ArxivDownloader(self.config)
         self.extractor = ArxivExtractor(self.config)
+        self.ranker = ArxivRanker(self.config)
+        self.clusterer = ArxivClusterer(self.config)
         self.analyzer = ArxivAnalyzer(self.config)
         self.reporter = ArxivReporter(self.config)
     
@@ -70,12 +76,14 @@ class ArxivTracker:
             
             # 4. 分析论文
             logger.info("开始分析论文")
-            papers = self.analyzer.analyze(papers)
+            selected = self.ranker.select(papers)
+            self.analyzer.analyze(self.clusterer.select(selected))
+            self.clusterer.propagate(selected)
             logger.info("论文分析完成")
             
             # 5. 生成报告
             logger.info("开始生成报告")
-            self.reporter.generate(papers, date=date)
+            self.reporter.generate(papers, date=date, usage=self.analyzer.get_usage())
             logger.info("报告生成完成")
             
             return papers
@@ -5,10 +5,37 @@ arXiv论文分析模块
 """
 
 import os
+import re
 import json
+import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import List, Dict
-from dashscope import Generation
+
+from .llm_client import ANALYSIS_FIELDS, create_llm_client
+from .utils.rate_limiter import RateLimiter
+from .utils.llm_cache import LLMResponseCache
+from .utils.json_stream import IncrementalJSONParser
+from .utils.llm_metrics import (
+    LLMUsageRecorder, percentile, CACHE_HIT, CACHE_MISS, CACHE_DISABLED,
+    STATUS_OK, STATUS_FAILED, STATUS_REJECTED
+)
+from .utils.retry import RetryPolicy, CircuitBreaker, TransientError, PermanentError, ResponseParseError
+
+CJK_PATTERN = re.compile(r'[\u3000-\u9fff\uff00-\uffef]')
+
+
+def _estimate_tokens(text):
+    """粗略估计文本的token数：中文字符按1个token计，其余按4个字符1个token计"""
+    cjk = len(CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+# 单篇分析结果必须包含的字段，流式模式下全部到达后即可结束读取
+REQUIRED_FIELDS = frozenset(ANALYSIS_FIELDS + ('score',))
+
 
 class ArxivAnalyzer:
     """arXiv论文分析器"""
@@ -33,37 +60,343 @@ class ArxivAnalyzer:
                 api_config = json.load(f)
                 self.api_key = api_config.get('dashscope_api_key')
         
-        if not self.api_key:
+        self.client = create_llm_client(self.config, self.api_key)
+        if not self.client.available:
             self.logger.warning("未配置API密钥，分析功能将不可用")
+        
+        # 后端支持时使用流式输出，所需字段到齐后提前结束
+        self.streaming = self.config.get('llm_streaming', True) and self.client.supports_streaming
+        
+        self.model = self.config.get('analysis_model', 'qwen-plus')
+        self.generation_params = {
+            'temperature': 0.3,
+            'top_p': 0.8,
+            'max_tokens': self.config.get('analysis_max_tokens', 2000)
+        }
+        
+        # 分层分析：先用低成本模型给出简短评分，只有达到阈值的论文才进行完整分析
+        self.screening_enabled = self.config.get('screening_enabled', False)
+        self.screening_model = self.config.get('screening_model', 'qwen-turbo')
+        self.screening_threshold = self.config.get('screening_threshold', 6.0)
+        self.screening_params = dict(
+            self.generation_params,
+            max_tokens=self.config.get('screening_max_tokens', 32)
+        )
+        
+        # 响应缓存，相同模型、提示词和采样参数的请求直接返回缓存结果
+        self.response_cache = None
+        if self.config.get('llm_cache_enabled', True):
+            self.response_cache = LLMResponseCache(
+                os.path.join(
+                    os.path.dirname(__file__),
+                    '..',
+                    self.config.get('cache_storage', 'data/cache'),
+                    'llm'
+                ),
+                ttl=self.config.get('llm_cache_ttl', 30 * 86400),
+                max_bytes=self.config.get('llm_cache_max_mb', 512) * 1024 * 1024
+            )
+        
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=self.config.get('analysis_rpm', 60),
+            tokens_per_minute=self.config.get('analysis_tpm', 0)
+        )
+        
+        # 临时错误指数退避重试，持续失败时熔断
+        self.retry_policy = RetryPolicy(
+            max_retries=self.config.get('max_retries', 3),
+            base_delay=self.config.get('llm_backoff_base', 1.0),
+            max_delay=self.config.get('llm_backoff_max', 30.0)
+        )
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=self.config.get('circuit_failure_threshold', 5),
+            reset_timeout=self.config.get('circuit_reset_timeout', 60)
+        )
+        
+        self.run_stats = {}
+        self._metrics_lock = threading.Lock()
+        self.metrics = {
+            'calls': 0,
+            'retries': 0,
+            'failures': 0,
+            'rejected_by_breaker': 0,
+            'requeued': 0,
+            'wasted_latency': 0.0,
+            'streamed': 0,
+            'early_stops': 0,
+            'tokens_saved': 0
+        }
+        self._first_field_latencies = []
+        
+        # 逐次调用的token用量和耗时
+        self.usage = LLMUsageRecorder(self.config.get('llm_prices', {}))
     
-    def analyze(self, papers):
-        """分析论文列表"""
+    def analyze(self, papers, on_analyzed=None):
+        """分析论文列表
+
+        使用线程池并发调用LLM，同时在途的请求数由配置项analysis_concurrency限制，
+        发起请求的节奏受服务商速率限制约束。输出顺序与输入顺序一致，
+        单篇论文失败不影响其他论文。配置项analysis_batch_size大于1时，
+        多篇论文合并为一个请求分析。启用screening_enabled时，先用低成本模型
+        为每篇论文评分，只有评分达到screening_threshold（或初筛失败）的论文
+        才进行完整分析，其余论文只保留初筛评分。
+
+        Args:
+            papers: 论文列表
+            on_analyzed: 可选回调，每篇论文得到分析结果后立即以合并了结果的论文副本调用，
+                用于记录断点（在调用analyze的线程中执行）
+        """
         if not papers:
             return papers
         
-        if not self.api_key:
+        if not self.client.available:
             self.logger.warning("API密钥未配置，跳过分析")
             return papers
         
-        analyzed_papers = []
+        self.usage.reset()
+        concurrency = max(1, self.config.get('analysis_concurrency', 4))
+        latencies = []
+        started = time.monotonic()
         
-        for paper in papers:
-            try:
-                self.logger.info(f"分析论文: {paper.get('title', 'Unknown')}")
-                analysis = self._analyze_paper(paper)
+        def notify(i, analysis):
+            if on_analyzed is not None and analysis:
+                on_analyzed(dict(papers[i], **analysis))
+        
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            analyses = [{} for _ in papers]
+            escalated = list(range(len(papers)))
+            
+            if self.screening_enabled:
+                escalated = []
+                for i, score in enumerate(self._run_screening(executor, papers, latencies)):
+                    if score is None:
+                        # 初筛失败时保守处理，直接进入完整分析
+                        escalated.append(i)
+                        continue
+                    papers[i]['screening_score'] = score
+                    if score >= self.screening_threshold:
+                        escalated.append(i)
+                    else:
+                        analyses[i] = {'score': score, 'analysis_tier': 'screening'}
+                        notify(i, analyses[i])
+                self.logger.info(f"初筛完成: {len(escalated)}/{len(papers)} 篇论文进入完整分析")
+            
+            def on_result(k, analysis):
+                if self.screening_enabled:
+                    analysis['analysis_tier'] = 'full'
+                notify(escalated[k], analysis)
+            
+            deep_papers = [papers[i] for i in escalated]
+            deep_analyses = self._run_full_analysis(executor, deep_papers, latencies, on_result)
+            for i, analysis in zip(escalated, deep_analyses):
+                analyses[i] = analysis
+        
+        # 按输入顺序写回结果
+        for paper, analysis in zip(papers, analyses):
+            if analysis:
+                paper.update(analysis)
+                paper.pop('analysis_failed', None)
+            elif paper.get('title') and paper.get('abstract'):
+                paper['analysis_failed'] = True
+        
+        self.run_stats = self._log_latency_stats(papers, latencies, time.monotonic() - started)
+        if self.response_cache is not None:
+            self.logger.info(f"LLM响应缓存: {self.response_cache.get_stats()}")
+        self.logger.info(f"LLM调用统计: {self.get_metrics()}")
+        
+        usage = self.usage.get_summary()
+        self.logger.info(
+            f"LLM用量: {usage['calls']} 次调用，输入 {usage['input_tokens']} tokens，"
+            f"输出 {usage['output_tokens']} tokens，累计耗时 {usage['latency_total']}s"
+        )
+        return papers
+    
+    def _run_full_analysis(self, executor, papers, latencies, on_result=None):
+        """对论文进行完整分析，失败的论文在熔断冷却后重新排队
+
+        Args:
+            on_result: 可选回调，每篇论文分析成功后以(下标, 分析结果)调用
+
+        Returns:
+            与papers顺序一致的分析结果列表
+        """
+        batch_size = self.config.get('analysis_batch_size', 1)
+        if batch_size > 1:
+            analyses = self._run_batched(executor, papers, batch_size, latencies, on_result)
+        else:
+            analyses = self._run_single(executor, papers, latencies, on_result=on_result)
+        
+        # 失败的论文重新排队，在熔断冷却后再次尝试
+        for requeue_pass in range(self.config.get('analysis_requeue_passes', 1)):
+            failed = [
+                i for i, (paper, analysis) in enumerate(zip(papers, analyses))
+                if not analysis and paper.get('title') and paper.get('abstract')
+            ]
+            if not failed:
+                break
+            
+            self._add_metric('requeued', len(failed))
+            self.logger.info(f"{len(failed)} 篇论文分析失败，重新排队")
+            
+            # 重新排队的调用会等待熔断器恢复，而不是立即放弃
+            retried = self._run_single(
+                executor, [papers[i] for i in failed], latencies, wait_for_breaker=True,
+                on_result=on_result and (lambda k, analysis: on_result(failed[k], analysis))
+            )
+            for i, analysis in zip(failed, retried):
+                analyses[i] = analysis
+        
+        return analyses
+    
+    def _run_screening(self, executor, papers, latencies):
+        """用低成本模型并发初筛
+
+        Returns:
+            与papers顺序一致的初筛评分列表，失败时为None
+        """
+        futures = [executor.submit(self._timed, self._screen_paper, paper, None) for paper in papers]
+        
+        scores = []
+        for future in futures:
+            score, latency = future.result()
+            scores.append(score)
+            latencies.append(latency)
+        return scores
+    
+    def get_usage(self):
+        """获取最近一次analyze()的LLM用量汇总
+
+        Returns:
+            总量、分位数、按模型分组统计和直方图，见LLMUsageRecorder.get_summary()
+        """
+        return self.usage.get_summary()
+    
+    def get_metrics(self):
+        """获取重试、熔断和失败统计
+
+        Returns:
+            统计信息字典
+        """
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+            first_field = sorted(self._first_field_latencies)
+        metrics['wasted_latency'] = round(metrics['wasted_latency'], 3)
+        if first_field:
+            metrics['time_to_first_field_p50'] = round(percentile(first_field, 50), 3)
+            metrics['time_to_first_field_p90'] = round(percentile(first_field, 90), 3)
+        metrics['circuit_breaker'] = self.circuit_breaker.get_info()
+        return metrics
+    
+    def _add_metric(self, key, value=1):
+        with self._metrics_lock:
+            self.metrics[key] += value
+    
+    def _run_single(self, executor, papers, latencies, wait_for_breaker=False, on_result=None):
+        """逐篇并发分析
+
+        Returns:
+            与papers顺序一致的分析结果列表
+        """
+        analyze = partial(self._analyze_paper, wait_for_breaker=wait_for_breaker)
+        futures = [executor.submit(self._timed, analyze, paper, {}) for paper in papers]
+        
+        analyses = []
+        for k, future in enumerate(futures):
+            analysis, latency = future.result()
+            analyses.append(analysis)
+            latencies.append(latency)
+            if analysis and on_result is not None:
+                on_result(k, analysis)
+        return analyses
+    
+    def _run_batched(self, executor, papers, batch_size, latencies, on_result=None):
+        """多篇论文合并为一个请求并发分析，缺失或格式错误的论文逐篇重试
+
+        Returns:
+            与papers顺序一致的分析结果列表
+        """
+        eligible = [
+            paper for paper in papers
+            if paper.get('arxiv_id') and paper.get('title') and paper.get('abstract')
+        ]
+        batches = self._make_batches(eligible, batch_size)
+        self.logger.info(f"批量分析 {len(eligible)} 篇论文，共 {len(batches)} 个请求")
+        
+        futures = [executor.submit(self._timed, self._analyze_batch, batch, {}) for batch in batches]
+        
+        # 按在papers中的位置记录结果，没有arxiv_id的论文不会共用同一个结果
+        positions = {id(paper): k for k, paper in enumerate(papers)}
+        
+        results = {}
+        for batch, future in zip(batches, futures):
+            batch_results, latency = future.result()
+            latencies.append(latency)
+            for paper in batch:
+                if paper['arxiv_id'] not in batch_results:
+                    continue
+                k = positions[id(paper)]
+                results[k] = batch_results[paper['arxiv_id']]
+                if on_result is not None:
+                    on_result(k, results[k])
+        
+        # 批量结果中缺失的论文逐篇重试
+        missing = [k for k in range(len(papers)) if k not in results]
+        if missing:
+            self.logger.info(f"{len(missing)} 篇论文未在批量结果中返回，逐篇重试")
+            retried = self._run_single(
+                executor, [papers[k] for k in missing], latencies,
+                on_result=on_result and (lambda j, analysis: on_result(missing[j], analysis))
+            )
+            for k, analysis in zip(missing, retried):
                 if analysis:
-                    paper.update(analysis)
-                    analyzed_papers.append(paper)
-                else:
-                    analyzed_papers.append(paper)
-            except Exception as e:
-                self.logger.error(f"分析论文失败: {e}")
-                analyzed_papers.append(paper)
+                    results[k] = analysis
+        
+        return [results.get(k, {}) for k in range(len(papers))]
+    
+    def _timed(self, func, arg, default):
+        """执行分析函数，隔离异常并记录耗时
+
+        Returns:
+            (结果, 耗时秒数) 元组
+        """
+        start = time.monotonic()
+        try:
+            result = func(arg)
+        except Exception as e:
+            self.logger.error(f"分析论文失败: {e}")
+            result = default
+        return result, time.monotonic() - start
+    
+    def _log_latency_stats(self, papers, latencies, elapsed):
+        """记录延迟分位数和吞吐量
+
+        Returns:
+            本次运行的统计信息
+        """
+        latencies = sorted(latencies)
+        stats = {
+            'papers': len(papers),
+            'requests': len(latencies),
+            'elapsed': round(elapsed, 3),
+            'papers_per_minute': round(len(papers) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+            'p50': round(percentile(latencies, 50), 3),
+            'p90': round(percentile(latencies, 90), 3),
+            'p99': round(percentile(latencies, 99), 3)
+        }
         
-        return analyzed_papers
+        if latencies:
+            self.logger.info(
+                f"完成 {stats['requests']} 个分析请求，耗时 {elapsed:.1f}s，"
+                f"吞吐量 {stats['papers_per_minute']:.1f} 篇/分钟，"
+                f"延迟 p50={stats['p50']:.2f}s "
+                f"p90={stats['p90']:.2f}s "
+                f"p99={stats['p99']:.2f}s"
+            )
+        return stats
     
-    def _analyze_paper(self, paper):
+    def _analyze_paper(self, paper, wait_for_breaker=False):
         """分析单个论文"""
+        self.logger.info(f"分析论文: {paper.get('title', 'Unknown')}")
         title = paper.get('title', '')
         abstract = paper.get('abstract', '')
         authors = paper.get('authors', [])
@@ -75,27 +408,274 @@ class ArxivAnalyzer:
         # 构建分析提示
         prompt = self._build_analysis_prompt(title, abstract, authors)
         
-        try:
-            # 调用LLM API
-            response = Generation.call(
-                model="qwen-plus",
-                prompt=prompt,
-                api_key=self.api_key,
-                temperature=0.3,
-                top_p=0.8,
-                max_tokens=2000
+        return self._call_llm(
+            prompt,
+            self._parse_analysis_result,
+            wait_for_breaker=wait_for_breaker,
+            ready=lambda parser: REQUIRED_FIELDS.issubset(parser.fields)
+        ) or {}
+    
+    def _screen_paper(self, paper):
+        """用低成本模型为论文给出简短评分
+
+        Returns:
+            评分，失败或缺少标题、摘要时为None
+        """
+        title = paper.get('title', '')
+        abstract = paper.get('abstract', '')
+        if not title or not abstract:
+            return None
+        
+        prompt = self._build_screening_prompt(title, abstract)
+        result = self._call_llm(
+            prompt,
+            self._parse_screening_result,
+            model=self.screening_model,
+            params=self.screening_params,
+            ready=lambda parser: 'score' in parser.fields,
+            tier='screening'
+        )
+        return result['score'] if result else None
+    
+    def _make_batches(self, papers, batch_size):
+        """按论文数量和token预算将论文分组"""
+        budget = self.config.get('analysis_batch_token_budget', 6000)
+        output_tokens = self.config.get('analysis_batch_output_tokens', 600)
+        preamble_tokens = _estimate_tokens(self._build_batch_prompt([]))
+        
+        batches = []
+        batch = []
+        used = preamble_tokens
+        for paper in papers:
+            cost = _estimate_tokens(self._format_batch_entry(paper)) + output_tokens
+            if batch and (len(batch) >= batch_size or used + cost > budget):
+                batches.append(batch)
+                batch = []
+                used = preamble_tokens
+            batch.append(paper)
+            used += cost
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _analyze_batch(self, papers):
+        """在一个请求中分析多篇论文
+
+        Returns:
+            {arxiv_id: 分析结果} 字典，只包含成功解析的论文
+        """
+        if len(papers) == 1:
+            analysis = self._analyze_paper(papers[0])
+            return {papers[0]['arxiv_id']: analysis} if analysis else {}
+        
+        self.logger.info(f"批量分析论文: {[p['arxiv_id'] for p in papers]}")
+        prompt = self._build_batch_prompt(papers)
+        output_tokens = self.config.get('analysis_batch_output_tokens', 600)
+        params = dict(self.generation_params, max_tokens=output_tokens * len(papers))
+        
+        arxiv_ids = [p['arxiv_id'] for p in papers]
+        return self._call_llm(
+            prompt, lambda text: self._parse_batch_result(text, arxiv_ids), params=params, papers=len(papers)
+        ) or {}
+    
+    def _call_llm(self, prompt, parse, model=None, params=None, wait_for_breaker=False, ready=None,
+                  papers=1, tier='full'):
+        """调用LLM并解析响应，优先使用响应缓存
+
+        临时错误（网络错误、限流、服务端错误、响应无法解析）按指数退避重试；
+        熔断器打开时直接放弃，由调用方重新排队。只有解析成功的响应才会写入缓存。
+        每次调用（含全部重试）的token用量、耗时和缓存状态记录到self.usage。
+
+        Args:
+            prompt: 提示词
+            parse: 解析函数，接收响应文本，解析失败时返回空值
+            model: 模型名称，默认使用self.model
+            params: 采样参数，默认使用self.generation_params
+            wait_for_breaker: 熔断器打开时是否等待其恢复（最长circuit_max_wait秒）
+            ready: 流式模式下的提前结束判断函数，接收IncrementalJSONParser，
+                默认在第一个JSON值完整到达后结束
+            papers: 本次调用分析的论文数，用于用量统计
+            tier: 分析层级（screening/full），用于用量统计
+
+        Returns:
+            解析结果，失败时为None
+        """
+        model = model or self.model
+        params = params or self.generation_params
+        started = time.monotonic()
+        cache_status = CACHE_DISABLED
+        
+        if self.response_cache is not None:
+            cache_status = CACHE_MISS
+            cached = self.response_cache.get(model, prompt, params)
+            if cached is not None:
+                parsed = parse(cached)
+                if parsed:
+                    self.usage.record(
+                        model, latency=time.monotonic() - started, cache=CACHE_HIT,
+                        papers=papers, tier=tier
+                    )
+                    return parsed
+        
+        usage = {'input_tokens': 0, 'output_tokens': 0}
+        attempt = 0
+        
+        def record(status):
+            self.usage.record(
+                model,
+                input_tokens=usage['input_tokens'],
+                output_tokens=usage['output_tokens'],
+                latency=time.monotonic() - started,
+                retries=attempt,
+                cache=cache_status,
+                status=status,
+                papers=papers,
+                tier=tier
             )
+        
+        for attempt in range(self.retry_policy.max_retries + 1):
+            if not self._acquire_breaker(wait_for_breaker):
+                self._add_metric('rejected_by_breaker')
+                self.logger.warning("熔断器打开，跳过本次调用")
+                record(STATUS_REJECTED)
+                return None
             
-            if response.status_code == 200:
-                result = response.output.text
-                return self._parse_analysis_result(result)
-            else:
-                self.logger.error(f"API调用失败: {response.message}")
-                return {}
+            if attempt:
+                self._add_metric('retries')
+            self._add_metric('calls')
+            start = time.monotonic()
+            
+            try:
+                text, call_usage = self._invoke(model, prompt, params, ready)
+                usage['input_tokens'] += call_usage.get('input_tokens') or _estimate_tokens(prompt)
+                usage['output_tokens'] += call_usage.get('output_tokens') or _estimate_tokens(text)
+                parsed = parse(text)
+                if not parsed:
+                    raise ResponseParseError("响应无法解析")
+            except PermanentError as e:
+                # 单个请求被拒绝（参数错误、内容审核等），服务本身正常，不计入熔断
+                self.circuit_breaker.record_success()
+                self._add_metric('failures')
+                self._add_metric('wasted_latency', time.monotonic() - start)
+                self.logger.error(f"API调用失败: {e}")
+                record(STATUS_FAILED)
+                return None
+            except Exception as e:
+                # 只有网络错误、限流和服务端错误计入熔断；响应无法解析说明服务正常返回了结果
+                if isinstance(e, ResponseParseError):
+                    self.circuit_breaker.record_success()
+                else:
+                    self.circuit_breaker.record_failure()
+                self._add_metric('wasted_latency', time.monotonic() - start)
+                if attempt >= self.retry_policy.max_retries:
+                    self._add_metric('failures')
+                    self.logger.error(f"API调用失败，已重试 {attempt} 次: {e}")
+                    record(STATUS_FAILED)
+                    return None
                 
-        except Exception as e:
-            self.logger.error(f"分析论文时API调用失败: {e}")
-            return {}
+                delay = self.retry_policy.delay(attempt)
+                self.logger.warning(f"API调用失败，{delay:.1f}s 后重试: {e}")
+                time.sleep(delay)
+                self._add_metric('wasted_latency', delay)
+                continue
+            
+            self.circuit_breaker.record_success()
+            if self.response_cache is not None:
+                self.response_cache.set(model, prompt, params, text)
+            record(STATUS_OK)
+            return parsed
+        
+        return None
+    
+    def _acquire_breaker(self, wait):
+        """获取熔断器放行，wait为True时等待冷却结束或探测调用完成"""
+        deadline = time.monotonic() + (self.config.get('circuit_max_wait', 300) if wait else 0)
+        while not self.circuit_breaker.allow():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(remaining, max(self.circuit_breaker.remaining_cooldown(), 0.2)))
+        return True
+    
+    def _invoke(self, model, prompt, params, ready=None):
+        """发起一次LLM调用
+
+        Returns:
+            (响应文本, token用量) 元组
+
+        Raises:
+            TransientError: 可重试的错误
+            PermanentError: 不可重试的错误
+        """
+        # 遵守服务商的速率限制
+        self.rate_limiter.acquire(_estimate_tokens(prompt) + params.get('max_tokens', 0))
+        
+        if self.streaming:
+            return self._invoke_stream(model, prompt, params, ready)
+        
+        # 调用LLM API
+        response = self.client.generate(model, prompt, **params)
+        
+        if response.status_code == 200:
+            return response.text, response.usage
+        self._raise_for_status(response)
+    
+    def _invoke_stream(self, model, prompt, params, ready=None):
+        """以流式方式发起LLM调用，边接收边解析JSON
+
+        第一个JSON值完整到达，或ready判断所需字段已齐全时立即停止读取，
+        不再为模型在JSON之后追加的说明文字付费。
+
+        Returns:
+            (已解析部分的JSON文本, token用量) 元组
+        """
+        parser = IncrementalJSONParser()
+        start = time.monotonic()
+        first_field = None
+        usage = {}
+        output_tokens = 0
+        early_stop = False
+        
+        stream = self.client.stream(model, prompt, **params)
+        try:
+            for chunk in stream:
+                if chunk.status_code != 200:
+                    self._raise_for_status(chunk)
+                usage = chunk.usage or usage
+                output_tokens = usage.get('output_tokens', output_tokens)
+                
+                if parser.feed(chunk.text) and first_field is None:
+                    first_field = time.monotonic() - start
+                if parser.done or (ready is not None and ready(parser)):
+                    early_stop = True
+                    break
+        finally:
+            stream.close()
+        
+        self._add_metric('streamed')
+        if early_stop:
+            self._add_metric('early_stops')
+            # 按max_tokens上限估计，实际节省取决于模型原本会继续生成多少
+            self._add_metric('tokens_saved', max(0, params.get('max_tokens', 0) - output_tokens))
+        if first_field is not None:
+            with self._metrics_lock:
+                self._first_field_latencies.append(first_field)
+        
+        return parser.text(), usage
+    
+    def _raise_for_status(self, response):
+        """将非200响应转换为对应的异常
+
+        Raises:
+            TransientError: 限流或服务端错误
+            PermanentError: 其他错误
+        """
+        if response.status_code == 429:
+            self.rate_limiter.backoff(self.config.get('analysis_throttle_backoff', 10))
+            raise TransientError(f"API调用被限流: {response.message}")
+        if response.status_code >= 500:
+            raise TransientError(f"服务端错误 {response.status_code}: {response.message}")
+        raise PermanentError(f"{response.status_code}: {response.message}")
     
     def _build_analysis_prompt(self, title, abstract, authors):
         """构建分析提示"""
@@ -117,7 +697,7 @@ class ArxivAnalyzer:
 7. 评分：请对论文进行1-10分的评分，10分为最高。
 
 请按照以下JSON格式返回分析结果：
-{
+{{
   "research_question": "研究问题分析",
   "method_innovation": "方法创新分析",
   "experimental_results": "实验结果分析",
@@ -125,33 +705,143 @@ class ArxivAnalyzer:
   "limitations": "局限性分析",
   "overall_evaluation": "总体评价",
   "score": 8.5
-}
+}}
 
 请确保返回的是有效的JSON格式，不要包含任何额外的文本。"""
     
+    def _build_screening_prompt(self, title, abstract):
+        """构建初筛提示"""
+        return f"""请根据标题和摘要，对以下arXiv论文的研究价值进行1-10分的快速评分，10分为最高。
+
+标题：{title}
+
+摘要：{abstract}
+
+只返回如下JSON，不要包含任何其他内容：
+{{"score": 6.5}}"""
+    
+    def _format_batch_entry(self, paper):
+        """格式化批量提示中的单篇论文"""
+        authors = paper.get('authors', [])
+        return f"""
+[arxiv_id: {paper.get('arxiv_id')}]
+标题：{paper.get('title', '')}
+作者：{', '.join(authors) if authors else 'Unknown'}
+摘要：{paper.get('abstract', '')}
+"""
+    
+    def _build_batch_prompt(self, papers):
+        """构建多篇论文的批量分析提示"""
+        entries = "".join(self._format_batch_entry(paper) for paper in papers)
+        return f"""请分别分析以下{len(papers)}篇arXiv论文并提供评估：
+{entries}
+对每篇论文从以下几个方面进行简要分析：
+1. 研究问题：论文解决了什么问题？为什么这个问题重要？
+2. 方法创新：论文提出了什么新方法或技术？与现有方法相比有什么优势？
+3. 实验结果：论文报告了哪些关键实验结果？结果是否令人信服？
+4. 应用价值：论文的研究成果有什么实际应用价值？
+5. 局限性：论文存在哪些局限性或未来工作方向？
+6. 总体评价：对论文的整体质量和贡献进行评价。
+7. 评分：请对论文进行1-10分的评分，10分为最高。
+
+请返回一个JSON数组，每篇论文对应一个元素，并用arxiv_id标识：
+[
+  {{
+    "arxiv_id": "论文的arxiv_id",
+    "research_question": "研究问题分析",
+    "method_innovation": "方法创新分析",
+    "experimental_results": "实验结果分析",
+    "application_value": "应用价值分析",
+    "limitations": "局限性分析",
+    "overall_evaluation": "总体评价",
+    "score": 8.5
+  }}
+]
+
+请确保返回的是有效的JSON数组，不要包含任何额外的文本。"""
+    
+    def _parse_batch_result(self, result, arxiv_ids):
+        """解析批量分析结果
+
+        先尝试整体解析JSON数组；失败时逐个扫描其中的JSON对象，
+        尽可能保留格式正确的部分。缺少arxiv_id或评分无效的条目会被丢弃。
+
+        Returns:
+            {arxiv_id: 分析结果} 字典
+        """
+        items = []
+        array_match = re.search(r'\[[\s\S]*\]', result)
+        try:
+            items = json.loads(array_match.group(0) if array_match else result)
+            if isinstance(items, dict):
+                items = [items]
+        except ValueError:
+            decoder = json.JSONDecoder()
+            pos = result.find('{')
+            while pos != -1:
+                try:
+                    item, end = decoder.raw_decode(result, pos)
+                    items.append(item)
+                    pos = result.find('{', end)
+                except ValueError:
+                    pos = result.find('{', pos + 1)
+        
+        expected = set(arxiv_ids)
+        analyses = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            arxiv_id = str(item.pop('arxiv_id', '')).strip()
+            if arxiv_id not in expected:
+                continue
+            try:
+                item['score'] = float(item['score'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            analyses[arxiv_id] = item
+        
+        if len(analyses) < len(expected):
+            self.logger.warning(f"批量结果缺失 {len(expected) - len(analyses)} 篇论文")
+        return analyses
+    
+    def _parse_screening_result(self, result):
+        """解析初筛结果
+
+        Returns:
+            {'score': 评分} 字典，无法解析时为None
+        """
+        try:
+            json_match = re.search(r'\{[\s\S]*?\}', result)
+            score = float(json.loads(json_match.group(0) if json_match else result)['score'])
+        except (ValueError, TypeError, KeyError):
+            # 模型没有按JSON返回时，取第一个数字
+            number = re.search(r'\d+(?:\.\d+)?', result)
+            if not number:
+                self.logger.error(f"解析初筛结果失败: {result[:100]}")
+                return None
+            score = float(number.group(0))
+        
+        if not 0 <= score <= 10:
+            return None
+        return {'score': score}
+    
     def _parse_analysis_result(self, result):
-        """解析分析结果"""
+        """解析分析结果
+
+        Returns:
+            分析结果字典，无法解析或缺少有效评分时为None
+        """
         try:
             # 提取JSON部分
-            import re
             json_match = re.search(r'\{[\s\S]*\}', result)
             if json_match:
                 json_str = json_match.group(0)
                 analysis = json.loads(json_str)
-                return analysis
             else:
                 # 尝试直接解析整个结果
                 analysis = json.loads(result)
-                return analysis
+            analysis['score'] = float(analysis['score'])
+            return analysis
         except Exception as e:
             self.logger.error(f"解析分析结果失败: {e}")
-            # 返回默认值
-            return {
-                "research_question": "",
-                "method_innovation": "",
-                "experimental_results": "",
-                "application_value": "",
-                "limitations": "",
-                "overall_evaluation": "",
-                "score": 5.0
-            }
+            return None
@@ -5,20 +5,382 @@ arXiv论文跟踪系统 - 命令行接口
 """
 
 import argparse
+import json
 import logging
 import sys
 import os
+from datetime import datetime
 
 from .utils.config import load_config
 from .utils.logger import setup_logger
+from .utils.stage_journal import StageJournal
+from .utils.paper_store import get_paper_store
 from .crawler import ArxivCrawler
 from .downloader import ArxivDownloader
 from .extractor import ArxivExtractor
 from .analyzer import ArxivAnalyzer
+from .ranker import ArxivRanker
+from .clusterer import ArxivClusterer
 from .reporter import ArxivReporter
 
+def _positive_int(value):
+    """argparse类型：大于等于1的整数"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"必须是大于等于1的整数: {value}")
+    return number
+
+def trends_main(argv):
+    """趋势报告子命令"""
+    parser = argparse.ArgumentParser(
+        prog="arxiv-tracker trends",
+        description="根据跨日趋势聚合生成趋势报告"
+    )
+    
+    parser.add_argument(
+        "--days",
+        type=_positive_int,
+        default=7,
+        help="窗口天数"
+    )
+    
+    parser.add_argument(
+        "--end",
+        type=str,
+        default=None,
+        help="窗口最后一天 (YYYYMMDD)，默认为最近一次报告的日期"
+    )
+    
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        default=False,
+        help="先从已有报告重新生成趋势聚合"
+    )
+    
+    parser.add_argument(
+        "--config",
+        type=str,
+        default=None,
+        help="配置文件路径"
+    )
+    
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        default=False,
+        help="调试模式"
+    )
+    
+    args = parser.parse_args(argv)
+    
+    config = load_config(args.config)
+    setup_logger(debug=args.debug)
+    logger = logging.getLogger(__name__)
+    
+    try:
+        reporter = ArxivReporter(config)
+        if args.rebuild:
+            reporter.rebuild_trends()
+        filepath = reporter.generate_trends(days=args.days, end=args.end)
+        print(filepath)
+    except Exception as e:
+        logger.error(f"生成趋势报告失败: {e}")
+        sys.exit(1)
+
+def query_main(argv):
+    """论文查询子命令"""
+    parser = argparse.ArgumentParser(
+        prog="arxiv-tracker query",
+        description="从论文存储中按条件查询论文"
+    )
+    
+    parser.add_argument(
+        "--id",
+        action="append",
+        default=None,
+        help="按arXiv ID查询，可重复指定"
+    )
+    
+    parser.add_argument(
+        "--category",
+        type=str,
+        default=None,
+        help="论文类别"
+    )
+    
+    parser.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help="起始日期 (YYYYMMDD，含)"
+    )
+    
+    parser.add_argument(
+        "--until",
+        type=str,
+        default=None,
+        help="结束日期 (YYYYMMDD，含)"
+    )
+    
+    parser.add_argument(
+        "--min-score",
+        type=float,
+        default=None,
+        help="最低评分"
+    )
+    
+    parser.add_argument(
+        "--max-score",
+        type=float,
+        default=None,
+        help="最高评分"
+    )
+    
+    parser.add_argument(
+        "--order-by",
+        choices=["score", "date", "arxiv_id"],
+        default="score",
+        help="排序方式"
+    )
+    
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="返回数量上限"
+    )
+    
+    parser.add_argument(
+        "--count",
+        action="store_true",
+        default=False,
+        help="只输出符合条件的论文数"
+    )
+    
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        default=False,
+        help="以JSON Lines格式输出完整的论文数据"
+    )
+    
+    parser.add_argument(
+        "--import-reports",
+        action="store_true",
+        default=False,
+        help="先将已有的历史报告导入论文存储"
+    )
+    
+    parser.add_argument(
+        "--config",
+        type=str,
+        default=None,
+        help="配置文件路径"
+    )
+    
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        default=False,
+        help="调试模式"
+    )
+    
+    args = parser.parse_args(argv)
+    
+    config = load_config(args.config)
+    setup_logger(debug=args.debug)
+    logger = logging.getLogger(__name__)
+    
+    try:
+        with get_paper_store(config) as store:
+            if args.import_reports:
+                reporter = ArxivReporter(config)
+                for date in reporter.report_dates():
+                    count = store.upsert(reporter.iter_papers(date), date=date)
+                    logger.info(f"已导入 {date} 的报告: {count} 篇论文")
+            
+            filters = dict(
+                category=args.category,
+                since=args.since,
+                until=args.until,
+                min_score=args.min_score,
+                max_score=args.max_score
+            )
+            if args.count:
+                print(store.count(**filters))
+                return
+            
+            if args.id:
+                papers = [paper for paper in map(store.get, args.id) if paper]
+            else:
+                papers = store.query(order_by=args.order_by, limit=args.limit, **filters)
+            
+            for paper in papers:
+                if args.json:
+                    print(json.dumps(paper, ensure_ascii=False))
+                else:
+                    score = paper.get('score')
+                    print(
+                        f"{paper['arxiv_id']}\t{paper['date']}\t{paper.get('category', '')}\t"
+                        f"{'-' if score is None else score}\t{paper.get('title', '')}"
+                    )
+    except Exception as e:
+        logger.error(f"查询论文失败: {e}")
+        sys.exit(1)
+
+def search_main(argv):
+    """全文检索子命令"""
+    parser = argparse.ArgumentParser(
+        prog="arxiv-tracker search",
+        description="在标题、摘要、分析结果和PDF全文中检索论文"
+    )
+    
+    parser.add_argument(
+        "query",
+        type=str,
+        help='检索词，支持"短语"、AND/OR/NOT和前缀*'
+    )
+    
+    parser.add_argument(
+        "--category",
+        type=str,
+        default=None,
+        help="论文类别"
+    )
+    
+    parser.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help="起始日期 (YYYYMMDD，含)"
+    )
+    
+    parser.add_argument(
+        "--until",
+        type=str,
+        default=None,
+        help="结束日期 (YYYYMMDD，含)"
+    )
+    
+    parser.add_argument(
+        "--min-score",
+        type=float,
+        default=None,
+        help="最低评分"
+    )
+    
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="返回数量上限"
+    )
+    
+    parser.add_argument(
+        "--raw",
+        action="store_true",
+        default=False,
+        help="检索词直接作为FTS5查询语句使用"
+    )
+    
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        default=False,
+        help="以JSON Lines格式输出完整的论文数据"
+    )
+    
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        default=False,
+        help="先根据论文存储重新生成全文索引"
+    )
+    
+    parser.add_argument(
+        "--config",
+        type=str,
+        default=None,
+        help="配置文件路径"
+    )
+    
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        default=False,
+        help="调试模式"
+    )
+    
+    args = parser.parse_args(argv)
+    
+    config = load_config(args.config)
+    setup_logger(debug=args.debug)
+    logger = logging.getLogger(__name__)
+    
+    try:
+        with get_paper_store(config) as store:
+            if args.rebuild:
+                logger.info(f"全文索引重建完成: {store.rebuild_index()} 篇论文")
+            
+            papers = store.search(
+                args.query,
+                category=args.category,
+                since=args.since,
+                until=args.until,
+                min_score=args.min_score,
+                limit=args.limit,
+                raw=args.raw
+            )
+            for paper in papers:
+                if args.json:
+                    print(json.dumps(paper, ensure_ascii=False))
+                else:
+                    score = paper.get('score')
+                    print(
+                        f"{paper['arxiv_id']}\t{paper['date']}\t{paper.get('category', '')}\t"
+                        f"{'-' if score is None else score}\t{paper.get('title', '')}"
+                    )
+                    print(f"    {paper['snippet']}")
+    except Exception as e:
+        logger.error(f"检索论文失败: {e}")
+        sys.exit(1)
+
+def _merge_processed(papers, todo, processed):
+    """用本步骤的处理结果原位替换待处理的论文，已完成的论文保持不变
+
+    论文顺序与不中断运行时一致；处理结果中没有的待处理论文被去掉。
+    """
+    if len(todo) == len(papers):
+        return processed
+    todo_ids = {id(paper) for paper in todo}
+    results = {paper.get('arxiv_id'): paper for paper in processed}
+    merged = []
+    for paper in papers:
+        if id(paper) not in todo_ids:
+            merged.append(paper)
+        elif paper.get('arxiv_id') in results:
+            merged.append(results.pop(paper.get('arxiv_id')))
+    # 处理结果中无法对应到原论文的部分放在最后
+    merged.extend(results.values())
+    return merged
+
+def _is_analyzed(paper):
+    """论文是否已有分析结果（或被相关性预排序跳过）"""
+    return 'score' in paper or paper.get('analysis_skipped')
+
+# 子命令，不带子命令时运行完整的跟踪流程
+COMMANDS = {
+    "trends": trends_main,
+    "query": query_main,
+    "search": search_main
+}
+
 def main():
     """主函数"""
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        return COMMANDS[sys.argv[1]](sys.argv[2:])
+    
     # 解析命令行参数
     parser = argparse.ArgumentParser(
         description="arXiv论文跟踪和分析系统",
@@ -53,6 +415,20 @@ def main():
         help="从PDF文件提取信息"
     )
     
+    parser.add_argument(
+        "--full-text",
+        action="store_true",
+        default=False,
+        help="提取PDF全文并写入全文存储（需配合--use-pdf）"
+    )
+    
+    parser.add_argument(
+        "--references",
+        action="store_true",
+        default=False,
+        help="从PDF提取参考文献并更新引用图"
+    )
+    
     parser.add_argument(
         "--no-download",
         action="store_true",
@@ -67,6 +443,13 @@ def main():
         help="不分析论文"
     )
     
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        default=False,
+        help="不使用LLM响应缓存"
+    )
+    
     parser.add_argument(
         "--no-report",
         action="store_true",
@@ -74,6 +457,13 @@ def main():
         help="不生成报告"
     )
     
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        default=False,
+        help="从阶段日志继续同一日期中断的运行，只处理未完成的论文"
+    )
+    
     parser.add_argument(
         "--config",
         type=str,
@@ -96,50 +486,102 @@ def main():
     # 覆盖配置
     if args.categories:
         config['categories'] = args.categories.split(',')
+    if args.full_text:
+        config['extract_full_text'] = True
+    if args.no_llm_cache:
+        config['llm_cache_enabled'] = False
     
     # 设置日志
     setup_logger(debug=args.debug)
     logger = logging.getLogger(__name__)
     
+    # 每篇论文完成的阶段记录在阶段日志中，--resume时跳过已完成的工作
+    run = args.date or datetime.now().strftime('%Y%m%d')
+    journal = StageJournal(batch_size=config.get('journal_batch_size', 50))
+    if not args.resume:
+        journal.reset(run)
+    # 每个步骤完成后论文同时写入论文存储
+    store = get_paper_store(config)
+    
+    def checkpoint(processed, stage, texts=None):
+        journal.record(run, processed, stage)
+        journal.flush()
+        store.upsert(processed, date=run, texts=texts)
+    
     try:
         logger.info("arXiv论文跟踪系统启动")
         logger.info(f"配置: {config}")
         
         # 1. 爬取论文信息
-        logger.info("步骤1: 爬取论文信息")
-        crawler = ArxivCrawler(config)
-        papers = crawler.crawl(date=args.date)
-        logger.info(f"成功爬取 {len(papers)} 篇论文")
+        crawled = journal.completed(run, 'crawled') if args.resume else set()
+        if crawled:
+            papers = [paper for paper in journal.load(run) if paper.get('arxiv_id') in crawled]
+            logger.info(f"步骤1: 从阶段日志恢复 {len(papers)} 篇论文 ({journal.get_summary(run)})")
+        else:
+            logger.info("步骤1: 爬取论文信息")
+            crawler = ArxivCrawler(config)
+            papers = crawler.crawl(date=args.date)
+            checkpoint(papers, 'crawled')
+            logger.info(f"成功爬取 {len(papers)} 篇论文")
         
         if not args.no_download:
             # 2. 下载PDF文件
-            logger.info("步骤2: 下载PDF文件")
+            todo = journal.pending(run, papers, 'downloaded') if args.resume else papers
+            logger.info(f"步骤2: 下载PDF文件 ({len(todo)} 篇)")
             downloader = ArxivDownloader(config)
-            papers = downloader.download(papers, date=args.date)
+            processed = downloader.download(todo, date=args.date) if todo else []
+            checkpoint(processed, 'downloaded')
+            papers = _merge_processed(papers, todo, processed)
             logger.info("PDF文件下载完成")
         
         # 3. 提取信息
-        logger.info("步骤3: 提取论文信息")
-        extractor = ArxivExtractor(config)
-        if args.use_pdf:
-            papers = extractor.extract_from_pdfs(papers, date=args.date)
-        else:
-            papers = extractor.extract_from_web(papers)
+        todo = journal.pending(run, papers, 'extracted') if args.resume else papers
+        logger.info(f"步骤3: 提取论文信息 ({len(todo)} 篇)")
+        if todo:
+            extractor = ArxivExtractor(config)
+            if args.use_pdf:
+                processed = extractor.extract_from_pdfs(todo, date=args.date)
+            else:
+                processed = extractor.extract_from_web(todo)
+            if args.references:
+                processed = extractor.extract_references(processed, date=args.date)
+            # 提取的全文同时写入全文索引
+            texts = extractor.load_full_texts(processed) if args.use_pdf else None
+            checkpoint(processed, 'extracted', texts)
+            papers = _merge_processed(papers, todo, processed)
         logger.info("论文信息提取完成")
         
+        usage = None
         if not args.no_analysis:
             # 4. 分析论文
             logger.info("步骤4: 分析论文")
+            # 本地相关性预排序，只有入选的论文进入LLM分析
+            ranker = ArxivRanker(config)
+            selected = ranker.select(papers)
+            # 近似重复的论文只分析代表论文，结果同步给簇内其他论文
+            clusterer = ArxivClusterer(config)
             analyzer = ArxivAnalyzer(config)
-            papers = analyzer.analyze(papers)
+            todo = clusterer.select(selected)
+            if args.resume:
+                todo = journal.pending(run, todo, 'analyzed')
+                logger.info(f"续跑: {len(todo)} 篇论文需要分析")
+            # 每篇论文得到分析结果后立即写入阶段日志
+            analyzer.analyze(todo, on_analyzed=lambda paper: journal.record(run, [paper], 'analyzed'))
+            clusterer.propagate(selected)
+            checkpoint([paper for paper in papers if _is_analyzed(paper)], 'analyzed')
+            usage = analyzer.get_usage()
             logger.info("论文分析完成")
         
         if not args.no_report:
             # 5. 生成报告
-            logger.info("步骤5: 生成报告")
-            reporter = ArxivReporter(config)
-            reporter.generate(papers, date=args.date)
-            logger.info("报告生成完成")
+            if args.resume and not journal.pending(run, papers, 'reported'):
+                logger.info("步骤5: 报告已生成，跳过")
+            else:
+                logger.info("步骤5: 生成报告")
+                reporter = ArxivReporter(config)
+                reporter.generate(papers, date=args.date, usage=usage)
+                checkpoint(papers, 'reported')
+                logger.info("报告生成完成")
         
         logger.info("arXiv论文跟踪系统运行完成")
         
@@ -148,6 +590,9 @@ def main():
         import traceback
         logger.error(traceback.format_exc())
         sys.exit(1)
+    finally:
+        journal.close()
+        store.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+arXiv论文近似重复聚类模块
+
+用哈希n-gram向量（TF-IDF加权、L2归一化）表示每篇论文的标题和摘要，
+分块计算整批论文的两两余弦相似度，相似度超过阈值的论文用并查集合并为簇。
+每个簇只选一篇代表论文进行LLM分析，分析结果再同步给簇内其他论文。
+"""
+
+import zlib
+import logging
+from typing import Dict, List
+
+import numpy as np
+
+from .ranker import TOKEN_PATTERN
+
+# 从代表论文同步给簇内其他论文的字段
+PROPAGATED_FIELDS = (
+    'research_question',
+    'method_innovation',
+    'experimental_results',
+    'application_value',
+    'limitations',
+    'overall_evaluation',
+    'score',
+    'screening_score',
+    'analysis_tier'
+)
+
+
+class _TermHashes(dict):
+    """词到32位哈希值的缓存"""
+
+    def __missing__(self, term):
+        value = self[term] = zlib.crc32(term.encode('utf-8'))
+        return value
+
+
+class _UnionFind:
+    """带路径压缩和按大小合并的并查集"""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, x):
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+
+class ArxivClusterer:
+    """arXiv论文近似重复聚类器"""
+
+    def __init__(self, config):
+        """初始化聚类器"""
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+
+        self.enabled = self.config.get('cluster_enabled', False)
+        self.threshold = self.config.get('cluster_threshold', 0.85)
+        self.dim = self.config.get('cluster_dim', 2048)
+        self.ngram = max(1, self.config.get('cluster_ngram', 2))
+        self.block_size = self.config.get('cluster_block_size', 1024)
+
+        self._hashes = _TermHashes()
+
+    def embed(self, papers) -> np.ndarray:
+        """计算论文的哈希n-gram向量
+
+        Args:
+            papers: 论文列表
+
+        Returns:
+            (论文数, cluster_dim) 的float32矩阵，每行L2归一化
+        """
+        hashes = []
+        lengths = np.zeros(len(papers), dtype=np.intp)
+        for row, paper in enumerate(papers):
+            text = f"{paper.get('title', '') or ''} {paper.get('abstract', '') or ''}".lower()
+            tokens = TOKEN_PATTERN.findall(text)
+            lengths[row] = len(tokens)
+            hashes.extend(map(self._hashes.__getitem__, tokens))
+
+        # 按位置组合相邻词的哈希得到n-gram，不跨越论文边界
+        unigrams = np.array(hashes, dtype=np.uint64)
+        doc_ids = np.repeat(np.arange(len(papers), dtype=np.intp), lengths)
+        rows = [doc_ids]
+        cols = [unigrams % self.dim]
+        grams = unigrams
+        for n in range(2, self.ngram + 1):
+            grams = (grams[:-1] * np.uint64(1000003) + unigrams[n - 1:]) & np.uint64(0xFFFFFFFF)
+            same_doc = doc_ids[:len(grams)] == doc_ids[n - 1:]
+            rows.append(doc_ids[:len(grams)][same_doc])
+            cols.append(grams[same_doc] % self.dim)
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols).astype(np.intp)
+
+        # 分块计数，避免为整批论文分配float64中间矩阵
+        vectors = np.zeros((len(papers), self.dim), dtype=np.float32)
+        order = np.argsort(rows, kind='stable')
+        rows, cols = rows[order], cols[order]
+        bounds = np.searchsorted(rows, np.arange(0, len(papers) + self.block_size, self.block_size))
+        for start, lo, hi in zip(range(0, len(papers), self.block_size), bounds[:-1], bounds[1:]):
+            counts = np.bincount(
+                (rows[lo:hi] - start) * self.dim + cols[lo:hi],
+                minlength=min(self.block_size, len(papers) - start) * self.dim
+            )
+            vectors[start:start + self.block_size] = counts.reshape(-1, self.dim)
+
+        # 次线性词频和逆文档频率，降低常见词的影响
+        np.log1p(vectors, out=vectors)
+        df = np.count_nonzero(vectors, axis=0)
+        vectors *= (np.log((1.0 + len(papers)) / (1.0 + df)) + 1.0).astype(np.float32)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors /= norms
+        return vectors
+
+    def cluster(self, papers) -> List[List[int]]:
+        """将近似重复的论文聚类
+
+        Args:
+            papers: 论文列表
+
+        Returns:
+            簇列表，每个簇是论文下标列表（按原顺序），包含单篇论文的簇
+        """
+        if not papers:
+            return []
+
+        vectors = self.embed(papers)
+        groups = _UnionFind(len(papers))
+
+        # 分块计算相似度矩阵，只保留上三角中超过阈值的论文对
+        for start in range(0, len(papers), self.block_size):
+            block = vectors[start:start + self.block_size] @ vectors[start:].T
+            pairs_i, pairs_j = np.nonzero(block >= self.threshold)
+            for i, j in zip(pairs_i.tolist(), pairs_j.tolist()):
+                if j > i:
+                    groups.union(start + i, start + j)
+
+        clusters = {}
+        for index in range(len(papers)):
+            clusters.setdefault(groups.find(index), []).append(index)
+        return list(clusters.values())
+
+    def select(self, papers) -> List[Dict]:
+        """聚类并选出每个簇的代表论文
+
+        簇内论文写入cluster_id（代表论文的arXiv ID）；非代表论文写入duplicate_of。
+        代表论文优先选择相关性得分最高的论文，其次按原顺序。
+
+        Args:
+            papers: 论文列表
+
+        Returns:
+            需要进行LLM分析的代表论文列表（按原顺序）
+        """
+        if not self.enabled or len(papers) < 2:
+            return papers
+
+        for paper in papers:
+            for field in ('cluster_id', 'cluster_size', 'duplicate_of'):
+                paper.pop(field, None)
+
+        representatives = []
+        duplicates = 0
+        for members in self.cluster(papers):
+            if len(members) == 1:
+                representatives.append(members[0])
+                continue
+
+            leader = max(members, key=lambda i: (papers[i].get('relevance_score', 0), -i))
+            cluster_id = papers[leader].get('arxiv_id') or str(leader)
+            for i in members:
+                papers[i]['cluster_id'] = cluster_id
+                papers[i]['cluster_size'] = len(members)
+                if i != leader:
+                    papers[i]['duplicate_of'] = cluster_id
+            representatives.append(leader)
+            duplicates += len(members) - 1
+
+        self.logger.info(f"近似重复聚类: {len(papers)} 篇论文合并为 {len(representatives)} 个簇，跳过 {duplicates} 篇重复论文")
+        return [papers[i] for i in sorted(representatives)]
+
+    def propagate(self, papers) -> List[Dict]:
+        """将代表论文的分析结果同步给簇内其他论文
+
+        Args:
+            papers: 论文列表（包含代表论文和重复论文）
+
+        Returns:
+            论文列表
+        """
+        leaders = {
+            paper.get('arxiv_id'): paper for paper in papers
+            if paper.get('cluster_id') and not paper.get('duplicate_of')
+        }
+        for paper in papers:
+            leader = leaders.get(paper.get('duplicate_of'))
+            if leader is None:
+                continue
+            for field in PROPAGATED_FIELDS:
+                if field in leader:
+                    paper[field] = leader[field]
+            paper.pop('analysis_failed', None)
+            if leader.get('analysis_failed'):
+                paper['analysis_failed'] = True
+        return papers
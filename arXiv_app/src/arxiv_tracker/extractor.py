@@ -7,8 +7,108 @@ arXiv论文信息提取模块
 import os
 import re
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict
 import PyPDF2
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .utils.sandbox import SandboxedPool, FATAL_STATUSES, STATUS_OK
+from .utils.quarantine import QuarantineList
+from .utils.text_store import TextStore
+from .utils.citation_graph import CitationGraph
+
+ARXIV_BASE_URL = "https://arxiv.org"
+
+# 网页补全时检查的字段
+WEB_METADATA_FIELDS = ('title', 'authors', 'abstract', 'pdf_url')
+
+
+def _read_pdf_pages(pdf_path, max_pages=None):
+    """读取PDF文件各页文本（在工作进程中执行）
+
+    Args:
+        pdf_path: PDF文件路径
+        max_pages: 最多读取的页数，None表示读取全部
+
+    Returns:
+        每页文本组成的列表
+    """
+    pages = []
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        page_count = len(reader.pages)
+        if max_pages is not None:
+            page_count = min(max_pages, page_count)
+        for page_num in range(page_count):
+            pages.append(reader.pages[page_num].extract_text() or "")
+    return pages
+
+def _read_pdf_tail(pdf_path, tail_pages):
+    """读取PDF文件最后几页的文本（在工作进程中执行）
+
+    Args:
+        pdf_path: PDF文件路径
+        tail_pages: 读取的页数
+
+    Returns:
+        每页文本组成的列表
+    """
+    pages = []
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        page_count = len(reader.pages)
+        for page_num in range(max(0, page_count - tail_pages), page_count):
+            pages.append(reader.pages[page_num].extract_text() or "")
+    return pages
+
+
+# 参考文献相关的预编译模式
+REFERENCES_HEADING_PATTERN = re.compile(r'^\s*(?:\d+\.?\s*)?(?:References|Bibliography|REFERENCES|BIBLIOGRAPHY)\s*$', re.MULTILINE)
+ARXIV_REF_PATTERN = re.compile(
+    r'(?:arXiv|abs)\s*[:/]\s*(\d{2}(?:0[1-9]|1[0-2])\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?',
+    re.IGNORECASE
+)
+DOI_REF_PATTERN = re.compile(r'\b(10\.\d{4,9}/[^\s"<>]+)')
+HYPHEN_BREAK_PATTERN = re.compile(r'-\s*\n\s*')
+
+
+def parse_references(text):
+    """从参考文献文本中解析arXiv ID和DOI
+
+    Args:
+        text: 论文末尾若干页的文本
+
+    Returns:
+        按出现顺序去重后的 (target, kind) 列表，DOI以"doi:"为前缀
+    """
+    # 只保留最后一个参考文献标题之后的内容
+    headings = list(REFERENCES_HEADING_PATTERN.finditer(text))
+    if headings:
+        text = text[headings[-1].end():]
+    
+    text = HYPHEN_BREAK_PATTERN.sub('-', text)
+    
+    references = {}
+    for match in ARXIV_REF_PATTERN.finditer(text):
+        references.setdefault(match.group(1), 'arxiv')
+    for match in DOI_REF_PATTERN.finditer(text):
+        doi = match.group(1).rstrip('.,;:)]}').lower()
+        # arXiv自身的DOI已经由arXiv ID覆盖
+        if doi.startswith('10.48550/arxiv.'):
+            references.setdefault(doi[len('10.48550/arxiv.'):], 'arxiv')
+        else:
+            references.setdefault(f"doi:{doi}", 'doi')
+    
+    return list(references.items())
+
+
+def _extract_pdf_references(pdf_path, tail_pages):
+    """读取PDF末尾几页并解析参考文献（在工作进程中执行）"""
+    return parse_references("\n".join(_read_pdf_tail(pdf_path, tail_pages)))
+
 
 class ArxivExtractor:
     """arXiv论文信息提取器"""
@@ -18,12 +118,119 @@ class ArxivExtractor:
         self.config = config
         self.logger = logging.getLogger(__name__)
     
-    def extract_from_pdfs(self, papers, date=None):
-        """从PDF文件中提取信息"""
+    def extract_from_pdfs(self, papers, date=None, full_text=None):
+        """从PDF文件中提取信息
+
+        PDF解析在受监督的工作进程中执行，单个文件超时、超内存或导致进程崩溃时，
+        该文件会被加入隔离列表，后续运行直接跳过。
+
+        Args:
+            papers: 论文列表
+            date: 日期 (YYYYMMDD)
+            full_text: 是否提取全文并写入全文存储，None时使用配置项extract_full_text
+        """
         if not papers:
             return papers
         
-        # 获取PDF目录
+        if full_text is None:
+            full_text = self.config.get('extract_full_text', False)
+        
+        pdf_dir = self._get_pdf_dir(date)
+        self.logger.info(f"从PDF文件中提取信息: {pdf_dir}")
+        
+        quarantine = QuarantineList()
+        paper_map, pdf_paths = self._collect_pdfs(papers, pdf_dir, quarantine)
+        # 读取前5页（摘要通常在前几页），全文模式读取全部页面
+        max_pages = None if full_text else 5
+        tasks = [(arxiv_id, (pdf_path, max_pages)) for arxiv_id, pdf_path in pdf_paths.items()]
+        
+        text_store = self._create_text_store() if full_text else None
+        try:
+            self._read_pdfs(tasks, paper_map, pdf_paths, quarantine, text_store)
+        finally:
+            if text_store is not None:
+                self.logger.info(f"全文存储: {text_store.get_store_info()}")
+                text_store.close()
+        
+        return papers
+    
+    def _read_pdfs(self, tasks, paper_map, pdf_paths, quarantine, text_store):
+        """在工作进程中解析PDF，并将结果写入论文信息和全文存储"""
+        with self._create_pool(_read_pdf_pages) as pool:
+            for arxiv_id, status, result in pool.imap(tasks):
+                paper = paper_map[arxiv_id]
+                
+                if status in FATAL_STATUSES:
+                    self.logger.error(f"从PDF文件中提取信息失败: {arxiv_id} - {result}")
+                    quarantine.add(pdf_paths[arxiv_id], f"{status}: {result}")
+                    continue
+                
+                if status != STATUS_OK:
+                    self.logger.error(f"从PDF文件中提取信息失败: {arxiv_id} - {result}")
+                    continue
+                
+                if text_store is not None:
+                    text_store.put(arxiv_id, result)
+                    paper['fulltext_pages'] = len(result)
+                
+                text = "".join(result[:5])
+                if not text:
+                    self.logger.warning(f"无法从PDF文件中提取文本: {arxiv_id}")
+                    continue
+                
+                self.logger.info(f"处理论文: {paper.get('title', 'Unknown')}")
+                self._apply_text(paper, text)
+    
+    def extract_references(self, papers, date=None):
+        """从PDF文件末尾几页提取参考文献，并写入引用图
+
+        Args:
+            papers: 论文列表
+            date: 日期 (YYYYMMDD)
+
+        Returns:
+            论文列表，每篇论文增加references字段
+        """
+        if not papers:
+            return papers
+        
+        pdf_dir = self._get_pdf_dir(date)
+        self.logger.info(f"从PDF文件中提取参考文献: {pdf_dir}")
+        
+        quarantine = QuarantineList()
+        paper_map, pdf_paths = self._collect_pdfs(papers, pdf_dir, quarantine)
+        tail_pages = self.config.get('reference_tail_pages', 4)
+        tasks = [(arxiv_id, (pdf_path, tail_pages)) for arxiv_id, pdf_path in pdf_paths.items()]
+        
+        batch_size = self.config.get('reference_batch_size', 500)
+        batch = {}
+        
+        with CitationGraph() as graph, self._create_pool(_extract_pdf_references) as pool:
+            for arxiv_id, status, result in pool.imap(tasks):
+                if status in FATAL_STATUSES:
+                    self.logger.error(f"提取参考文献失败: {arxiv_id} - {result}")
+                    quarantine.add(pdf_paths[arxiv_id], f"{status}: {result}")
+                    continue
+                
+                if status != STATUS_OK:
+                    self.logger.error(f"提取参考文献失败: {arxiv_id} - {result}")
+                    continue
+                
+                paper_map[arxiv_id]['references'] = [target for target, _ in result]
+                batch[arxiv_id] = result
+                
+                # 批量提交，减少事务开销
+                if len(batch) >= batch_size:
+                    graph.add_batch(batch)
+                    batch = {}
+            
+            graph.add_batch(batch)
+            self.logger.info(f"引用图: {graph.get_graph_info()}")
+        
+        return papers
+    
+    def _get_pdf_dir(self, date=None):
+        """获取PDF目录"""
         pdf_dir = os.path.join(
             os.path.dirname(__file__),
             '..',
@@ -31,12 +238,19 @@ class ArxivExtractor:
         )
         
         if date:
-            pdf_dir = os.path.join(pdf_dir, date)
-        else:
-            from datetime import datetime
-            pdf_dir = os.path.join(pdf_dir, datetime.now().strftime('%Y%m%d'))
+            return os.path.join(pdf_dir, date)
         
-        self.logger.info(f"从PDF文件中提取信息: {pdf_dir}")
+        from datetime import datetime
+        return os.path.join(pdf_dir, datetime.now().strftime('%Y%m%d'))
+    
+    def _collect_pdfs(self, papers, pdf_dir, quarantine):
+        """收集待处理的PDF文件，跳过缺失和已隔离的文件
+
+        Returns:
+            ({arxiv_id: paper}, {arxiv_id: pdf_path}) 元组
+        """
+        paper_map = {}
+        pdf_paths = {}
         
         for paper in papers:
             arxiv_id = paper.get('arxiv_id')
@@ -52,54 +266,173 @@ class ArxivExtractor:
                 self.logger.warning(f"PDF文件不存在: {pdf_path}")
                 continue
             
-            try:
-                self.logger.info(f"处理论文: {paper.get('title', 'Unknown')}")
-                
-                # 从PDF文件中提取文本
-                with open(pdf_path, 'rb') as file:
-                    reader = PyPDF2.PdfReader(file)
-                    text = ""
-                    # 读取前5页（摘要通常在前几页）
-                    for page_num in range(min(5, len(reader.pages))):
-                        page = reader.pages[page_num]
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text
-                
-                if not text:
-                    self.logger.warning(f"无法从PDF文件中提取文本: {arxiv_id}")
+            if quarantine.contains(pdf_path):
+                self.logger.warning(f"PDF文件已被隔离，跳过: {pdf_path}")
+                continue
+            
+            paper_map[arxiv_id] = paper
+            pdf_paths[arxiv_id] = pdf_path
+        
+        return paper_map, pdf_paths
+    
+    def _create_pool(self, func):
+        """创建PDF解析工作进程池"""
+        return SandboxedPool(
+            func,
+            max_workers=self.config.get('extract_workers', self.config.get('max_workers', 4)),
+            timeout=self.config.get('extract_timeout', 120),
+            max_rss_mb=self.config.get('extract_max_rss_mb', 1024)
+        )
+    
+    def load_full_texts(self, papers):
+        """从全文存储读取论文全文
+
+        Args:
+            papers: 论文列表
+
+        Returns:
+            {arxiv_id: 全文} 字典，只包含已写入全文存储的论文
+        """
+        arxiv_ids = [paper['arxiv_id'] for paper in papers if paper.get('fulltext_pages') and paper.get('arxiv_id')]
+        if not arxiv_ids:
+            return {}
+        with self._create_text_store() as text_store:
+            texts = {arxiv_id: text_store.get_text(arxiv_id) for arxiv_id in arxiv_ids}
+        return {arxiv_id: text for arxiv_id, text in texts.items() if text}
+    
+    def _create_text_store(self):
+        """创建全文存储"""
+        store_dir = os.path.join(
+            os.path.dirname(__file__),
+            '..',
+            self.config.get('fulltext_storage', 'data/fulltext')
+        )
+        return TextStore(store_dir)
+    
+    def _apply_text(self, paper, text):
+        """将从PDF文本中提取的标题、作者和摘要写入论文信息"""
+        # 提取标题
+        title = self._extract_title(text)
+        if title:
+            paper['title'] = title
+            self.logger.info(f"成功提取标题: {title[:50]}...")
+        
+        # 提取作者
+        authors = self._extract_authors(text)
+        if authors:
+            paper['authors'] = authors
+            self.logger.info(f"成功提取作者: {authors[:2]}...")
+        
+        # 提取摘要
+        abstract = self._extract_abstract(text)
+        if abstract:
+            paper['abstract'] = abstract
+            self.logger.info(f"成功提取摘要: {abstract[:100]}...")
+    
+    def extract_from_web(self, papers):
+        """从arXiv摘要页补全论文信息
+
+        并发抓取 /abs/<id> 页面并解析其中的 citation_* meta标签。
+        爬取数据已经完整的论文会被跳过。
+        """
+        if not papers:
+            return papers
+        
+        pending = [
+            paper for paper in papers
+            if paper.get('arxiv_id') and not self._is_complete(paper)
+        ]
+        if not pending:
+            self.logger.info("所有论文信息完整，跳过网页提取")
+            return papers
+        
+        self.logger.info(f"从网页补全论文信息: {len(pending)} 篇")
+        
+        max_workers = self.config.get('max_workers', 4)
+        session = self._create_session(max_workers)
+        
+        # 使用线程池并发抓取，所有请求共享同一个连接池
+        with session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_paper = {
+                executor.submit(self._fetch_abs_metadata, session, paper['arxiv_id']): paper
+                for paper in pending
+            }
+            
+            for future in as_completed(future_to_paper):
+                paper = future_to_paper[future]
+                try:
+                    metadata = future.result()
+                except Exception as e:
+                    self.logger.error(f"从网页提取信息失败 {paper['arxiv_id']}: {e}")
                     continue
                 
-                # 提取标题
-                title = self._extract_title(text)
-                if title:
-                    paper['title'] = title
-                    self.logger.info(f"成功提取标题: {title[:50]}...")
-                
-                # 提取作者
-                authors = self._extract_authors(text)
-                if authors:
-                    paper['authors'] = authors
-                    self.logger.info(f"成功提取作者: {authors[:2]}...")
-                
-                # 提取摘要
-                abstract = self._extract_abstract(text)
-                if abstract:
-                    paper['abstract'] = abstract
-                    self.logger.info(f"成功提取摘要: {abstract[:100]}...")
-                
-            except Exception as e:
-                self.logger.error(f"从PDF文件中提取信息失败: {arxiv_id} - {e}")
-                import traceback
-                self.logger.error(traceback.format_exc())
+                # 只补全缺失的字段，不覆盖已有数据
+                for key, value in metadata.items():
+                    if value and not paper.get(key):
+                        paper[key] = value
         
         return papers
     
-    def extract_from_web(self, papers):
-        """从网页信息中提取信息"""
-        # 这里可以实现从网页HTML中提取更详细的信息
-        # 目前我们假设爬取时已经提取了基本信息
-        return papers
+    def _is_complete(self, paper):
+        """检查论文的爬取数据是否完整"""
+        return all(paper.get(key) for key in WEB_METADATA_FIELDS)
+    
+    def _create_session(self, pool_size):
+        """创建带连接池和重试的HTTP会话"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=self.config.get('max_retries', 3),
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def _fetch_abs_metadata(self, session, arxiv_id):
+        """抓取并解析单篇论文的摘要页"""
+        url = f"{ARXIV_BASE_URL}/abs/{arxiv_id}"
+        response = session.get(url, timeout=self.config.get('timeout', 30))
+        response.raise_for_status()
+        return self._parse_citation_meta(response.text)
+    
+    def _parse_citation_meta(self, html):
+        """解析摘要页中的 citation_* meta标签"""
+        # 只解析meta标签，跳过页面其余部分
+        soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('meta'))
+        
+        meta = {}
+        authors = []
+        for tag in soup.find_all('meta'):
+            name = tag.get('name', '')
+            content = (tag.get('content') or '').strip()
+            if not name.startswith('citation_') or not content:
+                continue
+            if name == 'citation_author':
+                authors.append(self._normalize_author(content))
+            else:
+                meta.setdefault(name, content)
+        
+        published_date = meta.get('citation_date') or meta.get('citation_online_date', '')
+        
+        return {
+            'title': ' '.join(meta.get('citation_title', '').split()),
+            'authors': authors,
+            'abstract': ' '.join(meta.get('citation_abstract', '').split()),
+            'pdf_url': meta.get('citation_pdf_url', ''),
+            'published_date': published_date.replace('/', '-')
+        }
+    
+    def _normalize_author(self, name):
+        """将 "姓, 名" 格式的作者名转换为 "名 姓" 格式"""
+        if ',' in name:
+            last, first = name.split(',', 1)
+            return f"{first.strip()} {last.strip()}"
+        return name
     
     def _extract_title(self, text):
         """从文本中提取标题"""
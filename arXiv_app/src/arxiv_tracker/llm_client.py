@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM客户端模块
+
+定义分析器使用的LLM客户端接口，以及DashScope实现和用于离线压测的本地替身实现。
+"""
+
+import re
+import json
+import math
+import time
+import random
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, Optional
+
+from dashscope import Generation
+
+ARXIV_ENTRY_PATTERN = re.compile(r'\[arxiv_id: ([^\]]+)\]')
+
+ANALYSIS_FIELDS = (
+    'research_question',
+    'method_innovation',
+    'experimental_results',
+    'application_value',
+    'limitations',
+    'overall_evaluation'
+)
+
+
+class LLMResponse:
+    """统一的LLM响应"""
+
+    def __init__(self, status_code: int, text: str = "", message: str = "",
+                 usage: Optional[Dict[str, int]] = None):
+        """初始化响应
+
+        Args:
+            status_code: HTTP状态码
+            text: 响应文本
+            message: 错误信息
+            usage: token用量 {'input_tokens': int, 'output_tokens': int}
+        """
+        self.status_code = status_code
+        self.text = text
+        self.message = message
+        self.usage = usage or {}
+
+
+class LLMClient(ABC):
+    """LLM客户端接口
+
+    子类必须实现generate和stream，否则在创建实例时报错。
+    """
+
+    name = 'base'
+    supports_streaming = False
+
+    @property
+    def available(self) -> bool:
+        """客户端是否可用（例如是否配置了API密钥）"""
+        return True
+
+    @abstractmethod
+    def generate(self, model: str, prompt: str, **params) -> LLMResponse:
+        """生成完整响应
+
+        Args:
+            model: 模型名称
+            prompt: 提示词
+            **params: 采样参数（temperature、top_p、max_tokens等）
+
+        Returns:
+            LLM响应
+        """
+
+    @abstractmethod
+    def stream(self, model: str, prompt: str, **params) -> Iterator[LLMResponse]:
+        """流式生成响应
+
+        每个响应块的text为新增的文本，usage为截至当前的累计用量。
+        调用方可以随时停止迭代（关闭生成器）以提前结束生成。
+        不支持流式输出（supports_streaming为False）的后端可以把generate的结果作为唯一的响应块。
+
+        Args:
+            model: 模型名称
+            prompt: 提示词
+            **params: 采样参数
+
+        Yields:
+            响应块，出错时产生一个状态码非200的响应块后结束
+        """
+
+
+class DashScopeClient(LLMClient):
+    """DashScope客户端"""
+
+    name = 'dashscope'
+    supports_streaming = True
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+
+    @property
+    def available(self):
+        return bool(self.api_key)
+
+    @staticmethod
+    def _usage(response):
+        usage = getattr(response, 'usage', None) or {}
+        return {
+            'input_tokens': usage.get('input_tokens', 0),
+            'output_tokens': usage.get('output_tokens', 0)
+        }
+
+    def generate(self, model, prompt, **params):
+        response = Generation.call(
+            model=model,
+            prompt=prompt,
+            api_key=self.api_key,
+            **params
+        )
+
+        if response.status_code != 200:
+            return LLMResponse(response.status_code, message=response.message)
+
+        return LLMResponse(200, text=response.output.text, usage=self._usage(response))
+
+    def stream(self, model, prompt, **params):
+        responses = Generation.call(
+            model=model,
+            prompt=prompt,
+            api_key=self.api_key,
+            stream=True,
+            incremental_output=True,
+            **params
+        )
+
+        try:
+            for response in responses:
+                if response.status_code != 200:
+                    yield LLMResponse(response.status_code, message=response.message)
+                    return
+                yield LLMResponse(200, text=response.output.text or "", usage=self._usage(response))
+        finally:
+            # 提前结束时关闭底层连接，停止生成
+            close = getattr(responses, 'close', None)
+            if close:
+                close()
+
+
+class StubLLMClient(LLMClient):
+    """本地LLM替身
+
+    不访问网络，按配置的延迟分布、错误率和token数返回符合分析结果格式的JSON，
+    用于在CI等无网络环境下压测分析流程。
+    """
+
+    name = 'stub'
+    supports_streaming = True
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        """初始化替身客户端
+
+        Args:
+            options: 替身参数
+                first_token_latency: 首token延迟的中位数（秒），服从对数正态分布
+                latency_sigma: 对数正态分布的sigma
+                per_token_latency: 每个输出token的生成耗时（秒）
+                output_tokens: 每篇论文的输出token数
+                error_rate: 返回500错误的概率
+                throttle_rate: 返回429限流的概率
+                malformed_rate: 返回无法解析文本的概率
+                chatter_rate: 在JSON之后追加多余说明文字的概率
+                chatter_tokens: 多余说明文字的token数
+                chunk_tokens: 流式输出时每个响应块的token数
+                seed: 随机种子
+        """
+        options = options or {}
+        self.first_token_latency = options.get('first_token_latency', 0.5)
+        self.latency_sigma = options.get('latency_sigma', 0.3)
+        self.per_token_latency = options.get('per_token_latency', 0.01)
+        self.output_tokens = options.get('output_tokens', 600)
+        self.error_rate = options.get('error_rate', 0.0)
+        self.throttle_rate = options.get('throttle_rate', 0.0)
+        self.malformed_rate = options.get('malformed_rate', 0.0)
+        self.chatter_rate = options.get('chatter_rate', 0.0)
+        self.chatter_tokens = options.get('chatter_tokens', 200)
+        self.chunk_tokens = max(1, options.get('chunk_tokens', 8))
+
+        self._random = random.Random(options.get('seed'))
+        self._lock = threading.Lock()
+
+    def _draw(self):
+        """抽取一次调用的随机量"""
+        with self._lock:
+            return (
+                self._random.random(),
+                self._random.lognormvariate(math.log(self.first_token_latency), self.latency_sigma),
+                self._random.uniform(1.0, 10.0),
+                self._random.random() < self.chatter_rate
+            )
+
+    def _render(self, prompt, score):
+        """根据提示词生成符合格式的响应文本"""
+        # 只输出提示词中要求的字段（初筛提示只要求score）
+        analysis = {field: f"{field} (stub)" for field in ANALYSIS_FIELDS if field in prompt}
+        arxiv_ids = ARXIV_ENTRY_PATTERN.findall(prompt)
+        if not arxiv_ids:
+            analysis['score'] = round(score, 1)
+            return json.dumps(analysis, ensure_ascii=False), 1
+
+        items = [
+            dict(analysis, arxiv_id=arxiv_id, score=round((score + i) % 9 + 1, 1))
+            for i, arxiv_id in enumerate(arxiv_ids)
+        ]
+        return json.dumps(items, ensure_ascii=False), len(arxiv_ids)
+
+    def _prepare(self, prompt, params):
+        """抽取随机量并生成响应
+
+        Returns:
+            (首token延迟, 错误响应或None, 响应文本, 输出token数) 元组
+        """
+        roll, first_token, score, chatter = self._draw()
+        text, papers = self._render(prompt, score)
+        output_tokens = self.output_tokens * papers
+
+        if roll < self.error_rate:
+            return first_token, LLMResponse(500, message="stub internal error"), "", 0
+        if roll < self.error_rate + self.throttle_rate:
+            return first_token, LLMResponse(429, message="stub throttled"), "", 0
+        if roll < self.error_rate + self.throttle_rate + self.malformed_rate:
+            text = "抱歉，我无法完成这个请求。"
+        if chatter:
+            text += "\n\n以上分析仅基于标题和摘要，" + "具体结论请以论文全文为准。" * (self.chatter_tokens // 16 + 1)
+            output_tokens += self.chatter_tokens
+
+        output_tokens = min(output_tokens, params.get('max_tokens') or output_tokens)
+        return first_token, None, text, output_tokens
+
+    def generate(self, model, prompt, **params):
+        first_token, error, text, output_tokens = self._prepare(prompt, params)
+        time.sleep(first_token + output_tokens * self.per_token_latency)
+        if error:
+            return error
+
+        return LLMResponse(
+            200,
+            text=text,
+            usage={'input_tokens': len(prompt) // 2, 'output_tokens': output_tokens}
+        )
+
+    def stream(self, model, prompt, **params):
+        first_token, error, text, output_tokens = self._prepare(prompt, params)
+        time.sleep(first_token)
+        if error:
+            yield error
+            return
+
+        chunks = max(1, math.ceil(output_tokens / self.chunk_tokens))
+        for i in range(chunks):
+            start = len(text) * i // chunks
+            end = len(text) * (i + 1) // chunks
+            tokens = min(self.chunk_tokens, output_tokens - self.chunk_tokens * i)
+            time.sleep(tokens * self.per_token_latency)
+            yield LLMResponse(
+                200,
+                text=text[start:end],
+                usage={'input_tokens': len(prompt) // 2, 'output_tokens': min(output_tokens, self.chunk_tokens * (i + 1))}
+            )
+
+
+def create_llm_client(config, api_key=None) -> LLMClient:
+    """根据配置项llm_backend创建LLM客户端
+
+    Args:
+        config: 配置字典
+        api_key: DashScope API密钥
+
+    Returns:
+        LLM客户端实例
+    """
+    backend = config.get('llm_backend', 'dashscope')
+    if backend == 'stub':
+        logging.getLogger(__name__).info("使用本地LLM替身")
+        return StubLLMClient(config.get('llm_stub', {}))
+    if backend == 'dashscope':
+        return DashScopeClient(api_key)
+    raise ValueError(f"未知的LLM后端: {backend}")
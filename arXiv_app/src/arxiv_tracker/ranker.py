@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+arXiv论文相关性预排序模块
+
+在调用LLM之前，用关键词权重对标题和摘要进行本地打分（BM25风格的词频饱和
+加逆文档频率），只有排名靠前或超过阈值的论文才进入完整的LLM分析。
+"""
+
+import re
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+(?:-[a-z0-9]+)*')
+
+# BM25参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def _tokenize(text):
+    """将文本转换为小写词序列，并去掉简单的复数词尾"""
+    return [
+        token[:-1] if len(token) > 3 and token.endswith('s') and not token.endswith('ss') else token
+        for token in TOKEN_PATTERN.findall(text.lower())
+    ]
+
+
+class ArxivRanker:
+    """arXiv论文相关性预排序器"""
+
+    def __init__(self, config):
+        """初始化预排序器
+
+        配置项interest_profiles格式为 {画像名称: {关键词: 权重}}，
+        关键词可以是多词短语。
+        """
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+
+        self.profiles = self.config.get('interest_profiles', {})
+        self.top_k = self.config.get('relevance_top_k', 0)
+        self.threshold = self.config.get('relevance_threshold', 0.0)
+        self.title_weight = self.config.get('relevance_title_weight', 2)
+
+        self._build_vocabulary()
+
+    @property
+    def enabled(self):
+        return bool(self.terms)
+
+    def _build_vocabulary(self):
+        """根据兴趣画像构建关键词表和权重矩阵"""
+        self.profile_names = list(self.profiles)
+        term_index = {}
+        weights = []
+
+        for column, name in enumerate(self.profile_names):
+            for keyword, weight in self.profiles[name].items():
+                term = ' '.join(_tokenize(keyword))
+                if not term:
+                    continue
+                if term not in term_index:
+                    term_index[term] = len(term_index)
+                    weights.append([0.0] * len(self.profile_names))
+                weights[term_index[term]][column] = float(weight)
+
+        self.terms = term_index
+        self.max_ngram = max((term.count(' ') + 1 for term in term_index), default=1)
+        # 短语关键词的首词，只在这些位置尝试匹配多词短语
+        self.phrase_heads = {term.split(' ', 1)[0] for term in term_index if ' ' in term}
+        self.weights = np.array(weights, dtype=np.float32).reshape(len(term_index), len(self.profile_names))
+
+    def _document_tokens(self, paper):
+        """获取论文的词序列，标题按权重重复"""
+        title = _tokenize(paper.get('title', '') or '')
+        abstract = _tokenize(paper.get('abstract', '') or '')
+        return title * self.title_weight + abstract
+
+    def score(self, papers) -> Tuple[np.ndarray, np.ndarray]:
+        """计算论文与各兴趣画像的相关性
+
+        Args:
+            papers: 论文列表
+
+        Returns:
+            (相关性得分数组, 最匹配画像下标数组) 元组
+        """
+        n_docs = len(papers)
+        rows = []
+        cols = []
+        lengths = np.zeros(n_docs, dtype=np.float32)
+
+        # 收集命中关键词的 (论文, 关键词) 坐标
+        terms = self.terms
+        for row, paper in enumerate(papers):
+            tokens = self._document_tokens(paper)
+            lengths[row] = len(tokens)
+            for i, token in enumerate(tokens):
+                col = terms.get(token)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+                if token in self.phrase_heads:
+                    for n in range(2, self.max_ngram + 1):
+                        col = terms.get(' '.join(tokens[i:i + n]))
+                        if col is not None:
+                            rows.append(row)
+                            cols.append(col)
+
+        counts = np.zeros((n_docs, len(self.terms)), dtype=np.float32)
+        np.add.at(counts, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), 1.0)
+
+        # 逆文档频率
+        df = (counts > 0).sum(axis=0)
+        idf = np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+
+        # BM25词频饱和与长度归一化
+        avg_length = lengths.mean() if n_docs and lengths.mean() > 0 else 1.0
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths / avg_length)
+        tf = counts * (BM25_K1 + 1.0) / (counts + norm[:, None])
+
+        profile_scores = (tf * idf) @ self.weights
+        return profile_scores.max(axis=1), profile_scores.argmax(axis=1)
+
+    def select(self, papers) -> List[Dict]:
+        """为论文打分并选出需要LLM分析的论文
+
+        所有论文都会写入relevance_score；未入选的论文标记analysis_skipped。
+
+        Args:
+            papers: 论文列表
+
+        Returns:
+            需要进行LLM分析的论文列表（按原顺序）
+        """
+        if not papers or not self.enabled:
+            return papers
+
+        scores, best = self.score(papers)
+
+        selected = scores >= self.threshold
+        if self.top_k and selected.sum() > self.top_k:
+            # 稳定排序，分数相同时保持原顺序
+            order = np.argsort(-scores, kind='stable')
+            keep = np.zeros(len(papers), dtype=bool)
+            keep[order[:self.top_k]] = True
+            selected &= keep
+
+        chosen = []
+        for paper, score, profile, is_selected in zip(papers, scores, best, selected):
+            paper['relevance_score'] = round(float(score), 3)
+            if score > 0:
+                paper['relevance_profile'] = self.profile_names[profile]
+            if is_selected:
+                paper.pop('analysis_skipped', None)
+                chosen.append(paper)
+            else:
+                paper['analysis_skipped'] = True
+
+        self.logger.info(f"相关性预排序: {len(chosen)}/{len(papers)} 篇论文进入LLM分析")
+        return chosen
@@ -5,12 +5,26 @@ arXiv论文报告模块
 """
 
 import os
+import re
+import html
 import json
-import markdown
+import heapq
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict
 import logging
 
+from .utils import html_pages
+from .utils.atomic_file import atomic_write_json
+from .utils.fragment_cache import FragmentCache
+from .utils.trend_store import TrendStore, SCORE_BINS
+from .utils.report_formats import (
+    JsonlReportWriter, BinaryReportWriter, BinaryReportReader, iter_jsonl_report
+)
+
+# 报告文件写缓冲区大小
+WRITE_BUFFER_SIZE = 1024 * 1024
+
 class ArxivReporter:
     """arXiv论文报告生成器"""
     
@@ -27,8 +41,14 @@ class ArxivReporter:
         )
         os.makedirs(self.report_dir, exist_ok=True)
     
-    def generate(self, papers, date=None):
-        """生成报告"""
+    def generate(self, papers, date=None, usage=None):
+        """生成报告
+
+        Args:
+            papers: 论文列表
+            date: 报告日期 (YYYYMMDD)
+            usage: LLM用量汇总（ArxivAnalyzer.get_usage()），提供时一并写入报告目录
+        """
         if not papers:
             self.logger.warning("没有论文数据，跳过报告生成")
             return
@@ -44,49 +64,114 @@ class ArxivReporter:
         
         self.logger.info(f"报告将生到: {report_dir}")
         
-        # 生成不同格式的报告
-        self._generate_markdown_report(papers, report_dir, date)
-        self._generate_json_report(papers, report_dir, date)
-        self._generate_summary_report(papers, report_dir, date)
-    
-    def _generate_markdown_report(self, papers, report_dir, date):
-        """生成Markdown格式报告"""
-        report_date = date or datetime.now().strftime('%Y%m%d')
-        filename = f"arxiv_report_{report_date}.md"
-        filepath = os.path.join(report_dir, filename)
+        # 生成配置的各种格式的报告
+        formats = self.config.get('report_formats', ['markdown', 'json', 'summary'])
         
-        # 构建报告内容
-        content = f"""# arXiv论文分析报告
-
-生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-## 报告概览
+        # 按论文内容哈希复用上次渲染的片段，只重新渲染变化的论文
+        cache = None
+        digests = None
+        if self.config.get('report_incremental', True) and set(formats) & {'markdown', 'json', 'html'}:
+            cache = FragmentCache(os.path.join(report_dir, '.fragments'))
+            digests = [FragmentCache.digest(paper) for paper in papers]
+        
+        if 'markdown' in formats:
+            self._generate_markdown_report(papers, report_dir, date, cache, digests)
+        if 'json' in formats:
+            self._generate_json_report(papers, report_dir, date, cache, digests)
+        if 'html' in formats:
+            self._generate_html_report(papers, report_dir, date, cache, digests)
+        if 'jsonl' in formats:
+            self._generate_jsonl_report(papers, report_dir, date)
+        if 'binary' in formats:
+            self._generate_binary_report(papers, report_dir, date)
+        if 'summary' in formats:
+            self._generate_summary_report(papers, report_dir, date, usage)
+        
+        if cache is not None:
+            cache.save()
+            cache.close()
+            self.logger.info(f"报告片段: 复用 {cache.hits} 个，重新渲染 {cache.misses} 个")
+        if usage:
+            self._generate_usage_report(usage, report_dir, date)
+        if self.config.get('trends_enabled', True):
+            self._update_trends(papers, date)
+    
+    def _open_report(self, filepath):
+        """以较大的写缓冲区打开报告文件，各部分生成后直接写入"""
+        return open(filepath, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+    
+    def _iter_fragments(self, papers, kind, render, cache=None, digests=None):
+        """逐篇生成报告片段，内容未变化的论文直接使用缓存的片段
 
-- 分析论文数量: {len(papers)}
-- 分析日期: {report_date}
+        Args:
+            papers: 论文列表
+            kind: 片段类型，用于区分不同报告的缓存键
+            render: 渲染函数，接收论文返回片段文本
+            cache: 片段缓存，为None时全部重新渲染
+            digests: 与papers对应的内容哈希列表
 
-## 论文列表
+        Yields:
+            片段文本
+        """
+        for i, paper in enumerate(papers):
+            if cache is None:
+                yield render(paper)
+                continue
+            
+            key = f"{kind}:{paper.get('arxiv_id') or i}"
+            fragment = cache.get(key, digests[i])
+            if fragment is None:
+                fragment = render(paper)
+                cache.put(key, digests[i], fragment)
+            yield fragment
+    
+    @staticmethod
+    def _escape_field(value):
+        """转义字段中的HTML特殊字符（字符串和字符串列表）"""
+        if isinstance(value, str):
+            return html.escape(value)
+        if isinstance(value, list):
+            return [html.escape(item) if isinstance(item, str) else item for item in value]
+        return value
+    
+    def _format_paper_section(self, paper, escape=False):
+        """生成单篇论文的Markdown段落（不含序号，序号在拼接时添加）
 
-"""
-        
-        # 添加论文详情
-        for i, paper in enumerate(papers, 1):
-            content += f"""
-### {i}. {paper.get('title', 'Unknown Title')}
+        Args:
+            paper: 论文数据
+            escape: 是否转义字段中的HTML。生成HTML报告时必须转义，
+                Markdown转换会原样保留HTML，论文标题、摘要和LLM输出中的脚本会被浏览器执行
+        """
+        if escape:
+            paper = {key: self._escape_field(value) for key, value in paper.items()}
+        parts = [f"""{paper.get('title', 'Unknown Title')}
 
 **作者**: {', '.join(paper.get('authors', [])) if paper.get('authors') else 'Unknown'}
 **arXiv ID**: {paper.get('arxiv_id', 'Unknown')}
 **类别**: {paper.get('category', 'Unknown')}
-**评分**: {paper.get('score', 'N/A')}
-
+**评分**: {paper.get('score', 'N/A')}{'（初筛评分）' if paper.get('analysis_tier') == 'screening' else ''}
+"""]
+        
+        # 添加本地相关性得分
+        if 'relevance_score' in paper:
+            skipped = "（未进入LLM分析）" if paper.get('analysis_skipped') else ""
+            parts.append(f"""**相关性**: {paper['relevance_score']} {paper.get('relevance_profile', '')}{skipped}
+""")
+        
+        # 添加近似重复信息
+        if paper.get('duplicate_of'):
+            parts.append(f"""**近似重复**: 与 {paper['duplicate_of']} 同簇（共 {paper.get('cluster_size', 2)} 篇），分析结果沿用该论文
+""")
+        
+        parts.append(f"""
 **摘要**:
 {paper.get('abstract', 'No abstract available')}
 
-"""
-            
-            # 添加分析结果
-            if paper.get('overall_evaluation'):
-                content += f"""
+""")
+        
+        # 添加分析结果
+        if paper.get('overall_evaluation'):
+            parts.append(f"""
 **分析结果**:
 - **研究问题**: {paper.get('research_question', 'N/A')}
 - **方法创新**: {paper.get('method_innovation', 'N/A')}
@@ -95,50 +180,366 @@ class ArxivReporter:
 - **局限性**: {paper.get('limitations', 'N/A')}
 - **总体评价**: {paper.get('overall_evaluation', 'N/A')}
 
-"""
+""")
+        return ''.join(parts)
+    
+    def _format_paper_html_section(self, paper):
+        """生成单篇论文用于HTML报告的Markdown段落（字段已转义）"""
+        return self._format_paper_section(paper, escape=True)
+    
+    def _generate_markdown_report(self, papers, report_dir, date, cache=None, digests=None):
+        """生成Markdown格式报告，逐篇写入文件"""
+        report_date = date or datetime.now().strftime('%Y%m%d')
+        filename = f"arxiv_report_{report_date}.md"
+        filepath = os.path.join(report_dir, filename)
         
-        # 写入文件
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+        with self._open_report(filepath) as f:
+            f.write(f"""# arXiv论文分析报告
+
+生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+## 报告概览
+
+- 分析论文数量: {len(papers)}
+- 分析日期: {report_date}
+
+## 论文列表
+
+""")
+            
+            # 添加论文详情
+            sections = self._iter_fragments(papers, 'markdown', self._format_paper_section, cache, digests)
+            for i, section in enumerate(sections, 1):
+                f.write(f"\n### {i}. ")
+                f.write(section)
         
         self.logger.info(f"Markdown报告生成完成: {filename}")
     
-    def _generate_json_report(self, papers, report_dir, date):
-        """生成JSON格式报告"""
+    def _generate_html_report(self, papers, report_dir, date, cache=None, digests=None):
+        """生成分页HTML报告
+
+        每页html_page_size篇论文，由多个工作进程并行转换为HTML；共享的CSS和JS
+        只写入一次。启用增量生成时，内容未变化的页面不会重新渲染。
+        """
+        report_date = date or datetime.now().strftime('%Y%m%d')
+        html_dir = os.path.join(report_dir, 'html')
+        os.makedirs(html_dir, exist_ok=True)
+        html_pages.write_assets(html_dir)
+        
+        page_size = max(1, self.config.get('html_page_size', 100))
+        title = f"arXiv论文分析报告 {report_date}"
+        total_pages = (len(papers) + page_size - 1) // page_size
+        
+        sections = self._iter_fragments(papers, 'html_markdown', self._format_paper_html_section, cache, digests)
+        page_sections = []
+        page_info = []
+        tasks = []
+        for i, (paper, section) in enumerate(zip(papers, sections), 1):
+            page_sections.append({
+                'anchor': f"paper-{paper.get('arxiv_id') or i}",
+                'markdown': f"### {i}. {section}"
+            })
+            if len(page_sections) < page_size and i < len(papers):
+                continue
+            
+            page = len(page_info) + 1
+            page_info.append({
+                'papers': len(page_sections),
+                'first': papers[i - len(page_sections)].get('title', 'Unknown Title'),
+                'last': paper.get('title', 'Unknown Title')
+            })
+            filepath = os.path.join(html_dir, html_pages.page_filename(page))
+            
+            # 页面内容未变化且文件存在时跳过
+            if cache is not None:
+                digest = FragmentCache.digest([title, total_pages, page_sections])
+                if cache.get(f"html:{page}", digest) is not None and os.path.exists(filepath):
+                    page_sections = []
+                    continue
+                cache.put(f"html:{page}", digest, '')
+            
+            tasks.append((filepath, title, page, total_pages, page_sections))
+            page_sections = []
+        
+        workers = self.config.get('html_workers') or os.cpu_count() or 1
+        if len(tasks) > 1 and workers > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+                list(executor.map(html_pages.render_page, *zip(*tasks)))
+        else:
+            for task in tasks:
+                html_pages.render_page(*task)
+        
+        # 删除页数减少后多余的旧页面
+        for filename in os.listdir(html_dir):
+            match = re.match(r'page_(\d+)\.html$', filename)
+            if match and int(match.group(1)) > total_pages:
+                os.remove(os.path.join(html_dir, filename))
+        
+        html_pages.render_index(os.path.join(html_dir, 'index.html'), title, page_info)
+        self.logger.info(f"HTML报告生成完成: {total_pages} 页，重新渲染 {len(tasks)} 页")
+    
+    @staticmethod
+    def _format_paper_json(paper):
+        """序列化单篇论文，与json.dump(indent=2)中papers数组元素的格式一致"""
+        return json.dumps(paper, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+    
+    def _generate_json_report(self, papers, report_dir, date, cache=None, digests=None):
+        """生成JSON格式报告，逐篇序列化写入文件"""
         report_date = date or datetime.now().strftime('%Y%m%d')
         filename = f"arxiv_report_{report_date}.json"
         filepath = os.path.join(report_dir, filename)
         
-        # 构建报告数据
-        report_data = {
+        # 报告头部字段
+        header = {
             "generated_at": datetime.now().isoformat(),
             "report_date": report_date,
-            "total_papers": len(papers),
-            "papers": papers
+            "total_papers": len(papers)
         }
         
-        # 写入文件
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, ensure_ascii=False, indent=2)
+        with self._open_report(filepath) as f:
+            f.write("{\n")
+            for key, value in header.items():
+                f.write(f'  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},\n')
+            f.write('  "papers": [')
+            
+            # 与json.dump(indent=2)的输出格式保持一致
+            fragments = self._iter_fragments(papers, 'json', self._format_paper_json, cache, digests)
+            for i, fragment in enumerate(fragments):
+                f.write(",\n    " if i else "\n    ")
+                f.write(fragment)
+            f.write("\n  ]\n}" if papers else "]\n}")
         
         self.logger.info(f"JSON报告生成完成: {filename}")
     
-    def _generate_summary_report(self, papers, report_dir, date):
+    def _generate_jsonl_report(self, papers, report_dir, date):
+        """生成JSONL格式报告，每行一篇论文"""
+        report_date = date or datetime.now().strftime('%Y%m%d')
+        filename = f"arxiv_report_{report_date}.jsonl"
+        
+        with JsonlReportWriter(os.path.join(report_dir, filename)) as writer:
+            for paper in papers:
+                writer.write(paper)
+        
+        self.logger.info(f"JSONL报告生成完成: {filename}")
+    
+    def _generate_binary_report(self, papers, report_dir, date):
+        """生成二进制格式报告"""
+        report_date = date or datetime.now().strftime('%Y%m%d')
+        filename = f"arxiv_report_{report_date}.bin"
+        metadata = {
+            "generated_at": datetime.now().isoformat(),
+            "report_date": report_date,
+            "total_papers": len(papers)
+        }
+        
+        with BinaryReportWriter(os.path.join(report_dir, filename), metadata) as writer:
+            for paper in papers:
+                writer.write(paper)
+        
+        self.logger.info(f"二进制报告生成完成: {filename}")
+    
+    def report_dates(self):
+        """获取已有报告的日期（升序）"""
+        return sorted(
+            name for name in os.listdir(self.report_dir)
+            if re.fullmatch(r'\d{8}', name) and os.path.isdir(os.path.join(self.report_dir, name))
+        )
+    
+    def iter_papers(self, date):
+        """逐篇读取指定日期报告中的论文
+
+        依次尝试二进制、JSONL和JSON格式的报告；前两种格式逐篇解码，
+        JSON格式需要整体加载。
+
+        Args:
+            date: 报告日期 (YYYYMMDD)
+
+        Yields:
+            论文字典
+        """
+        report_dir = os.path.join(self.report_dir, date)
+        
+        binary_path = os.path.join(report_dir, f"arxiv_report_{date}.bin")
+        if os.path.exists(binary_path):
+            with BinaryReportReader(binary_path) as reader:
+                yield from reader
+            return
+        
+        jsonl_path = os.path.join(report_dir, f"arxiv_report_{date}.jsonl")
+        if os.path.exists(jsonl_path):
+            yield from iter_jsonl_report(jsonl_path)
+            return
+        
+        json_path = os.path.join(report_dir, f"arxiv_report_{date}.json")
+        if os.path.exists(json_path):
+            with open(json_path, 'r', encoding='utf-8') as f:
+                yield from json.load(f).get('papers', [])
+    
+    def _generate_usage_report(self, usage, report_dir, date):
+        """生成LLM用量统计文件"""
+        report_date = date or datetime.now().strftime('%Y%m%d')
+        filename = f"llm_usage_{report_date}.json"
+        filepath = os.path.join(report_dir, filename)
+        
+        atomic_write_json(usage, filepath, indent=2)
+        
+        self.logger.info(f"LLM用量统计生成完成: {filename}")
+    
+    def load_usage(self, date):
+        """读取指定日期的LLM用量统计
+
+        Args:
+            date: 报告日期 (YYYYMMDD)
+
+        Returns:
+            用量汇总字典，不存在时为None
+        """
+        filepath = os.path.join(self.report_dir, date, f"llm_usage_{date}.json")
+        if not os.path.exists(filepath):
+            return None
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _open_trend_store(self):
+        """打开跨日趋势聚合存储"""
+        return TrendStore(
+            os.path.join(
+                os.path.dirname(__file__),
+                '..',
+                self.config.get('trends_storage', 'data/trends'),
+                'trends.json'
+            ),
+            top_k=self.config.get('trends_top_k', 20),
+            author_limit=self.config.get('trends_author_limit', 200),
+            retention_days=self.config.get('trends_retention_days', 400)
+        )
+    
+    def _update_trends(self, papers, date):
+        """将本次报告的论文写入跨日趋势聚合"""
+        report_date = date or datetime.now().strftime('%Y%m%d')
+        self._open_trend_store().update(report_date, papers)
+        self.logger.info(f"趋势聚合已更新: {report_date}")
+    
+    def rebuild_trends(self):
+        """从已有的报告重新生成趋势聚合（只在首次启用或聚合参数变化时需要）
+
+        Returns:
+            写入的天数
+        """
+        store = self._open_trend_store()
+        store.days = {}
+        count = 0
+        for date in self.report_dates():
+            papers = list(self.iter_papers(date))
+            if papers:
+                store.update(date, papers, save=False)
+                count += 1
+        store.save()
+        self.logger.info(f"趋势聚合重建完成: {count} 天")
+        return count
+    
+    def generate_trends(self, days=7, end=None):
+        """根据趋势聚合生成最近days天的趋势报告
+
+        Args:
+            days: 窗口天数
+            end: 窗口最后一天 (YYYYMMDD)，默认为最近一次聚合的日期
+
+        Returns:
+            报告文件路径
+        """
+        limit = self.config.get('trends_report_limit', 10)
+        trends = self._open_trend_store().query(days, end, limit)
+        
+        trend_dir = os.path.join(self.report_dir, 'trends')
+        os.makedirs(trend_dir, exist_ok=True)
+        filename = f"arxiv_trends_{trends['end']}_{days}d.md"
+        filepath = os.path.join(trend_dir, filename)
+        
+        with self._open_report(filepath) as f:
+            f.write(f"""
+# arXiv论文趋势报告
+
+生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+## 统计概览
+
+- 时间范围: {trends['start']} - {trends['end']}（{days} 天，其中 {trends['active_days']} 天有报告）
+- 论文总数: {trends['papers']}
+- 有评分论文数: {trends['scored']}
+- 平均评分: {trends['avg_score']:.2f}
+
+## 每日论文数
+
+| 日期 | 论文数 | 平均评分 |
+|------|--------|----------|
+""")
+            for day in trends['daily']:
+                f.write(f"| {day['date']} | {day['papers']} | {day['avg_score']:.2f} |\n")
+            
+            f.write("""
+## 类别分布
+
+| 类别 | 论文数 |
+|------|--------|
+""")
+            for category, count in trends['categories']:
+                f.write(f"| {category} | {count} |\n")
+            
+            f.write("""
+## 评分分布
+
+| 评分 | 论文数 |
+|------|--------|
+""")
+            for low, count in enumerate(trends['score_hist']):
+                upper = ']' if low == SCORE_BINS - 1 else ')'
+                f.write(f"| [{low}, {low + 1}{upper} | {count} |\n")
+            
+            f.write(f"""
+## 评分最高的{limit}篇论文
+
+""")
+            for i, paper in enumerate(trends['top'], 1):
+                f.write(f"{i}. {paper['title']}（{paper['arxiv_id']}，{paper['category']}，{paper['date']}）评分: {paper['score']}\n")
+            
+            f.write("""
+## 高频作者
+
+""")
+            for author, count in trends['authors']:
+                f.write(f"- {author}: {count}\n")
+        
+        self.logger.info(f"趋势报告生成完成: {filename}")
+        return filepath
+    
+    def _generate_summary_report(self, papers, report_dir, date, usage=None):
         """生成摘要报告"""
         report_date = date or datetime.now().strftime('%Y%m%d')
         filename = f"arxiv_summary_{report_date}.md"
         filepath = os.path.join(report_dir, filename)
         
-        # 计算统计信息
+        # 单次遍历计算统计信息和近似重复簇
         total_papers = len(papers)
-        scored_papers = [p for p in papers if 'score' in p and p['score']]
-        avg_score = sum(p['score'] for p in scored_papers) / len(scored_papers) if scored_papers else 0
+        scored_papers = 0
+        skipped_papers = 0
+        score_sum = 0
+        clusters = {}
+        for paper in papers:
+            if paper.get('score'):
+                scored_papers += 1
+                score_sum += paper['score']
+            if paper.get('analysis_skipped'):
+                skipped_papers += 1
+            if paper.get('cluster_id'):
+                clusters.setdefault(paper['cluster_id'], []).append(paper.get('arxiv_id', 'Unknown'))
+        avg_score = score_sum / scored_papers if scored_papers else 0
         
-        # 按评分排序
-        top_papers = sorted(papers, key=lambda x: x.get('score', 0), reverse=True)[:5]
+        # 评分最高的5篇论文（与稳定降序排序后取前5篇一致）
+        top_papers = heapq.nlargest(5, papers, key=lambda x: x.get('score', 0))
         
-        # 构建报告内容
-        content = f"""
+        with self._open_report(filepath) as f:
+            f.write(f"""
 # arXiv论文分析摘要
 
 生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -146,17 +547,51 @@ class ArxivReporter:
 ## 统计概览
 
 - 分析论文总数: {total_papers}
-- 有评分论文数: {len(scored_papers)}
+- 有评分论文数: {scored_papers}
+- 相关性预排序跳过: {skipped_papers}
 - 平均评分: {avg_score:.2f}
 - 分析日期: {report_date}
 
-## 评分最高的5篇论文
+""")
+            
+            if usage:
+                f.write(f"""## LLM用量
 
-"""
-        
-        # 添加top论文
-        for i, paper in enumerate(top_papers, 1):
-            content += f"""
+- 调用次数: {usage['calls']}（缓存命中 {usage['cache_hits']}，失败 {usage['failures']}，重试 {usage['retries']}）
+- 输入tokens: {usage['input_tokens']}
+- 输出tokens: {usage['output_tokens']}
+- 调用耗时: p50 {usage['latency_p50']}s / p90 {usage['latency_p90']}s / p99 {usage['latency_p99']}s
+- 估算费用: {usage.get('cost', 0)}
+
+""")
+                tiers = usage.get('tiers', {})
+                if len(tiers) > 1:
+                    f.write("| 层级 | 调用次数 | 论文数 | 输入tokens | 输出tokens | 估算费用 | p50耗时 | p90耗时 |\n")
+                    f.write("|------|----------|--------|------------|------------|----------|---------|---------|\n")
+                    for tier, stats in tiers.items():
+                        f.write(
+                            f"| {tier} | {stats['calls']} | {stats['papers']} | {stats['input_tokens']} | "
+                            f"{stats['output_tokens']} | {stats['cost']} | {stats['latency_p50']}s | {stats['latency_p90']}s |\n"
+                        )
+                    f.write("\n")
+            
+            if clusters:
+                f.write(f"""## 近似重复论文簇
+
+共 {len(clusters)} 个簇，{sum(len(members) for members in clusters.values())} 篇论文：
+
+""")
+                for cluster_id, members in clusters.items():
+                    f.write(f"- {cluster_id}: {', '.join(members)}\n")
+                f.write("\n")
+            
+            f.write("""## 评分最高的5篇论文
+
+""")
+            
+            # 添加top论文
+            for i, paper in enumerate(top_papers, 1):
+                f.write(f"""
 ### {i}. {paper.get('title', 'Unknown Title')}
 
 **作者**: {', '.join(paper.get('authors', [])) if paper.get('authors') else 'Unknown'}
@@ -164,10 +599,6 @@ class ArxivReporter:
 **摘要**:
 {paper.get('abstract', 'No abstract available')[:200]}...
 
-"""
-        
-        # 写入文件
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+""")
         
         self.logger.info(f"摘要报告生成完成: {filename}")
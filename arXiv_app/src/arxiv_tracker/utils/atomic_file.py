@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件原子写入与加锁模块
+
+写入先落到目标文件所在目录的临时文件中，刷盘后用os.replace替换目标文件，
+进程在写入过程中被终止时目标文件保持原有内容，读取方也不会读到写了一半的文件。
+
+多个进程共享的文件通过旁边的 .lock 文件加建议锁（POSIX上为fcntl.flock，
+Windows上为msvcrt.locking），读取-修改-写入在锁内完成，进程之间不会互相覆盖修改。
+"""
+
+import os
+import json
+import stat
+import tempfile
+import contextlib
+from typing import Any, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# 新建文件的默认权限（mkstemp创建的临时文件权限为0600）
+DEFAULT_FILE_MODE = 0o644
+
+@contextlib.contextmanager
+def atomic_write(filepath: str, mode: str = 'w', encoding: str = 'utf-8', fsync: bool = True):
+    """原子写入文件
+
+    with块正常结束时替换目标文件，发生异常时删除临时文件，目标文件不变。
+
+    Args:
+        filepath: 目标文件路径
+        mode: 打开模式，'w' 或 'wb'
+        encoding: 文本模式下的编码
+        fsync: 替换前是否将数据刷到磁盘
+
+    Yields:
+        临时文件对象
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(filepath)}.", suffix='.tmp', dir=directory)
+
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+
+        # 保留目标文件原有的权限
+        try:
+            file_mode = stat.S_IMODE(os.stat(filepath).st_mode)
+        except FileNotFoundError:
+            file_mode = DEFAULT_FILE_MODE
+        os.chmod(tmp_path, file_mode)
+
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+    if fsync and fcntl is not None:
+        # 目录项也刷到磁盘，断电后不会丢失替换
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+
+def atomic_write_json(data: Any, filepath: str, fsync: bool = True, **kwargs):
+    """原子写入JSON文件
+
+    Args:
+        data: 数据
+        filepath: 文件路径
+        fsync: 替换前是否将数据刷到磁盘
+        **kwargs: 传给json.dump的参数，默认ensure_ascii=False
+    """
+    kwargs.setdefault('ensure_ascii', False)
+    with atomic_write(filepath, fsync=fsync) as f:
+        json.dump(data, f, **kwargs)
+
+@contextlib.contextmanager
+def file_lock(filepath: str, shared: bool = False):
+    """对文件加建议锁
+
+    锁加在 filepath + '.lock' 上，目标文件本身可以被原子替换。
+    同一进程内的不同线程各自打开锁文件，也会互相阻塞。
+
+    Args:
+        filepath: 要保护的文件路径
+        shared: 是否加共享锁（Windows上始终为排他锁）
+    """
+    lock_path = f"{filepath}.lock"
+    os.makedirs(os.path.dirname(os.path.abspath(lock_path)), exist_ok=True)
+
+    with open(lock_path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def read_json(filepath: str, default: Any = None) -> Any:
+    """读取JSON文件，文件不存在时返回default
+
+    Args:
+        filepath: 文件路径
+        default: 默认值
+
+    Returns:
+        数据
+    """
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+def update_json(filepath: str, func: Callable[[Any], Any], default: Optional[Callable[[], Any]] = None,
+                **kwargs) -> Any:
+    """在锁内读取JSON文件、修改并原子写回
+
+    Args:
+        filepath: 文件路径
+        func: 修改函数，参数为文件中的最新数据（原地修改），返回值被忽略
+        default: 文件不存在时生成初始数据的函数，默认为空字典
+        **kwargs: 传给json.dump的参数
+
+    Returns:
+        写入的数据
+    """
+    with file_lock(filepath):
+        data = read_json(filepath)
+        if data is None:
+            data = default() if default else {}
+        func(data)
+        atomic_write_json(data, filepath, **kwargs)
+    return data
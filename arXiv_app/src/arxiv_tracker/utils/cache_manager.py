@@ -2,149 +2,317 @@
 # -*- coding: utf-8 -*-
 """
 缓存管理模块
+
+缓存条目保存在SQLite数据库（WAL模式）中，每个条目有独立的过期时间，
+条目数超过上限时按最近访问时间淘汰。写入和访问时间的更新先在内存中
+累积，达到批量大小或调用save()/close()时在一个事务中提交。多个进程可以
+同时使用同一个缓存数据库，由SQLite的文件锁保证事务互不覆盖。
 """
 
 import os
 import json
 import time
+import atexit
+import sqlite3
 import logging
+import threading
 from typing import Dict, Any, Optional
 
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries (expires_at);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at);
+"""
+
+# 永不过期条目的过期时间
+NEVER_EXPIRES = float('inf')
+
+# 待提交队列中表示删除的标记
+_DELETED = object()
+
 class CacheManager:
     """缓存管理器"""
-    
-    def __init__(self, cache_file=None, ttl=86400):
+
+    def __init__(self, cache_file=None, ttl=86400, max_entries=10000, batch_size=100):
         """初始化缓存管理器
-        
+
         Args:
-            cache_file: 缓存文件路径
-            ttl: 缓存过期时间（秒）
+            cache_file: 缓存数据库路径
+            ttl: 默认的条目过期时间（秒），0表示永不过期
+            max_entries: 条目数上限，超过后按最近访问时间淘汰，0表示不限制
+            batch_size: 累积多少次写入后提交一次
         """
         self.logger = logging.getLogger(__name__)
         self.ttl = ttl
-        
+        self.max_entries = max_entries
+        self.batch_size = max(1, batch_size)
+
         if cache_file:
             self.cache_file = cache_file
         else:
-            # 默认缓存文件路径
+            # 默认缓存数据库路径
             self.cache_file = os.path.join(
                 os.path.dirname(__file__),
                 '..',
                 'data',
                 'cache',
-                'cache.json'
+                'cache.db'
             )
-        
+
         # 确保目录存在
         os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-        
-        # 加载缓存
-        self.cache = self._load_cache()
-    
-    def _load_cache(self):
-        """加载缓存"""
+
+        self._lock = threading.RLock()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'commits': 0}
+
+        # 待提交的写入 {key: (value, expires_at) 或 _DELETED} 和访问时间 {key: accessed_at}
+        self._pending = {}
+        self._touched = {}
+
+        # 多个进程共享数据库时，等待其他进程的写事务结束而不是立即报错
+        self.conn = sqlite3.connect(self.cache_file, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+        self._migrate_json()
+
+        # 进程退出前提交未写入的条目
+        atexit.register(self.save)
+
+    def _migrate_json(self):
+        """导入旧版本的cache.json（只在数据库为空时导入一次）"""
+        legacy_file = os.path.join(os.path.dirname(self.cache_file), 'cache.json')
+        if not os.path.exists(legacy_file):
+            return
+        if self.conn.execute("SELECT 1 FROM entries LIMIT 1").fetchone():
+            return
+
         try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # 检查缓存是否过期
-                    if 'timestamp' in data:
-                        if time.time() - data['timestamp'] < self.ttl:
-                            return data.get('data', {})
-                        else:
-                            self.logger.info("缓存已过期，将重新加载")
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         except Exception as e:
-            self.logger.error(f"加载缓存失败: {e}")
-        
-        # 返回空缓存
-        return {}
-    
+            self.logger.error(f"读取旧缓存文件失败: {e}")
+            return
+
+        # 旧格式对整个文件使用同一个时间戳
+        expires_at = self._expires_at(self.ttl, data.get('timestamp', time.time()))
+        if expires_at <= time.time():
+            return
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(key, json.dumps(value, ensure_ascii=False), expires_at, now)
+                 for key, value in data.get('data', {}).items()]
+            )
+        self.logger.info(f"已导入旧缓存文件: {legacy_file}")
+
+    @staticmethod
+    def _expires_at(ttl, now):
+        return now + ttl if ttl else NEVER_EXPIRES
+
     def save(self):
-        """保存缓存"""
-        try:
-            data = {
-                'timestamp': time.time(),
-                'data': self.cache
-            }
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            self.logger.info(f"缓存已保存到: {self.cache_file}")
-        except Exception as e:
-            self.logger.error(f"保存缓存失败: {e}")
-    
+        """提交待写入的条目和访问时间，并淘汰过期和超出上限的条目"""
+        with self._lock:
+            if not self._pending and not self._touched:
+                return
+            pending, self._pending = self._pending, {}
+            touched, self._touched = self._touched, {}
+
+            try:
+                with self.conn:
+                    deletes = [(key,) for key, entry in pending.items() if entry is _DELETED]
+                    if deletes:
+                        self.conn.executemany("DELETE FROM entries WHERE key = ?", deletes)
+
+                    now = time.time()
+                    upserts = [
+                        (key, entry[0], entry[1], touched.pop(key, now))
+                        for key, entry in pending.items() if entry is not _DELETED
+                    ]
+                    if upserts:
+                        self.conn.executemany(
+                            "INSERT OR REPLACE INTO entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                            upserts
+                        )
+                    if touched:
+                        self.conn.executemany(
+                            "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                            [(accessed_at, key) for key, accessed_at in touched.items()]
+                        )
+
+                    self.conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+                    if self.max_entries and upserts:
+                        cursor = self.conn.execute(
+                            "DELETE FROM entries WHERE key IN ("
+                            "SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                            (self.max_entries,)
+                        )
+                        self.stats['evictions'] += max(0, cursor.rowcount)
+                self.stats['commits'] += 1
+            except sqlite3.Error as e:
+                self.logger.error(f"保存缓存失败: {e}")
+
+    def _maybe_save(self):
+        if len(self._pending) + len(self._touched) >= self.batch_size:
+            self.save()
+
     def get(self, key: str, default: Any = None) -> Any:
         """获取缓存值
-        
+
         Args:
             key: 键
             default: 默认值
-        
+
         Returns:
             缓存值
         """
-        return self.cache.get(key, default)
-    
-    def set(self, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is _DELETED:
+                self.stats['misses'] += 1
+                return default
+            if entry is None:
+                row = self.conn.execute(
+                    "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.stats['misses'] += 1
+                    return default
+                entry = row
+
+            value, expires_at = entry
+            if expires_at <= now:
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                self._pending[key] = _DELETED
+                self._maybe_save()
+                return default
+
+            self.stats['hits'] += 1
+            self._touched[key] = now
+            self._maybe_save()
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
         """设置缓存值
-        
+
         Args:
             key: 键
-            value: 值
+            value: 值（可JSON序列化）
+            ttl: 该条目的过期时间（秒），默认使用缓存的ttl，0表示永不过期
         """
-        self.cache[key] = value
-        self.save()
-    
+        data = json.dumps(value, ensure_ascii=False)
+        expires_at = self._expires_at(self.ttl if ttl is None else ttl, time.time())
+        with self._lock:
+            self._pending[key] = (data, expires_at)
+            self._maybe_save()
+
     def delete(self, key: str):
         """删除缓存值
-        
+
         Args:
             key: 键
         """
-        if key in self.cache:
-            del self.cache[key]
-            self.save()
-    
+        with self._lock:
+            self._pending[key] = _DELETED
+            self._touched.pop(key, None)
+            self._maybe_save()
+
     def clear(self):
         """清空缓存"""
-        self.cache = {}
-        self.save()
-    
+        with self._lock:
+            self._pending = {}
+            self._touched = {}
+            with self.conn:
+                self.conn.execute("DELETE FROM entries")
+
     def exists(self, key: str) -> bool:
-        """检查键是否存在
-        
+        """检查键是否存在（未过期）
+
         Args:
             key: 键
-        
+
         Returns:
             是否存在
         """
-        return key in self.cache
-    
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is _DELETED:
+                return False
+            if entry is None:
+                entry = self.conn.execute(
+                    "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+            return entry is not None and entry[1] > time.time()
+
     def get_cache_size(self) -> int:
         """获取缓存大小
-        
+
         Returns:
-            缓存项数量
+            缓存项数量（未过期）
         """
-        return len(self.cache)
-    
+        self.save()
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM entries WHERE expires_at > ?", (time.time(),)
+            ).fetchone()[0]
+
     def get_cache_info(self) -> Dict[str, Any]:
         """获取缓存信息
-        
+
         Returns:
-            缓存信息
+            缓存信息，包括命中、未命中、过期和淘汰次数
         """
+        size = self.get_cache_size()
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
         return {
-            'size': self.get_cache_size(),
+            'size': size,
             'file': self.cache_file,
-            'ttl': self.ttl
+            'ttl': self.ttl,
+            'max_entries': self.max_entries,
+            'hit_rate': round(stats['hits'] / lookups, 4) if lookups else 0.0,
+            **stats
         }
 
+    def close(self):
+        """提交未写入的条目并关闭数据库"""
+        self.save()
+        atexit.unregister(self.save)
+        with self._lock:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
-def get_cache_manager():
+
+def get_cache_manager(config=None):
     """获取缓存管理器实例
-    
+
+    Args:
+        config: 系统配置，提供时使用其中的cache_ttl、cache_max_entries和cache_batch_size
+
     Returns:
         缓存管理器实例
     """
-    return CacheManager()
+    if not config:
+        return CacheManager()
+    return CacheManager(
+        ttl=config.get('cache_ttl', 86400),
+        max_entries=config.get('cache_max_entries', 10000),
+        batch_size=config.get('cache_batch_size', 100)
+    )
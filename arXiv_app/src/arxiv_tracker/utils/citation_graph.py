@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+引用图模块
+
+以紧凑的边表保存论文之间的引用关系，按引用方（source）和被引方（target）
+分别建立索引，正向和反向查询都不需要扫描整张表。
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    id TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS citations (
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    PRIMARY KEY (source, target)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_citations_target ON citations (target, source);
+"""
+
+class CitationGraph:
+    """论文引用图"""
+
+    def __init__(self, db_file=None):
+        """初始化引用图
+
+        Args:
+            db_file: 数据库文件路径
+        """
+        self.logger = logging.getLogger(__name__)
+
+        if db_file:
+            self.db_file = db_file
+        else:
+            # 默认数据库文件路径
+            self.db_file = os.path.join(
+                os.path.dirname(__file__),
+                '..',
+                'data',
+                'cache',
+                'citations.db'
+            )
+
+        # 确保目录存在
+        os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_batch(self, references: Dict[str, Iterable[Tuple[str, str]]]):
+        """批量写入引用关系，同一引用方的旧记录会被替换
+
+        Args:
+            references: {source: [(target, kind), ...]} 字典
+        """
+        if not references:
+            return
+
+        with self._lock, self.conn:
+            sources = [(source,) for source in references]
+            self.conn.executemany("INSERT OR IGNORE INTO nodes (id) VALUES (?)", sources)
+            self.conn.executemany("DELETE FROM citations WHERE source = ?", sources)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO citations (source, target, kind) VALUES (?, ?, ?)",
+                (
+                    (source, target, kind)
+                    for source, targets in references.items()
+                    for target, kind in targets
+                    if target != source
+                )
+            )
+
+    def references(self, source: str) -> List[str]:
+        """获取论文引用的全部目标
+
+        Args:
+            source: 引用方论文ID
+
+        Returns:
+            被引目标列表
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT target FROM citations WHERE source = ?", (source,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def cited_by(self, target: str) -> List[str]:
+        """获取引用了指定目标的论文
+
+        Args:
+            target: 被引目标（arXiv ID或doi:前缀的DOI）
+
+        Returns:
+            引用方论文ID列表
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT source FROM citations WHERE target = ?", (target,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def in_corpus_references(self, source: str) -> List[str]:
+        """获取论文引用的、且已被收录的论文
+
+        Args:
+            source: 引用方论文ID
+
+        Returns:
+            已收录的被引论文ID列表
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT c.target FROM citations c JOIN nodes n ON n.id = c.target "
+                "WHERE c.source = ?",
+                (source,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def citation_count(self, target: str) -> int:
+        """获取目标被引用的次数
+
+        Args:
+            target: 被引目标
+
+        Returns:
+            被引次数
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*) FROM citations WHERE target = ?", (target,)
+            ).fetchone()
+        return row[0]
+
+    def get_graph_info(self) -> Dict[str, int]:
+        """获取引用图信息
+
+        Returns:
+            引用图信息
+        """
+        with self._lock:
+            nodes = self.conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+            edges = self.conn.execute("SELECT COUNT(*) FROM citations").fetchone()[0]
+        return {
+            'nodes': nodes,
+            'edges': edges,
+            'file': self.db_file
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+
+def get_citation_graph():
+    """获取引用图实例
+
+    Returns:
+        引用图实例
+    """
+    return CitationGraph()
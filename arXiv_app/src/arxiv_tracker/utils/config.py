@@ -8,18 +8,79 @@ import os
 import json
 from typing import Dict, Any
 
+from .atomic_file import atomic_write_json
+
 DEFAULT_CONFIG = {
     "data_dir": "src/arxiv_tracker/data",
     "pdf_storage": "src/arxiv_tracker/data/papers",
     "report_storage": "src/arxiv_tracker/data/reports",
     "cache_storage": "src/arxiv_tracker/data/cache",
     "log_dir": "src/arxiv_tracker/data/logs",
+    "fulltext_storage": "src/arxiv_tracker/data/fulltext",
     "categories": ["cs.AI", "cs.LG"],
     "max_workers": 4,
     "timeout": 30,
     "max_retries": 3,
     "cache_ttl": 86400,
-    "default_paper_count": 10
+    "cache_max_entries": 10000,
+    "cache_batch_size": 100,
+    "default_paper_count": 10,
+    "extract_workers": 4,
+    "extract_timeout": 120,
+    "extract_max_rss_mb": 1024,
+    "extract_full_text": False,
+    "reference_tail_pages": 4,
+    "reference_batch_size": 500,
+    "analysis_concurrency": 4,
+    "analysis_rpm": 60,
+    "analysis_tpm": 0,
+    "analysis_throttle_backoff": 10,
+    "llm_cache_enabled": True,
+    "llm_cache_ttl": 2592000,
+    "llm_cache_max_mb": 512,
+    "analysis_batch_size": 1,
+    "analysis_batch_token_budget": 6000,
+    "analysis_batch_output_tokens": 600,
+    "interest_profiles": {},
+    "relevance_top_k": 0,
+    "relevance_threshold": 0.0,
+    "relevance_title_weight": 2,
+    "llm_backoff_base": 1.0,
+    "llm_backoff_max": 30.0,
+    "circuit_failure_threshold": 5,
+    "circuit_reset_timeout": 60,
+    "analysis_requeue_passes": 1,
+    "circuit_max_wait": 300,
+    "llm_backend": "dashscope",
+    "llm_stub": {},
+    "llm_streaming": True,
+    "analysis_model": "qwen-plus",
+    "analysis_max_tokens": 2000,
+    "screening_enabled": False,
+    "screening_model": "qwen-turbo",
+    "screening_max_tokens": 32,
+    "screening_threshold": 6.0,
+    # 模型单价（每千token），用于用量统计中的费用估算
+    "llm_prices": {
+        "qwen-plus": {"input": 0.0008, "output": 0.002},
+        "qwen-turbo": {"input": 0.0003, "output": 0.0006}
+    },
+    "cluster_enabled": False,
+    "cluster_threshold": 0.85,
+    "cluster_dim": 2048,
+    "cluster_ngram": 2,
+    "cluster_block_size": 1024,
+    "report_formats": ["markdown", "json", "summary"],
+    "report_incremental": True,
+    "html_page_size": 100,
+    "html_workers": 0,
+    "trends_enabled": True,
+    "trends_storage": "src/arxiv_tracker/data/trends",
+    "trends_top_k": 20,
+    "trends_author_limit": 200,
+    "trends_retention_days": 400,
+    "trends_report_limit": 10,
+    "journal_batch_size": 50
 }
 
 def load_config(config_path=None) -> Dict[str, Any]:
@@ -56,7 +117,7 @@ def load_config(config_path=None) -> Dict[str, Any]:
                 config.update(system_config)
     
     # 确保路径是相对路径
-    for key in ['data_dir', 'pdf_storage', 'report_storage', 'cache_storage', 'log_dir']:
+    for key in ['data_dir', 'pdf_storage', 'report_storage', 'cache_storage', 'log_dir', 'fulltext_storage', 'trends_storage']:
         if config.get(key) and not config.get(key).startswith('src/'):
             # 如果是绝对路径，转换为相对路径
             config[key] = os.path.relpath(config[key], os.path.dirname(__file__))
@@ -70,8 +131,7 @@ def save_config(config: Dict[str, Any], config_path: str):
         config: 配置字典
         config_path: 保存路径
     """
-    with open(config_path, 'w', encoding='utf-8') as f:
-        json.dump(config, f, ensure_ascii=False, indent=2)
+    atomic_write_json(config, config_path, indent=2)
 
 def get_config_path() -> str:
     """获取配置文件路径
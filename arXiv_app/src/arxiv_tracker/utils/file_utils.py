@@ -10,6 +10,8 @@ import logging
 import json
 from typing import List, Dict, Any, Optional
 
+from .atomic_file import atomic_write, atomic_write_json
+
 class FileUtils:
     """文件工具类"""
     
@@ -31,7 +33,7 @@ class FileUtils:
             return False
     
     def write_json(self, data: Any, filepath: str, indent: int = 2):
-        """写入JSON文件
+        """写入JSON文件（原子替换，写入中断时原文件不变）
         
         Args:
             data: 数据
@@ -45,8 +47,7 @@ class FileUtils:
             # 确保目录存在
             self.ensure_dir(os.path.dirname(filepath))
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=indent)
+            atomic_write_json(data, filepath, indent=indent)
             self.logger.info(f"JSON文件已写入: {filepath}")
             return True
         except Exception as e:
@@ -74,7 +75,7 @@ class FileUtils:
             return None
     
     def write_text(self, content: str, filepath: str):
-        """写入文本文件
+        """写入文本文件（原子替换，写入中断时原文件不变）
         
         Args:
             content: 内容
@@ -87,7 +88,7 @@ class FileUtils:
             # 确保目录存在
             self.ensure_dir(os.path.dirname(filepath))
             
-            with open(filepath, 'w', encoding='utf-8') as f:
+            with atomic_write(filepath) as f:
                 f.write(content)
             self.logger.info(f"文本文件已写入: {filepath}")
             return True
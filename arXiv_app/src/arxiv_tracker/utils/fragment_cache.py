@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+报告片段缓存模块
+
+按论文内容哈希缓存已渲染的报告片段。重新生成报告时，只有内容发生变化的
+论文需要重新渲染，其余片段直接从缓存中取出拼接。
+
+目录结构:
+    fragments.dat   追加写入的片段文本（UTF-8）
+    index.json      {片段键: [内容哈希, 偏移, 长度]}
+
+片段文本通过内存映射按需读取，加载缓存时只需读取较小的索引。
+失效片段占用的空间超过有效片段时，保存时会重写数据文件。
+"""
+
+import os
+import json
+import mmap
+import hashlib
+import logging
+from typing import Any, Optional
+
+from .atomic_file import atomic_write_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+INDEX_FILENAME = 'index.json'
+DATA_FILENAME = 'fragments.dat'
+
+class FragmentCache:
+    """报告片段缓存"""
+
+    def __init__(self, cache_dir: str):
+        """加载片段缓存
+
+        Args:
+            cache_dir: 缓存目录
+        """
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.index_file = os.path.join(cache_dir, INDEX_FILENAME)
+        self.data_file = os.path.join(cache_dir, DATA_FILENAME)
+
+        self.index = {}
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"加载报告片段缓存失败，将重新渲染: {e}")
+
+        self._map = None
+        if self.index and os.path.exists(self.data_file) and os.path.getsize(self.data_file):
+            with open(self.data_file, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.index = {}
+
+        self._writer = None
+        self._used = set()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(obj: Any) -> str:
+        """计算对象内容的哈希值"""
+        if orjson is not None:
+            payload = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+        else:
+            payload = json.dumps(obj, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.sha1(payload).hexdigest()
+
+    def get(self, key: str, digest: str) -> Optional[str]:
+        """获取片段，内容哈希不一致时视为未命中
+
+        Args:
+            key: 片段键
+            digest: 当前内容哈希
+
+        Returns:
+            片段文本，未命中时为None
+        """
+        self._used.add(key)
+        entry = self.index.get(key)
+        if entry is None or entry[0] != digest or self._map is None or entry[1] + entry[2] > len(self._map):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._map[entry[1]:entry[1] + entry[2]].decode('utf-8')
+
+    def put(self, key: str, digest: str, fragment: str):
+        """追加写入片段"""
+        if self._writer is None:
+            self._writer = open(self.data_file, 'ab')
+        data = fragment.encode('utf-8')
+        offset = self._writer.tell()
+        self._writer.write(data)
+
+        self._used.add(key)
+        self.index[key] = [digest, offset, len(data)]
+        self._dirty = True
+
+    def save(self):
+        """删除本次未使用的片段并保存索引（没有变化时不写入）"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+        stale = [key for key in self.index if key not in self._used]
+        for key in stale:
+            del self.index[key]
+        if not self._dirty and not stale:
+            return
+
+        live_bytes = sum(entry[2] for entry in self.index.values())
+        if os.path.getsize(self.data_file) > 2 * live_bytes:
+            self._compact()
+
+        atomic_write_json(self.index, self.index_file, fsync=False)
+        self._dirty = False
+
+    def _compact(self):
+        """只保留有效片段，重写数据文件"""
+        with open(self.data_file, 'rb') as f:
+            data = f.read()
+
+        tmp_path = f"{self.data_file}.tmp"
+        with open(tmp_path, 'wb') as f:
+            for entry in self.index.values():
+                offset = f.tell()
+                f.write(data[entry[1]:entry[1] + entry[2]])
+                entry[1] = offset
+
+        self.close()
+        os.replace(tmp_path, self.data_file)
+
+    def close(self):
+        """关闭内存映射和写入句柄"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分页HTML报告模块
+
+将每页论文的Markdown段落转换为独立的HTML页面，页面共享同一份CSS和JS，
+并生成只包含分页链接的索引页。render_page可以在工作进程中调用。
+所有页面都先写入临时文件再替换，渲染中断时不会留下不完整的页面。
+"""
+
+import os
+import html
+from typing import Dict, List
+
+import markdown
+
+from .atomic_file import atomic_write
+
+ASSET_DIR = 'assets'
+PAGE_TEMPLATE = 'page_{:04d}.html'
+
+# 需要禁用的Markdown链接和图片语法
+LINK_PATTERNS = ('reference', 'link', 'image_link', 'image_reference', 'short_reference',
+                 'short_image_ref', 'autolink', 'automail')
+
+STYLESHEET = """body { font-family: -apple-system, "Segoe UI", "PingFang SC", "Microsoft YaHei", sans-serif;
+       max-width: 960px; margin: 0 auto; padding: 1em 2em; line-height: 1.6; color: #222; }
+nav { display: flex; gap: 1em; align-items: center; padding: .5em 0; border-bottom: 1px solid #ddd; }
+nav input { flex: 1; padding: .3em .5em; }
+.paper { border-bottom: 1px solid #eee; padding: .5em 0 1em; }
+.paper.hidden { display: none; }
+table { border-collapse: collapse; width: 100%; }
+th, td { border: 1px solid #ddd; padding: .3em .6em; text-align: left; }
+"""
+
+SCRIPT = """document.addEventListener('DOMContentLoaded', function () {
+  var input = document.getElementById('filter');
+  if (!input) return;
+  var papers = document.querySelectorAll('.paper');
+  input.addEventListener('input', function () {
+    var query = input.value.trim().toLowerCase();
+    papers.forEach(function (paper) {
+      paper.classList.toggle('hidden', query && paper.textContent.toLowerCase().indexOf(query) < 0);
+    });
+  });
+});
+"""
+
+_DOCUMENT = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<link rel="stylesheet" href="{assets}/report.css">
+<script src="{assets}/report.js" defer></script>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+def page_filename(page: int) -> str:
+    """获取第page页（从1开始）的文件名"""
+    return PAGE_TEMPLATE.format(page)
+
+
+def write_assets(html_dir: str):
+    """写入共享的CSS和JS，内容未变化时不重复写入"""
+    asset_dir = os.path.join(html_dir, ASSET_DIR)
+    os.makedirs(asset_dir, exist_ok=True)
+    for filename, content in (('report.css', STYLESHEET), ('report.js', SCRIPT)):
+        filepath = os.path.join(asset_dir, filename)
+        if os.path.exists(filepath):
+            with open(filepath, 'r', encoding='utf-8') as f:
+                if f.read() == content:
+                    continue
+        with atomic_write(filepath, fsync=False) as f:
+            f.write(content)
+
+
+def _navigation(page, total_pages, with_filter=True):
+    links = ['<a href="index.html">索引</a>']
+    if page > 1:
+        links.append(f'<a href="{page_filename(page - 1)}">上一页</a>')
+    links.append(f'<span>第 {page} / {total_pages} 页</span>')
+    if page < total_pages:
+        links.append(f'<a href="{page_filename(page + 1)}">下一页</a>')
+    if with_filter:
+        links.append('<input id="filter" type="search" placeholder="筛选本页论文">')
+    return f"<nav>{''.join(links)}</nav>"
+
+
+def render_page(filepath: str, title: str, page: int, total_pages: int, sections: List[Dict[str, str]]) -> str:
+    """渲染一页论文并写入文件
+
+    Args:
+        filepath: 输出文件路径
+        title: 页面标题
+        page: 页码（从1开始）
+        total_pages: 总页数
+        sections: 论文段落列表，每项包含anchor（锚点）和markdown（段落Markdown，
+            其中来自论文和LLM的字段必须已转义HTML）
+
+    Returns:
+        输出文件路径
+    """
+    # 报告中的字段逐行排列，保留单个换行
+    converter = markdown.Markdown(extensions=['nl2br'])
+    # 报告段落中没有链接和图片，禁用这些语法，避免论文内容生成javascript:链接
+    for pattern in LINK_PATTERNS:
+        converter.inlinePatterns.deregister(pattern, strict=False)
+    parts = [f"<h1>{html.escape(title)}</h1>", _navigation(page, total_pages)]
+    for section in sections:
+        converter.reset()
+        parts.append(f'<section class="paper" id="{html.escape(section["anchor"], quote=True)}">')
+        parts.append(converter.convert(section['markdown']))
+        parts.append('</section>')
+    parts.append(_navigation(page, total_pages, with_filter=False))
+
+    with atomic_write(filepath, fsync=False) as f:
+        f.write(_DOCUMENT.format(title=html.escape(title), assets=ASSET_DIR, body='\n'.join(parts)))
+    return filepath
+
+
+def render_index(filepath: str, title: str, pages: List[Dict]):
+    """生成索引页
+
+    Args:
+        filepath: 输出文件路径
+        title: 页面标题
+        pages: 每页的摘要信息，包含papers（论文数）、first（首篇标题）、last（末篇标题）
+    """
+    rows = [
+        f'<tr><td><a href="{page_filename(i)}">第 {i} 页</a></td><td>{info["papers"]}</td>'
+        f'<td>{html.escape(info["first"])}</td><td>{html.escape(info["last"])}</td></tr>'
+        for i, info in enumerate(pages, 1)
+    ]
+    body = (
+        f"<h1>{html.escape(title)}</h1>\n"
+        f"<p>共 {sum(info['papers'] for info in pages)} 篇论文，{len(pages)} 页</p>\n"
+        "<table>\n<tr><th>页码</th><th>论文数</th><th>首篇</th><th>末篇</th></tr>\n"
+        + '\n'.join(rows)
+        + "\n</table>"
+    )
+    with atomic_write(filepath, fsync=False) as f:
+        f.write(_DOCUMENT.format(title=html.escape(title), assets=ASSET_DIR, body=body))
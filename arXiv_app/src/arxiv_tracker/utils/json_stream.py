@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量JSON解析模块
+
+在LLM流式输出过程中逐块解析响应里的第一个JSON对象或数组，
+每当一个顶层字段（或数组元素）完整到达时立即解码，
+使调用方可以在所需字段齐全后提前结束读取。
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+class IncrementalJSONParser:
+    """流式JSON解析器
+
+    跳过JSON之前的说明文字或代码块标记，只解析第一个顶层对象或数组。
+    每个字符只扫描一次。
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields: Dict[str, Any] = {}
+        self.items: List[Any] = []
+        self.container: Optional[str] = None
+        self.done = False
+
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key = None
+        self._key_start = -1
+        self._value_start = -1
+
+    def feed(self, chunk: str) -> int:
+        """追加一段响应文本
+
+        Args:
+            chunk: 新到达的文本
+
+        Returns:
+            本次新完成的顶层字段（或数组元素）数量
+        """
+        if self.done:
+            return 0
+
+        self.buffer += chunk
+        completed = 0
+        buffer = self.buffer
+
+        while self._pos < len(buffer):
+            char = buffer[self._pos]
+            pos = self._pos
+            self._pos += 1
+
+            if self.container is None:
+                if char in '{[':
+                    self.container = char
+                    self._start = pos
+                    self._depth = 1
+                    if char == '[':
+                        self._value_start = pos + 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self.container == '{' and self._value_start < 0:
+                        # 对象的键
+                        self._key = self._decode(buffer[self._key_start:pos + 1])
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self.container == '{' and self._value_start < 0:
+                    self._key_start = pos
+            elif char == ':' and self._depth == 1 and self.container == '{':
+                self._value_start = pos + 1
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    completed += self._finish_value(buffer[self._value_start:pos])
+                    self.done = True
+                    break
+            elif char == ',' and self._depth == 1:
+                completed += self._finish_value(buffer[self._value_start:pos])
+                if self.container == '[':
+                    self._value_start = pos + 1
+
+        return completed
+
+    @staticmethod
+    def _decode(text):
+        try:
+            return json.loads(text)
+        except ValueError:
+            return None
+
+    def _finish_value(self, text):
+        """解码一个完整的顶层值"""
+        key = self._key
+        self._key = None
+        if self.container == '{':
+            self._value_start = -1
+        if not text.strip():
+            return 0
+
+        value = self._decode(text)
+        if self.container == '{':
+            if key is None:
+                return 0
+            self.fields[key] = value
+        else:
+            self.items.append(value)
+        return 1
+
+    def text(self) -> str:
+        """获取已解析部分的JSON文本
+
+        解析完成时返回原始JSON片段；提前结束时返回由已完成字段重新生成的JSON。
+        尚未遇到JSON时返回原始缓冲区。
+        """
+        if self.done:
+            return self.buffer[self._start:self._pos]
+        if self.container == '{':
+            return json.dumps(self.fields, ensure_ascii=False)
+        if self.container == '[':
+            return json.dumps(self.items, ensure_ascii=False)
+        return self.buffer
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM响应缓存模块
+
+以模型、提示词和采样参数的哈希为键，将LLM响应文本缓存到磁盘。
+每个条目单独存放一个文件（按哈希前两位分目录），支持按条目过期和
+按总大小进行LRU淘汰。
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+class LLMResponseCache:
+    """磁盘LLM响应缓存"""
+
+    def __init__(self, cache_dir=None, ttl=30 * 86400, max_bytes=512 * 1024 * 1024):
+        """初始化响应缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttl: 条目过期时间（秒），0表示永不过期
+            max_bytes: 缓存总大小上限（字节），超过后按最近访问时间淘汰
+        """
+        self.logger = logging.getLogger(__name__)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        if cache_dir:
+            self.cache_dir = cache_dir
+        else:
+            # 默认缓存目录
+            self.cache_dir = os.path.join(
+                os.path.dirname(__file__),
+                '..',
+                'data',
+                'cache',
+                'llm'
+            )
+
+        # 确保目录存在
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+
+        # 条目大小索引 {key: bytes}
+        self._sizes = self._scan()
+        self._total_bytes = sum(self._sizes.values())
+
+    @staticmethod
+    def make_key(model: str, prompt: str, params: Dict[str, Any]) -> str:
+        """计算缓存键
+
+        Args:
+            model: 模型名称
+            prompt: 提示词
+            params: 采样参数（temperature、top_p、max_tokens等）
+
+        Returns:
+            缓存键（sha256十六进制）
+        """
+        payload = json.dumps(
+            {'model': model, 'prompt': prompt, 'params': params},
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _scan(self):
+        """扫描缓存目录，建立条目大小索引"""
+        sizes = {}
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.json'):
+                    sizes[entry.name[:-5]] = entry.stat().st_size
+        return sizes
+
+    def get(self, model: str, prompt: str, params: Dict[str, Any]) -> Optional[str]:
+        """获取缓存的响应文本
+
+        Args:
+            model: 模型名称
+            prompt: 提示词
+            params: 采样参数
+
+        Returns:
+            响应文本，未命中时为None
+        """
+        key = self.make_key(model, prompt, params)
+        path = self._path(key)
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+
+        if self.ttl and time.time() - entry.get('created_at', 0) > self.ttl:
+            self._remove(key)
+            with self._lock:
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+            return None
+
+        # 更新访问时间，供LRU淘汰使用
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.stats['hits'] += 1
+        return entry.get('text')
+
+    def set(self, model: str, prompt: str, params: Dict[str, Any], text: str):
+        """写入响应文本
+
+        Args:
+            model: 模型名称
+            prompt: 提示词
+            params: 采样参数
+            text: 响应文本
+        """
+        key = self.make_key(model, prompt, params)
+        path = self._path(key)
+        data = json.dumps(
+            {'created_at': time.time(), 'model': model, 'text': text},
+            ensure_ascii=False
+        ).encode('utf-8')
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.error(f"写入LLM响应缓存失败: {e}")
+            return
+
+        with self._lock:
+            self._total_bytes += len(data) - self._sizes.get(key, 0)
+            self._sizes[key] = len(data)
+            over_limit = self.max_bytes and self._total_bytes > self.max_bytes
+
+        if over_limit:
+            self._evict()
+
+    def _remove(self, key):
+        """删除单个条目"""
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+        with self._lock:
+            self._total_bytes -= self._sizes.pop(key, 0)
+
+    def _evict(self):
+        """按最近访问时间淘汰条目，直到总大小降到上限的90%"""
+        target = self.max_bytes * 0.9
+        with self._lock:
+            keys = list(self._sizes)
+
+        entries = []
+        for key in keys:
+            try:
+                entries.append((os.path.getmtime(self._path(key)), key))
+            except OSError:
+                entries.append((0, key))
+        entries.sort()
+
+        evicted = 0
+        for _, key in entries:
+            if self._total_bytes <= target:
+                break
+            self._remove(key)
+            evicted += 1
+
+        with self._lock:
+            self.stats['evictions'] += evicted
+        self.logger.info(f"LLM响应缓存淘汰 {evicted} 个条目")
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            keys = list(self._sizes)
+        for key in keys:
+            self._remove(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息
+
+        Returns:
+            命中、未命中、过期、淘汰次数及命中率等信息
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+            stats['entries'] = len(self._sizes)
+            stats['bytes'] = self._total_bytes
+        return stats
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM用量统计模块
+
+逐次记录LLM调用的模型、输入/输出token数、耗时、重试次数和缓存状态，
+并按运行汇总为总量、分位数和直方图，用于容量规划和预算估算。
+"""
+
+import math
+import time
+import bisect
+import threading
+from typing import Any, Dict, List, Optional
+
+# 直方图分桶上界，最后一个桶收集超过最大上界的值
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 30, 60)
+TOKEN_BUCKETS = (256, 512, 1024, 2048, 4096, 8192)
+
+CACHE_HIT = 'hit'
+CACHE_MISS = 'miss'
+CACHE_DISABLED = 'disabled'
+
+STATUS_OK = 'ok'
+STATUS_FAILED = 'failed'
+STATUS_REJECTED = 'rejected'
+
+
+def _histogram(values, buckets):
+    """按分桶上界统计直方图
+
+    Returns:
+        {"<=上界": 数量, ">最大上界": 数量} 字典
+    """
+    counts = [0] * (len(buckets) + 1)
+    for value in values:
+        counts[bisect.bisect_left(buckets, value)] += 1
+
+    histogram = {f"<={bound}": count for bound, count in zip(buckets, counts)}
+    histogram[f">{buckets[-1]}"] = counts[-1]
+    return histogram
+
+
+def percentile(sorted_values, q):
+    """计算已排序数值的分位数（最近秩法）
+
+    Args:
+        sorted_values: 已排序的数值序列
+        q: 百分位（0-100）
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LLMUsageRecorder:
+    """线程安全的LLM调用记录器"""
+
+    def __init__(self, prices: Optional[Dict[str, Dict[str, float]]] = None):
+        """初始化记录器
+
+        Args:
+            prices: 模型单价 {模型名称: {'input': 每千输入token价格, 'output': 每千输出token价格}}，
+                未配置单价的模型不计算费用
+        """
+        self.prices = prices or {}
+        self._lock = threading.Lock()
+        self._records = []  # type: List[Dict[str, Any]]
+        self.started_at = time.time()
+
+    def reset(self):
+        """清空记录，开始新的一轮统计"""
+        with self._lock:
+            self._records = []
+            self.started_at = time.time()
+
+    def record(self, model: str, input_tokens: int = 0, output_tokens: int = 0,
+               latency: float = 0.0, retries: int = 0, cache: str = CACHE_MISS,
+               status: str = STATUS_OK, papers: int = 1, tier: str = 'full'):
+        """记录一次逻辑调用（包含其全部重试）
+
+        Args:
+            model: 模型名称
+            input_tokens: 输入token数（所有尝试合计）
+            output_tokens: 输出token数（所有尝试合计）
+            latency: 总耗时（秒），包括重试等待
+            retries: 重试次数
+            cache: 缓存状态 hit/miss/disabled
+            status: 调用结果 ok/failed/rejected
+            papers: 本次调用分析的论文数
+            tier: 分析层级（screening/full）
+        """
+        entry = {
+            'timestamp': time.time(),
+            'model': model,
+            'input_tokens': int(input_tokens),
+            'output_tokens': int(output_tokens),
+            'latency': round(latency, 4),
+            'retries': retries,
+            'cache': cache,
+            'status': status,
+            'papers': papers,
+            'tier': tier
+        }
+        with self._lock:
+            self._records.append(entry)
+
+    def get_records(self) -> List[Dict[str, Any]]:
+        """获取全部调用记录"""
+        with self._lock:
+            return list(self._records)
+
+    def _cost(self, record):
+        """按模型单价计算一次调用的费用"""
+        price = self.prices.get(record['model'])
+        if not price:
+            return 0.0
+        return (
+            record['input_tokens'] / 1000.0 * price.get('input', 0.0)
+            + record['output_tokens'] / 1000.0 * price.get('output', 0.0)
+        )
+
+    def _summarize(self, records):
+        """汇总一组调用记录"""
+        uncached = [r for r in records if r['cache'] != CACHE_HIT and r['status'] != STATUS_REJECTED]
+        latencies = sorted(r['latency'] for r in uncached)
+        return {
+            'calls': len(records),
+            'papers': sum(r['papers'] for r in records),
+            'cache_hits': sum(1 for r in records if r['cache'] == CACHE_HIT),
+            'failures': sum(1 for r in records if r['status'] == STATUS_FAILED),
+            'rejected': sum(1 for r in records if r['status'] == STATUS_REJECTED),
+            'retries': sum(r['retries'] for r in records),
+            'input_tokens': sum(r['input_tokens'] for r in records),
+            'output_tokens': sum(r['output_tokens'] for r in records),
+            'cost': round(sum(self._cost(r) for r in records), 6),
+            'latency_total': round(sum(latencies), 3),
+            'latency_p50': round(percentile(latencies, 50), 3),
+            'latency_p90': round(percentile(latencies, 90), 3),
+            'latency_p99': round(percentile(latencies, 99), 3)
+        }
+
+    def get_summary(self) -> Dict[str, Any]:
+        """获取本轮运行的用量汇总
+
+        缓存命中和被熔断拒绝的调用计入次数，但不计入耗时分布。
+
+        Returns:
+            包含总量、分位数、按模型和按层级分组统计以及直方图的字典
+        """
+        records = self.get_records()
+        summary = self._summarize(records)
+
+        for group, field in (('models', 'model'), ('tiers', 'tier')):
+            grouped = {}
+            for record in records:
+                grouped.setdefault(record[field], []).append(record)
+            summary[group] = {name: self._summarize(items) for name, items in grouped.items()}
+
+        uncached = [r for r in records if r['cache'] != CACHE_HIT and r['status'] != STATUS_REJECTED]
+        summary['histograms'] = {
+            'latency': _histogram([r['latency'] for r in uncached], LATENCY_BUCKETS),
+            'input_tokens': _histogram([r['input_tokens'] for r in uncached], TOKEN_BUCKETS),
+            'output_tokens': _histogram([r['output_tokens'] for r in uncached], TOKEN_BUCKETS)
+        }
+        summary['started_at'] = self.started_at
+        summary['elapsed'] = round(time.time() - self.started_at, 3)
+        return summary
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+论文元数据存储模块
+
+所有处理过的论文及其分析结果保存在一个SQLite数据库中，按arxiv_id唯一，
+并按类别、日期和评分建立索引。按条件查询论文（如某季度某类别评分高于8的论文）
+只需要走索引，不需要解析历史报告文件。
+
+常用字段单独成列，其余字段以JSON保存在data列中。同一篇论文再次写入时，
+评分和data列替换为新写入的数据（例如重新分析成功后不再保留analysis_failed），
+与最近一次生成的报告保持一致；日期保留首次写入的值，标题等元数据缺失时保留原值。
+
+标题、摘要、分析结果和PDF全文同时写入FTS5全文索引，写入时只重新索引
+文本发生变化的论文。检索结果按BM25排序（标题权重最高），支持短语查询，
+并可以按类别和日期过滤。
+"""
+
+import os
+import re
+import json
+import hashlib
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    id INTEGER PRIMARY KEY,
+    arxiv_id TEXT NOT NULL UNIQUE,
+    date TEXT NOT NULL,
+    category TEXT,
+    title TEXT,
+    authors TEXT,
+    abstract TEXT,
+    score REAL,
+    data TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_papers_date ON papers (date);
+CREATE INDEX IF NOT EXISTS idx_papers_category_date ON papers (category, date, score);
+CREATE INDEX IF NOT EXISTS idx_papers_category_score ON papers (category, score);
+CREATE INDEX IF NOT EXISTS idx_papers_score ON papers (score);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+    title, abstract, analysis, body,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TABLE IF NOT EXISTS papers_fts_state (
+    id INTEGER PRIMARY KEY,
+    text_digest TEXT NOT NULL,
+    body_digest TEXT NOT NULL
+);
+"""
+
+# 全文索引中各列（标题、摘要、分析结果、全文）的BM25权重
+FTS_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+# 写入全文索引analysis列的分析字段
+ANALYSIS_TEXT_FIELDS = (
+    'research_question',
+    'method_innovation',
+    'experimental_results',
+    'application_value',
+    'limitations',
+    'overall_evaluation'
+)
+
+# 检索语句中的短语、布尔运算符和普通词
+_QUERY_TOKEN = re.compile(r'"[^"]*"|\S+')
+_QUERY_OPERATORS = {'AND', 'OR', 'NOT'}
+
+# 单独成列的字段，其余字段保存在data列中
+COLUMN_FIELDS = ('arxiv_id', 'date', 'category', 'title', 'authors', 'abstract', 'score')
+
+# 可用于排序的列
+ORDER_COLUMNS = {
+    'score': 'score DESC, date DESC, id',
+    'date': 'date DESC, id',
+    'arxiv_id': 'arxiv_id'
+}
+
+_UPSERT = """
+INSERT INTO papers (arxiv_id, date, category, title, authors, abstract, score, data, first_seen, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (arxiv_id) DO UPDATE SET
+    category = COALESCE(excluded.category, papers.category),
+    title = COALESCE(excluded.title, papers.title),
+    authors = COALESCE(excluded.authors, papers.authors),
+    abstract = COALESCE(excluded.abstract, papers.abstract),
+    score = excluded.score,
+    data = excluded.data,
+    updated_at = excluded.updated_at
+"""
+
+_SELECT = "SELECT arxiv_id, date, category, title, authors, abstract, score, data FROM papers"
+
+
+class PaperStore:
+    """论文元数据存储"""
+
+    def __init__(self, db_file=None):
+        """初始化论文存储
+
+        Args:
+            db_file: 数据库文件路径
+        """
+        self.logger = logging.getLogger(__name__)
+
+        if db_file:
+            self.db_file = db_file
+        else:
+            # 默认数据库文件路径
+            self.db_file = os.path.join(
+                os.path.dirname(__file__),
+                '..',
+                'data',
+                'papers.db'
+            )
+
+        # 确保目录存在
+        os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(
+            "INSERT INTO papers_fts (papers_fts, rank) VALUES ('rank', ?)",
+            (f"bm25({', '.join(map(str, FTS_WEIGHTS))})",)
+        )
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _to_row(paper, date, now):
+        extra = {key: value for key, value in paper.items() if key not in COLUMN_FIELDS}
+        score = paper.get('score')
+        authors = paper.get('authors')
+        return (
+            paper['arxiv_id'],
+            date or paper.get('crawl_date') or time.strftime('%Y%m%d'),
+            paper.get('category') or None,
+            paper.get('title') or None,
+            json.dumps(authors, ensure_ascii=False) if authors else None,
+            paper.get('abstract') or None,
+            float(score) if isinstance(score, (int, float)) and not isinstance(score, bool) else None,
+            json.dumps(extra, ensure_ascii=False, default=str),
+            now,
+            now
+        )
+
+    @staticmethod
+    def _from_row(row):
+        arxiv_id, date, category, title, authors, abstract, score, data = row
+        paper = json.loads(data)
+        paper.update(arxiv_id=arxiv_id, date=date)
+        if category is not None:
+            paper['category'] = category
+        if title is not None:
+            paper['title'] = title
+        if authors is not None:
+            paper['authors'] = json.loads(authors)
+        if abstract is not None:
+            paper['abstract'] = abstract
+        if score is not None:
+            paper['score'] = score
+        return paper
+
+    def upsert(self, papers: Iterable[Dict[str, Any]], date: Optional[str] = None,
+               texts: Optional[Dict[str, str]] = None) -> int:
+        """批量写入论文并更新全文索引（单个事务）
+
+        Args:
+            papers: 论文列表
+            date: 论文所属日期 (YYYYMMDD)，默认使用论文的crawl_date；已存在的论文保留首次写入的日期
+                已存在的论文的评分和其余字段被替换为本次写入的数据
+            texts: 可选的 {arxiv_id: PDF全文}，未提供的论文保留已索引的全文
+
+        Returns:
+            写入的论文数
+        """
+        now = time.time()
+        rows = [self._to_row(paper, date, now) for paper in papers if paper.get('arxiv_id')]
+        if not rows:
+            return 0
+        with self._lock, self.conn:
+            self.conn.executemany(_UPSERT, rows)
+            self._index([row[0] for row in rows], texts or {})
+        return len(rows)
+
+    @staticmethod
+    def _digest(*parts):
+        return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    def _index(self, arxiv_ids, texts, force=False):
+        """重新索引文本发生变化的论文（在事务中调用）
+
+        Args:
+            arxiv_ids: 论文ID列表
+            texts: {arxiv_id: PDF全文}
+            force: 是否忽略摘要哈希，全部重新索引
+        """
+        for start in range(0, len(arxiv_ids), 500):
+            chunk = arxiv_ids[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT p.id, p.arxiv_id, p.title, p.abstract, p.data, s.text_digest, s.body_digest "
+                f"FROM papers p LEFT JOIN papers_fts_state s ON s.id = p.id WHERE p.arxiv_id IN ({placeholders})",
+                chunk
+            ).fetchall()
+
+            for rowid, arxiv_id, title, abstract, data, text_digest, body_digest in rows:
+                extra = json.loads(data)
+                analysis = '\n'.join(str(extra[field]) for field in ANALYSIS_TEXT_FIELDS if extra.get(field))
+                new_text_digest = self._digest(title or '', abstract or '', analysis)
+                body = texts.get(arxiv_id)
+                new_body_digest = (body_digest or '') if body is None else self._digest(body)
+                if not force and new_text_digest == text_digest and new_body_digest == body_digest:
+                    continue
+
+                if text_digest is not None:
+                    if body is None:
+                        row = self.conn.execute("SELECT body FROM papers_fts WHERE rowid = ?", (rowid,)).fetchone()
+                        body = row[0] if row else None
+                    self.conn.execute("DELETE FROM papers_fts WHERE rowid = ?", (rowid,))
+                self.conn.execute(
+                    "INSERT INTO papers_fts (rowid, title, abstract, analysis, body) VALUES (?, ?, ?, ?, ?)",
+                    (rowid, title, abstract, analysis, body)
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO papers_fts_state (id, text_digest, body_digest) VALUES (?, ?, ?)",
+                    (rowid, new_text_digest, new_body_digest)
+                )
+
+    def rebuild_index(self) -> int:
+        """根据已存储的论文重新生成全文索引（保留已索引的全文）
+
+        Returns:
+            索引的论文数
+        """
+        with self._lock, self.conn:
+            arxiv_ids = [arxiv_id for (arxiv_id,) in self.conn.execute("SELECT arxiv_id FROM papers")]
+            self._index(arxiv_ids, {}, force=True)
+            self.conn.execute("INSERT INTO papers_fts (papers_fts) VALUES ('optimize')")
+        return len(arxiv_ids)
+
+    @staticmethod
+    def build_match(query: str) -> str:
+        """将用户输入转换为FTS5查询语句
+
+        双引号括起的部分作为短语；AND、OR、NOT作为布尔运算符；以*结尾的词按前缀匹配；
+        其余词分别加引号（词中的双引号按FTS5的规则写成两个），避免连字符、点号等字符
+        被解释为FTS5语法。
+
+        Raises:
+            ValueError: 查询以NOT开头（FTS5没有单独的排除查询）或运算符连续出现
+        """
+        def quote(term):
+            return '"' + term.replace('"', '""') + '"'
+
+        terms = []
+        for token in _QUERY_TOKEN.findall(query):
+            if token in _QUERY_OPERATORS:
+                if not terms and token == 'NOT':
+                    raise ValueError("检索词不能以NOT开头，请在NOT之前给出要检索的词，例如: graph NOT image")
+                if terms and terms[-1] in _QUERY_OPERATORS:
+                    raise ValueError(f"运算符不能连续出现: {terms[-1]} {token}")
+                terms.append(token)
+            elif token.startswith('"'):
+                phrase = token.strip('"').replace('"', '')
+                if phrase:
+                    terms.append(quote(phrase))
+            elif token.endswith('*') and len(token) > 1:
+                terms.append(quote(token[:-1]) + '*')
+            else:
+                terms.append(quote(token))
+        # 开头的AND/OR和结尾的运算符没有作用对象，直接忽略
+        while terms and terms[0] in _QUERY_OPERATORS:
+            terms.pop(0)
+        while terms and terms[-1] in _QUERY_OPERATORS:
+            terms.pop()
+        return ' '.join(terms)
+
+    def search(self, query: str, category: Optional[str] = None, since: Optional[str] = None,
+               until: Optional[str] = None, min_score: Optional[float] = None,
+               limit: int = 20, raw: bool = False) -> List[Dict[str, Any]]:
+        """全文检索论文
+
+        Args:
+            query: 检索词，支持"短语"、AND/OR/NOT和前缀*
+            category: 论文类别
+            since: 起始日期 (YYYYMMDD，含)
+            until: 结束日期 (YYYYMMDD，含)
+            min_score: 最低评分（含）
+            limit: 返回数量上限
+            raw: 为True时query直接作为FTS5查询语句使用
+
+        Returns:
+            按相关性排序的论文列表，每篇论文附带rank（BM25，越小越相关）和snippet（命中片段）
+        """
+        match = query if raw else self.build_match(query)
+        if not match:
+            return []
+        clauses, params = self._filters(category, since, until, min_score, prefix='p.')
+        with self._lock:
+            if since or until:
+                # 日期范围内论文的id范围，让FTS5只扫描这一段rowid，而不是为所有匹配的论文计算相关性
+                date_clauses, date_params = self._filters(since=since, until=until)
+                low, high = self.conn.execute(
+                    f"SELECT MIN(id), MAX(id) FROM papers WHERE {' AND '.join(date_clauses)}", date_params
+                ).fetchone()
+                if low is None:
+                    return []
+                clauses.append("papers_fts.rowid BETWEEN ? AND ?")
+                params += [low, high]
+
+            sql = (
+                "SELECT p.arxiv_id, p.date, p.category, p.title, p.authors, p.abstract, p.score, p.data, "
+                "papers_fts.rank, snippet(papers_fts, -1, '[', ']', '...', 16) "
+                "FROM papers_fts JOIN papers p ON p.id = papers_fts.rowid "
+                f"WHERE {' AND '.join(['papers_fts MATCH ?', *clauses])} "
+                "ORDER BY papers_fts.rank LIMIT ?"
+            )
+            rows = self.conn.execute(sql, [match, *params, limit]).fetchall()
+
+        papers = []
+        for row in rows:
+            paper = self._from_row(row[:8])
+            paper['rank'] = round(row[8], 4)
+            paper['snippet'] = row[9]
+            papers.append(paper)
+        return papers
+
+    def get(self, arxiv_id: str) -> Optional[Dict[str, Any]]:
+        """按arxiv_id获取论文，不存在时为None"""
+        with self._lock:
+            row = self.conn.execute(f"{_SELECT} WHERE arxiv_id = ?", (arxiv_id,)).fetchone()
+        return None if row is None else self._from_row(row)
+
+    def seen(self, arxiv_ids: Iterable[str]) -> Set[str]:
+        """获取已存储的arxiv_id集合
+
+        Args:
+            arxiv_ids: 待检查的arxiv_id列表
+
+        Returns:
+            其中已存储的arxiv_id集合
+        """
+        arxiv_ids = list(arxiv_ids)
+        found = set()
+        with self._lock:
+            # SQLite限制单条语句的参数数量，分批查询
+            for start in range(0, len(arxiv_ids), 500):
+                chunk = arxiv_ids[start:start + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                found.update(
+                    arxiv_id for (arxiv_id,) in self.conn.execute(
+                        f"SELECT arxiv_id FROM papers WHERE arxiv_id IN ({placeholders})", chunk
+                    )
+                )
+        return found
+
+    @staticmethod
+    def _filters(category=None, since=None, until=None, min_score=None, max_score=None, prefix=''):
+        """生成过滤条件
+
+        Returns:
+            (条件列表, 参数列表) 元组
+        """
+        clauses = []
+        params = []
+        if category:
+            clauses.append(f"{prefix}category = ?")
+            params.append(category)
+        if since:
+            clauses.append(f"{prefix}date >= ?")
+            params.append(since)
+        if until:
+            clauses.append(f"{prefix}date <= ?")
+            params.append(until)
+        if min_score is not None:
+            clauses.append(f"{prefix}score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append(f"{prefix}score <= ?")
+            params.append(max_score)
+        return clauses, params
+
+    @classmethod
+    def _where(cls, *args):
+        clauses, params = cls._filters(*args)
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def query(self, category: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+              min_score: Optional[float] = None, max_score: Optional[float] = None,
+              order_by: str = 'score', limit: Optional[int] = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """按条件查询论文
+
+        Args:
+            category: 论文类别
+            since: 起始日期 (YYYYMMDD，含)
+            until: 结束日期 (YYYYMMDD，含)
+            min_score: 最低评分（含）
+            max_score: 最高评分（含）
+            order_by: 排序方式：score（评分降序）、date（日期降序）或arxiv_id
+            limit: 返回数量上限，None表示不限制
+            offset: 跳过的数量
+
+        Returns:
+            论文列表
+        """
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(f"不支持的排序方式: {order_by}")
+        where, params = self._where(category, since, until, min_score, max_score)
+        sql = f"{_SELECT}{where} ORDER BY {ORDER_COLUMNS[order_by]} LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def count(self, category: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+              min_score: Optional[float] = None, max_score: Optional[float] = None) -> int:
+        """统计符合条件的论文数，参数同query()"""
+        where, params = self._where(category, since, until, min_score, max_score)
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM papers{where}", params).fetchone()[0]
+
+    def close(self):
+        """关闭数据库"""
+        with self._lock:
+            self.conn.close()
+
+
+def get_paper_store(config=None):
+    """获取论文存储实例
+
+    Args:
+        config: 系统配置，提供时数据库为其中data_dir目录下的papers.db
+
+    Returns:
+        论文存储实例
+    """
+    if not config:
+        return PaperStore()
+    return PaperStore(os.path.join(
+        os.path.dirname(__file__),
+        '..',
+        '..',
+        config.get('data_dir', 'data'),
+        'papers.db'
+    ))
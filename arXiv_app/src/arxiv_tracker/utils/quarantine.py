@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+隔离列表模块
+
+记录导致提取进程超时、超内存或崩溃的PDF文件，后续运行将跳过这些文件。
+多个进程同时修改隔离列表时，修改在文件锁内合并到文件中的最新内容。
+"""
+
+import os
+import logging
+from datetime import datetime
+
+from .atomic_file import atomic_write_json, file_lock, read_json, update_json
+
+class QuarantineList:
+    """PDF隔离列表"""
+
+    def __init__(self, quarantine_file=None):
+        """初始化隔离列表
+
+        Args:
+            quarantine_file: 隔离列表文件路径
+        """
+        self.logger = logging.getLogger(__name__)
+
+        if quarantine_file:
+            self.quarantine_file = quarantine_file
+        else:
+            # 默认隔离列表文件路径
+            self.quarantine_file = os.path.join(
+                os.path.dirname(__file__),
+                '..',
+                'data',
+                'cache',
+                'quarantine.json'
+            )
+
+        # 确保目录存在
+        os.makedirs(os.path.dirname(self.quarantine_file), exist_ok=True)
+
+        # 加载隔离列表
+        self.entries = self._load()
+
+    def _load(self):
+        """加载隔离列表"""
+        try:
+            entries = read_json(self.quarantine_file)
+            if entries is not None:
+                return entries
+        except Exception as e:
+            self.logger.error(f"加载隔离列表失败: {e}")
+
+        return {}
+
+    def save(self):
+        """保存隔离列表（覆盖文件中的内容）"""
+        try:
+            with file_lock(self.quarantine_file):
+                atomic_write_json(self.entries, self.quarantine_file, indent=2)
+        except Exception as e:
+            self.logger.error(f"保存隔离列表失败: {e}")
+
+    def _update(self, func):
+        """在锁内修改文件中的最新隔离列表，并更新内存中的列表"""
+        try:
+            self.entries = update_json(self.quarantine_file, func, indent=2)
+        except Exception as e:
+            func(self.entries)
+            self.logger.error(f"保存隔离列表失败: {e}")
+
+    @staticmethod
+    def _key(pdf_path):
+        return os.path.abspath(pdf_path)
+
+    def contains(self, pdf_path):
+        """检查文件是否被隔离
+
+        文件大小发生变化（例如重新下载）时视为新文件，不再跳过。
+
+        Args:
+            pdf_path: PDF文件路径
+
+        Returns:
+            是否被隔离
+        """
+        entry = self.entries.get(self._key(pdf_path))
+        if not entry:
+            return False
+
+        try:
+            return os.path.getsize(pdf_path) == entry.get('size')
+        except OSError:
+            return True
+
+    def add(self, pdf_path, reason):
+        """将文件加入隔离列表
+
+        Args:
+            pdf_path: PDF文件路径
+            reason: 隔离原因
+        """
+        try:
+            size = os.path.getsize(pdf_path)
+        except OSError:
+            size = None
+
+        entry = {
+            'reason': reason,
+            'size': size,
+            'quarantined_at': datetime.now().isoformat()
+        }
+        key = self._key(pdf_path)
+        self._update(lambda entries: entries.__setitem__(key, entry))
+        self.logger.warning(f"文件已隔离: {pdf_path} ({reason})")
+
+    def remove(self, pdf_path):
+        """将文件移出隔离列表
+
+        Args:
+            pdf_path: PDF文件路径
+        """
+        key = self._key(pdf_path)
+        if key in self.entries:
+            self._update(lambda entries: entries.pop(key, None))
+
+    def clear(self):
+        """清空隔离列表"""
+        self._update(lambda entries: entries.clear())
+
+    def list(self):
+        """获取所有隔离条目
+
+        Returns:
+            隔离条目字典
+        """
+        return dict(self.entries)
+
+
+def get_quarantine_list():
+    """获取隔离列表实例
+
+    Returns:
+        隔离列表实例
+    """
+    return QuarantineList()
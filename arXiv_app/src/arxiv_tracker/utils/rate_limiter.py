@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+速率限制模块
+
+按服务商的每分钟请求数（RPM）和每分钟token数（TPM）限制发起请求的节奏，
+并支持在收到限流响应后整体暂停一段时间。
+"""
+
+import time
+import logging
+import threading
+
+class RateLimiter:
+    """线程安全的请求速率限制器"""
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        """初始化速率限制器
+
+        Args:
+            requests_per_minute: 每分钟最大请求数，0表示不限制
+            tokens_per_minute: 每分钟最大token数，0表示不限制
+        """
+        self.logger = logging.getLogger(__name__)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+        self._lock = threading.Lock()
+        self._next_request = 0.0
+        self._paused_until = 0.0
+        self._tokens = float(tokens_per_minute)
+        self._refilled_at = time.monotonic()
+
+    def _refill(self, now):
+        """按时间补充token桶"""
+        if not self.tokens_per_minute:
+            return
+        elapsed = now - self._refilled_at
+        self._tokens = min(
+            float(self.tokens_per_minute),
+            self._tokens + elapsed * self.tokens_per_minute / 60.0
+        )
+        self._refilled_at = now
+
+    def acquire(self, tokens: int = 0) -> float:
+        """阻塞直到允许发起一次请求
+
+        Args:
+            tokens: 本次请求预计消耗的token数
+
+        Returns:
+            等待的秒数
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                delay = max(0.0, self._paused_until - now, self._next_request - now)
+
+                # 单次请求超过桶容量时按桶容量计算，避免永远等待
+                needed = min(tokens, self.tokens_per_minute) if self.tokens_per_minute else 0
+                if needed > self._tokens:
+                    delay = max(delay, (needed - self._tokens) * 60.0 / self.tokens_per_minute)
+
+                if delay <= 0:
+                    if self.requests_per_minute:
+                        self._next_request = now + 60.0 / self.requests_per_minute
+                    self._tokens -= needed
+                    return waited
+
+            time.sleep(delay)
+            waited += delay
+
+    def backoff(self, seconds: float):
+        """暂停所有请求一段时间（例如收到限流响应后）
+
+        Args:
+            seconds: 暂停秒数
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.logger.warning(f"触发服务商限流，暂停请求 {seconds:.1f} 秒")
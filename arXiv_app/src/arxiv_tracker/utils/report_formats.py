@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+报告文件格式模块
+
+提供两种便于下游程序反复读取的报告格式：
+
+- JSONL：每行一篇论文，可追加写入，可逐行读取
+- 二进制：文件头之后是一条条带长度前缀的记录，记录用msgpack编码
+  （未安装msgpack时退回紧凑JSON），读取时逐条解码，也可以跳过记录而不解码
+
+安装了orjson或msgpack时使用它们进行编码和解码，否则使用标准库json。
+"""
+
+import json
+import struct
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# 二进制报告文件头：魔数、版本号、记录编码
+BINARY_MAGIC = b'ARXR'
+BINARY_VERSION = 1
+CODEC_MSGPACK = b'm'
+CODEC_JSON = b'j'
+
+_HEADER = struct.Struct('<4sB1s')
+_LENGTH = struct.Struct('<I')
+
+# 文件读写缓冲区大小
+BUFFER_SIZE = 1024 * 1024
+
+
+def _dumps_json(obj) -> bytes:
+    """将对象编码为单行UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _loads_json(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class JsonlReportWriter:
+    """JSONL报告写入器，每行一篇论文"""
+
+    def __init__(self, filepath: str, append: bool = False):
+        """打开报告文件
+
+        Args:
+            filepath: 文件路径
+            append: 是否追加到已有文件末尾
+        """
+        self.filepath = filepath
+        self._file = open(filepath, 'ab' if append else 'wb', buffering=BUFFER_SIZE)
+        self.count = 0
+
+    def write(self, paper: Dict[str, Any]):
+        """写入一篇论文"""
+        self._file.write(_dumps_json(paper) + b'\n')
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_jsonl_report(filepath: str) -> Iterator[Dict[str, Any]]:
+    """逐篇读取JSONL报告
+
+    Args:
+        filepath: 文件路径
+
+    Yields:
+        论文字典
+    """
+    with open(filepath, 'rb', buffering=BUFFER_SIZE) as f:
+        for line in f:
+            if line.strip():
+                yield _loads_json(line)
+
+
+class BinaryReportWriter:
+    """二进制报告写入器
+
+    文件结构：文件头（魔数、版本号、编码）+ 元数据记录 + 每篇论文一条记录，
+    每条记录前有4字节小端长度。
+    """
+
+    def __init__(self, filepath: str, metadata: Optional[Dict[str, Any]] = None):
+        """创建报告文件并写入元数据
+
+        Args:
+            filepath: 文件路径
+            metadata: 报告元数据（生成时间、报告日期等）
+        """
+        self.filepath = filepath
+        self.codec = CODEC_MSGPACK if msgpack is not None else CODEC_JSON
+        if self.codec == CODEC_MSGPACK:
+            self._packer = msgpack.Packer(use_bin_type=True)
+            self._encode = self._packer.pack
+        else:
+            self._encode = _dumps_json
+
+        self._file = open(filepath, 'wb', buffering=BUFFER_SIZE)
+        self._file.write(_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, self.codec))
+        self._write_record(metadata or {})
+        self.count = 0
+
+    def _write_record(self, obj):
+        data = self._encode(obj)
+        self._file.write(_LENGTH.pack(len(data)))
+        self._file.write(data)
+
+    def write(self, paper: Dict[str, Any]):
+        """写入一篇论文"""
+        self._write_record(paper)
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class BinaryReportReader:
+    """二进制报告读取器，按需逐条解码"""
+
+    def __init__(self, filepath: str):
+        """打开报告文件并读取元数据
+
+        Args:
+            filepath: 文件路径
+
+        Raises:
+            ValueError: 文件格式不正确
+            ImportError: 文件使用msgpack编码但未安装msgpack
+        """
+        self.filepath = filepath
+        self._file = open(filepath, 'rb', buffering=BUFFER_SIZE)
+
+        header = self._file.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            self._file.close()
+            raise ValueError(f"不是有效的二进制报告: {filepath}")
+        magic, version, codec = _HEADER.unpack(header)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            self._file.close()
+            raise ValueError(f"不是有效的二进制报告: {filepath}")
+
+        if codec == CODEC_MSGPACK:
+            if msgpack is None:
+                self._file.close()
+                raise ImportError("读取该报告需要安装msgpack")
+            self._decode = lambda data: msgpack.unpackb(data, raw=False)
+        else:
+            self._decode = _loads_json
+
+        self.metadata = self._decode(self._read_record())
+        self._papers_offset = self._file.tell()
+
+    def _read_record(self):
+        """读取下一条记录的原始字节，到达文件末尾时返回None"""
+        prefix = self._file.read(_LENGTH.size)
+        if len(prefix) < _LENGTH.size:
+            return None
+        (length,) = _LENGTH.unpack(prefix)
+        return self._file.read(length)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """从第一篇论文开始逐篇解码"""
+        self._file.seek(self._papers_offset)
+        while True:
+            data = self._read_record()
+            if data is None:
+                return
+            yield self._decode(data)
+
+    def get(self, index: int) -> Optional[Dict[str, Any]]:
+        """读取第index篇论文，之前的记录只读取长度而不解码
+
+        Args:
+            index: 论文序号，从0开始
+
+        Returns:
+            论文字典，超出范围时为None
+        """
+        self._file.seek(self._papers_offset)
+        for _ in range(index):
+            prefix = self._file.read(_LENGTH.size)
+            if len(prefix) < _LENGTH.size:
+                return None
+            self._file.seek(_LENGTH.unpack(prefix)[0], 1)
+        data = self._read_record()
+        return None if data is None else self._decode(data)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重试与熔断模块
+
+提供指数退避（带随机抖动）的重试策略，以及在下游持续失败时暂停调用的熔断器。
+"""
+
+import time
+import random
+import logging
+import threading
+from typing import Any, Dict
+
+class TransientError(Exception):
+    """可重试的临时错误（网络错误、限流、服务端错误、响应无法解析等）"""
+
+
+class ResponseParseError(TransientError):
+    """模型响应无法解析（可重试，但服务本身正常，不计入熔断）"""
+
+
+class PermanentError(Exception):
+    """不可重试的错误（鉴权失败、参数错误等）"""
+
+
+class RetryPolicy:
+    """指数退避重试策略"""
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 30.0):
+        """初始化重试策略
+
+        Args:
+            max_retries: 最大重试次数（不含首次调用）
+            base_delay: 首次重试的基础等待时间（秒）
+            max_delay: 单次等待时间上限（秒）
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """计算第attempt次重试前的等待时间（全抖动）
+
+        Args:
+            attempt: 重试序号，从0开始
+
+        Returns:
+            等待秒数
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """熔断器
+
+    连续失败次数达到阈值后打开，拒绝所有调用；经过冷却时间后进入半开状态，
+    放行一次探测调用，成功则关闭，失败则重新打开。
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        """初始化熔断器
+
+        Args:
+            failure_threshold: 触发熔断的连续失败次数
+            reset_timeout: 熔断后的冷却时间（秒）
+        """
+        self.logger = logging.getLogger(__name__)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.open_count = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now):
+        if self._state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def remaining_cooldown(self) -> float:
+        """获取熔断剩余冷却时间（秒）"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        """检查是否允许发起调用"""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        """记录一次成功调用"""
+        with self._lock:
+            if self._state != self.CLOSED:
+                self.logger.info("熔断器关闭，恢复调用")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        """记录一次失败调用"""
+        with self._lock:
+            self._failures += 1
+            half_open = self._probing
+            self._probing = False
+            if half_open or (self._state == self.CLOSED and self._failures >= self.failure_threshold):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self.open_count += 1
+                self.logger.warning(f"连续失败 {self._failures} 次，熔断器打开 {self.reset_timeout}s")
+
+    def get_info(self) -> Dict[str, Any]:
+        """获取熔断器信息"""
+        with self._lock:
+            return {
+                'state': self._current_state(time.monotonic()),
+                'consecutive_failures': self._failures,
+                'open_count': self.open_count
+            }
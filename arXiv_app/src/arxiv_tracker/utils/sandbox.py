@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+沙箱工作进程池模块
+
+在受监督的子进程中执行任务，对每个任务施加超时和内存（RSS）上限。
+超时、超内存或崩溃的工作进程会被终止并自动重启，不会阻塞整个批次。
+"""
+
+import time
+import logging
+import multiprocessing
+from multiprocessing.connection import wait
+from typing import Any, Callable, Iterable, Iterator, Tuple
+
+import psutil
+
+# 任务状态
+STATUS_OK = 'ok'
+STATUS_ERROR = 'error'
+STATUS_TIMEOUT = 'timeout'
+STATUS_MEMORY = 'memory'
+STATUS_CRASHED = 'crashed'
+
+# 会导致文件被隔离的状态
+FATAL_STATUSES = (STATUS_TIMEOUT, STATUS_MEMORY, STATUS_CRASHED)
+
+
+def _worker_loop(func, conn):
+    """工作进程主循环
+
+    Args:
+        func: 任务函数
+        conn: 与监督进程通信的管道
+    """
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        if message is None:
+            break
+
+        key, args = message
+        try:
+            conn.send((key, STATUS_OK, func(*args)))
+        except Exception as e:
+            conn.send((key, STATUS_ERROR, f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    """单个受监督的工作进程"""
+
+    def __init__(self, func, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_loop,
+            args=(func, child_conn),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+        self.key = None
+        self.started_at = None
+
+    @property
+    def busy(self):
+        return self.key is not None
+
+    def submit(self, key, args):
+        self.key = key
+        self.started_at = time.monotonic()
+        self.conn.send((key, args))
+
+    def release(self):
+        key = self.key
+        self.key = None
+        self.started_at = None
+        return key
+
+    def rss_mb(self):
+        try:
+            return psutil.Process(self.process.pid).memory_info().rss / (1024 * 1024)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return 0.0
+
+    def kill(self):
+        try:
+            self.process.kill()
+            self.process.join(timeout=5)
+        except Exception:
+            pass
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=5)
+        self.conn.close()
+
+
+class SandboxedPool:
+    """受监督的沙箱工作进程池"""
+
+    def __init__(self, func: Callable, max_workers: int = 4, timeout: float = 120,
+                 max_rss_mb: float = 1024, poll_interval: float = 0.2):
+        """初始化工作进程池
+
+        Args:
+            func: 任务函数，必须可被pickle（模块级函数）
+            max_workers: 工作进程数量
+            timeout: 单个任务的墙钟超时时间（秒）
+            max_rss_mb: 单个工作进程的常驻内存上限（MB），0表示不限制
+            poll_interval: 监督轮询间隔（秒）
+        """
+        self.logger = logging.getLogger(__name__)
+        self.func = func
+        self.max_workers = max(1, int(max_workers))
+        self.timeout = timeout
+        self.max_rss_mb = max_rss_mb
+        self.poll_interval = poll_interval
+
+        self._context = multiprocessing.get_context()
+        self._workers = []
+        self.restarts = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _spawn(self):
+        return _Worker(self.func, self._context)
+
+    def _restart(self, worker):
+        """终止并替换指定的工作进程"""
+        worker.kill()
+        index = self._workers.index(worker)
+        self._workers[index] = self._spawn()
+        self.restarts += 1
+
+    def imap(self, tasks: Iterable[Tuple[Any, tuple]]) -> Iterator[Tuple[Any, str, Any]]:
+        """执行任务并按完成顺序返回结果
+
+        任务按需从可迭代对象中拉取，可以直接传入生成器，无需预先展开。
+
+        Args:
+            tasks: (key, args) 元组的可迭代对象
+
+        Yields:
+            (key, status, result) 元组；status为ok时result为任务返回值，
+            否则为错误描述
+        """
+        pending = iter(tasks)
+        exhausted = False
+
+        while True:
+            # 为空闲进程分配任务，必要时启动新进程
+            while not exhausted:
+                idle = next((w for w in self._workers if not w.busy), None)
+                if idle is None and len(self._workers) >= self.max_workers:
+                    break
+                try:
+                    key, args = next(pending)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if idle is None:
+                    idle = self._spawn()
+                    self._workers.append(idle)
+                idle.submit(key, args)
+
+            busy = [w for w in self._workers if w.busy]
+            if not busy:
+                break
+
+            ready = wait([w.conn for w in busy], timeout=self.poll_interval)
+            now = time.monotonic()
+
+            for worker in busy:
+                if worker.conn in ready:
+                    try:
+                        key, status, result = worker.conn.recv()
+                        worker.release()
+                    except (EOFError, OSError):
+                        key = worker.release()
+                        worker.process.join(timeout=1)
+                        exitcode = worker.process.exitcode
+                        self.logger.warning(f"工作进程异常退出 (exitcode={exitcode}): {key}")
+                        self._restart(worker)
+                        yield key, STATUS_CRASHED, f"worker exited with code {exitcode}"
+                        continue
+                    yield key, status, result
+
+                elif now - worker.started_at > self.timeout:
+                    key = worker.release()
+                    self.logger.warning(f"任务超时 ({self.timeout}s)，终止工作进程: {key}")
+                    self._restart(worker)
+                    yield key, STATUS_TIMEOUT, f"timed out after {self.timeout}s"
+
+                elif self.max_rss_mb and worker.rss_mb() > self.max_rss_mb:
+                    key = worker.release()
+                    self.logger.warning(f"任务内存超限 ({self.max_rss_mb}MB)，终止工作进程: {key}")
+                    self._restart(worker)
+                    yield key, STATUS_MEMORY, f"exceeded {self.max_rss_mb}MB RSS"
+
+    def close(self):
+        """关闭所有工作进程"""
+        for worker in self._workers:
+            worker.stop()
+        self._workers = []
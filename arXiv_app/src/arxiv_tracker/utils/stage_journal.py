@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+论文处理阶段日志模块
+
+按运行日期记录每篇论文完成了哪些处理阶段（爬取、下载、提取、分析、报告），
+同时保存论文完成最近一个阶段后的数据。中断后使用--resume重新运行时，
+只处理尚未完成相应阶段的论文。
+
+记录先在内存中累积，达到批量大小或调用flush()时在一个事务中提交，
+逐篇记录的开销可以忽略。提交失败（数据库被锁定、磁盘已满等）时记录保留在内存中，
+下次提交时重试。
+"""
+
+import os
+import json
+import time
+import atexit
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+# 处理阶段（按流水线顺序）
+STAGES = ('crawled', 'downloaded', 'extracted', 'analyzed', 'reported')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    run TEXT NOT NULL,
+    arxiv_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (run, arxiv_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stages (
+    run TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    arxiv_id TEXT NOT NULL,
+    completed_at REAL NOT NULL,
+    PRIMARY KEY (run, stage, arxiv_id)
+) WITHOUT ROWID;
+"""
+
+class StageJournal:
+    """论文处理阶段日志"""
+
+    def __init__(self, db_file=None, batch_size=50):
+        """初始化阶段日志
+
+        Args:
+            db_file: 数据库文件路径
+            batch_size: 累积多少条记录后提交一次
+        """
+        self.logger = logging.getLogger(__name__)
+        self.batch_size = max(1, batch_size)
+
+        if db_file:
+            self.db_file = db_file
+        else:
+            # 默认数据库文件路径
+            self.db_file = os.path.join(
+                os.path.dirname(__file__),
+                '..',
+                'data',
+                'cache',
+                'journal.db'
+            )
+
+        # 确保目录存在
+        os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._papers = {}
+        self._stages = []
+
+        self.conn = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+        # 进程退出前提交未写入的记录
+        atexit.register(self.flush)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def record(self, run: str, papers: Iterable[Dict], stage: str):
+        """记录论文完成了某个阶段，并保存论文当前的数据
+
+        Args:
+            run: 运行日期 (YYYYMMDD)
+            papers: 论文列表
+            stage: 阶段名称，见STAGES
+        """
+        if stage not in STAGES:
+            raise ValueError(f"未知的处理阶段: {stage}")
+
+        now = time.time()
+        with self._lock:
+            for paper in papers:
+                arxiv_id = paper.get('arxiv_id')
+                if not arxiv_id:
+                    continue
+                self._papers[(run, arxiv_id)] = (json.dumps(paper, ensure_ascii=False, default=str), now)
+                self._stages.append((run, stage, arxiv_id, now))
+            if len(self._stages) >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> bool:
+        """提交累积的记录
+
+        Returns:
+            是否全部提交成功；失败时记录放回内存，下次提交时重试
+        """
+        with self._lock:
+            if not self._stages and not self._papers:
+                return True
+            papers, self._papers = self._papers, {}
+            stages, self._stages = self._stages, []
+
+            try:
+                with self.conn:
+                    # 新论文排在该次运行已有论文之后
+                    positions = {}
+                    for run, arxiv_id in papers:
+                        if run not in positions:
+                            positions[run] = self.conn.execute(
+                                "SELECT COALESCE(MAX(position) + 1, 0) FROM papers WHERE run = ?", (run,)
+                            ).fetchone()[0]
+                    rows = []
+                    for (run, arxiv_id), (data, updated_at) in papers.items():
+                        rows.append((run, arxiv_id, positions[run], data, updated_at))
+                        positions[run] += 1
+                    self.conn.executemany(
+                        "INSERT INTO papers (run, arxiv_id, position, data, updated_at) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT (run, arxiv_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                        rows
+                    )
+                    self.conn.executemany(
+                        "INSERT OR REPLACE INTO stages (run, stage, arxiv_id, completed_at) VALUES (?, ?, ?, ?)",
+                        stages
+                    )
+            except sqlite3.Error as e:
+                # 放回未提交的记录，提交期间持有锁，没有更新的记录需要合并
+                self._papers = papers
+                self._stages = stages
+                self.logger.error(f"保存阶段日志失败，{len(stages)} 条记录将在下次提交时重试: {e}")
+                return False
+            return True
+
+    def load(self, run: str) -> List[Dict]:
+        """读取某次运行记录的论文（按首次记录的顺序）
+
+        Args:
+            run: 运行日期 (YYYYMMDD)
+
+        Returns:
+            论文列表，每篇论文为最近一次记录时的数据
+        """
+        self.flush()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT data FROM papers WHERE run = ? ORDER BY position", (run,)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def completed(self, run: str, stage: str) -> Set[str]:
+        """获取完成了某个阶段的论文ID集合"""
+        self.flush()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT arxiv_id FROM stages WHERE run = ? AND stage = ?", (run, stage)
+            ).fetchall()
+        return {arxiv_id for (arxiv_id,) in rows}
+
+    def pending(self, run: str, papers: List[Dict], stage: str) -> List[Dict]:
+        """筛选尚未完成某个阶段的论文
+
+        Args:
+            run: 运行日期 (YYYYMMDD)
+            papers: 论文列表
+            stage: 阶段名称
+
+        Returns:
+            未完成该阶段的论文列表（保持原顺序）
+        """
+        done = self.completed(run, stage)
+        return [paper for paper in papers if paper.get('arxiv_id') not in done]
+
+    def get_summary(self, run: str) -> Dict[str, int]:
+        """获取某次运行每个阶段完成的论文数"""
+        self.flush()
+        with self._lock:
+            rows = dict(self.conn.execute(
+                "SELECT stage, COUNT(*) FROM stages WHERE run = ? GROUP BY stage", (run,)
+            ).fetchall())
+            total = self.conn.execute("SELECT COUNT(*) FROM papers WHERE run = ?", (run,)).fetchone()[0]
+        summary = {'papers': total}
+        summary.update((stage, rows.get(stage, 0)) for stage in STAGES)
+        return summary
+
+    def runs(self) -> List[str]:
+        """获取有记录的运行日期（升序）"""
+        self.flush()
+        with self._lock:
+            return [run for (run,) in self.conn.execute("SELECT DISTINCT run FROM papers ORDER BY run")]
+
+    def reset(self, run: Optional[str] = None):
+        """清空阶段日志
+
+        Args:
+            run: 运行日期，默认清空所有运行
+        """
+        with self._lock:
+            self._papers = {}
+            self._stages = []
+            with self.conn:
+                if run is None:
+                    self.conn.execute("DELETE FROM stages")
+                    self.conn.execute("DELETE FROM papers")
+                else:
+                    self.conn.execute("DELETE FROM stages WHERE run = ?", (run,))
+                    self.conn.execute("DELETE FROM papers WHERE run = ?", (run,))
+
+    def reset_stage(self, stage: str, run: Optional[str] = None):
+        """重置某个阶段及其之后的所有阶段，下次续跑时重新处理
+
+        Args:
+            stage: 阶段名称
+            run: 运行日期，默认重置所有运行
+        """
+        if stage not in STAGES:
+            raise ValueError(f"未知的处理阶段: {stage}")
+
+        stages = STAGES[STAGES.index(stage):]
+        placeholders = ', '.join('?' * len(stages))
+        self.flush()
+        with self._lock, self.conn:
+            if run is None:
+                self.conn.execute(f"DELETE FROM stages WHERE stage IN ({placeholders})", stages)
+            else:
+                self.conn.execute(
+                    f"DELETE FROM stages WHERE run = ? AND stage IN ({placeholders})", (run, *stages)
+                )
+
+    def close(self):
+        """提交未写入的记录并关闭数据库"""
+        if not self.flush():
+            self.logger.error(
+                f"关闭阶段日志时仍有 {len(self._stages)} 条记录未能写入，"
+                f"使用--resume续跑时这些论文会被重新处理"
+            )
+        atexit.unregister(self.flush)
+        with self._lock:
+            self.conn.close()
+
+
+def get_stage_journal():
+    """获取阶段日志实例
+
+    Returns:
+        阶段日志实例
+    """
+    return StageJournal()
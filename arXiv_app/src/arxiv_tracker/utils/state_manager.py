@@ -2,23 +2,44 @@
 # -*- coding: utf-8 -*-
 """
 状态管理模块
+
+状态文件可以被多个进程共享。每次修改都记录为一个操作，先应用到内存中的状态，
+在save_interval秒内的修改合并为一次写入：写入时对状态文件加锁，读取文件中的
+最新状态，重放本进程尚未写入的操作，再原子替换文件，不会覆盖其他进程的修改。
+读取时只检查文件是否被其他进程替换过，不需要加锁。
 """
 
 import os
-import json
+import atexit
 import logging
+import threading
+import contextlib
 from datetime import datetime
 
+from .atomic_file import atomic_write_json, file_lock, read_json
+
+def _default_state():
+    """默认状态"""
+    return {
+        'last_run': None,
+        'completed_steps': [],
+        'current_step': None,
+        'papers': [],
+        'statistics': {}
+    }
+
 class StateManager:
     """状态管理器"""
     
-    def __init__(self, state_file=None):
+    def __init__(self, state_file=None, save_interval=1.0):
         """初始化状态管理器
         
         Args:
             state_file: 状态文件路径
+            save_interval: 修改后最多延迟多少秒写入文件，0表示每次修改立即写入
         """
         self.logger = logging.getLogger(__name__)
+        self.save_interval = save_interval
         
         if state_file:
             self.state_file = state_file
@@ -35,35 +56,110 @@ class StateManager:
         # 确保目录存在
         os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
         
+        self._lock = threading.RLock()
+        # 尚未写入文件的操作
+        self._ops = []
+        self._timer = None
+        self._batch_depth = 0
+        # 最近一次读取或写入时状态文件的 (inode, 修改时间, 大小)
+        self._signature = None
+        
         # 加载状态
         self.state = self._load_state()
+        
+        # 进程退出前写入未保存的修改
+        atexit.register(self.save)
+    
+    def _stat(self):
+        try:
+            st = os.stat(self.state_file)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
     
     def _load_state(self):
         """加载状态"""
+        self._signature = self._stat()
         try:
-            if os.path.exists(self.state_file):
-                with open(self.state_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            state = read_json(self.state_file)
+            if state is not None:
+                return state
         except Exception as e:
             self.logger.error(f"加载状态失败: {e}")
         
         # 返回默认状态
-        return {
-            'last_run': None,
-            'completed_steps': [],
-            'current_step': None,
-            'papers': [],
-            'statistics': {}
-        }
+        return _default_state()
     
-    def save(self):
-        """保存状态"""
+    def _refresh(self):
+        """状态文件被其他进程替换后重新加载，并重放本进程未写入的操作"""
+        if self._stat() == self._signature:
+            return
+        with self._lock:
+            state = self._load_state()
+            for op in self._ops:
+                op(state)
+            self.state = state
+    
+    def _apply(self, op):
+        """应用一个修改操作，并安排写入"""
+        with self._lock:
+            op(self.state)
+            self._ops.append(op)
+            if self._batch_depth:
+                return
+            if not self.save_interval:
+                self.save()
+            elif self._timer is None or not self._timer.is_alive():
+                # 子进程不会继承父进程的定时器线程，此时重新创建
+                self._timer = threading.Timer(self.save_interval, self.save)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    @contextlib.contextmanager
+    def batch(self):
+        """合并with块内的所有修改，退出时写入一次"""
+        with self._lock:
+            self._batch_depth += 1
         try:
-            with open(self.state_file, 'w', encoding='utf-8') as f:
-                json.dump(self.state, f, ensure_ascii=False, indent=2)
-            self.logger.info(f"状态已保存到: {self.state_file}")
-        except Exception as e:
-            self.logger.error(f"保存状态失败: {e}")
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.save()
+    
+    def save(self):
+        """将未写入的修改合并到状态文件"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._ops:
+                return
+            
+            try:
+                with file_lock(self.state_file):
+                    state = self._load_state()
+                    for op in self._ops:
+                        op(state)
+                    atomic_write_json(state, self.state_file, indent=2)
+                    self._signature = self._stat()
+                self.state = state
+                self._ops = []
+                self.logger.info(f"状态已保存到: {self.state_file}")
+            except Exception as e:
+                self.logger.error(f"保存状态失败: {e}")
+    
+    def close(self):
+        """写入未保存的修改"""
+        self.save()
+        atexit.unregister(self.save)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def get(self, key, default=None):
         """获取状态值
@@ -75,6 +171,7 @@ class StateManager:
         Returns:
             状态值
         """
+        self._refresh()
         return self.state.get(key, default)
     
     def set(self, key, value):
@@ -84,8 +181,9 @@ class StateManager:
             key: 键
             value: 值
         """
-        self.state[key] = value
-        self.save()
+        def op(state):
+            state[key] = value
+        self._apply(op)
     
     def mark_step_completed(self, step):
         """标记步骤完成
@@ -93,11 +191,17 @@ class StateManager:
         Args:
             step: 步骤名称
         """
-        if step not in self.state.get('completed_steps', []):
-            self.state.setdefault('completed_steps', []).append(step)
-            self.state['current_step'] = None
-            self.state['last_run'] = datetime.now().isoformat()
-            self.save()
+        if self.is_step_completed(step):
+            return
+        
+        last_run = datetime.now().isoformat()
+        def op(state):
+            completed_steps = state.setdefault('completed_steps', [])
+            if step not in completed_steps:
+                completed_steps.append(step)
+                state['current_step'] = None
+                state['last_run'] = last_run
+        self._apply(op)
     
     def set_current_step(self, step):
         """设置当前步骤
@@ -105,19 +209,16 @@ class StateManager:
         Args:
             step: 步骤名称
         """
-        self.state['current_step'] = step
-        self.save()
+        def op(state):
+            state['current_step'] = step
+        self._apply(op)
     
     def reset(self):
         """重置状态"""
-        self.state = {
-            'last_run': None,
-            'completed_steps': [],
-            'current_step': None,
-            'papers': [],
-            'statistics': {}
-        }
-        self.save()
+        def op(state):
+            state.clear()
+            state.update(_default_state())
+        self._apply(op)
     
     def reset_step(self, step):
         """重置指定步骤
@@ -125,9 +226,14 @@ class StateManager:
         Args:
             step: 步骤名称
         """
-        if step in self.state.get('completed_steps', []):
-            self.state['completed_steps'].remove(step)
-            self.save()
+        if not self.is_step_completed(step):
+            return
+        
+        def op(state):
+            completed_steps = state.get('completed_steps', [])
+            if step in completed_steps:
+                completed_steps.remove(step)
+        self._apply(op)
     
     def is_step_completed(self, step):
         """检查步骤是否完成
@@ -138,6 +244,7 @@ class StateManager:
         Returns:
             是否完成
         """
+        self._refresh()
         return step in self.state.get('completed_steps', [])
     
     def get_statistics(self):
@@ -146,6 +253,7 @@ class StateManager:
         Returns:
             统计信息
         """
+        self._refresh()
         return self.state.get('statistics', {})
     
     def update_statistics(self, stats):
@@ -154,8 +262,10 @@ class StateManager:
         Args:
             stats: 统计信息字典
         """
-        self.state.setdefault('statistics', {}).update(stats)
-        self.save()
+        stats = dict(stats)
+        def op(state):
+            state.setdefault('statistics', {}).update(stats)
+        self._apply(op)
 
 
 def get_state_manager():
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全文存储模块
+
+将论文每页的全文以压缩块的形式追加写入段文件（segment），并维护偏移索引。
+读取时通过内存映射（mmap）按页随机访问，无需加载整个存储。
+
+目录结构:
+    segment_00000.dat   追加写入的页数据（每页单独zlib压缩）
+    index.jsonl         追加写入的索引，每行记录一篇论文各页的(偏移, 长度)
+
+多个提取进程可以同时写入同一个存储，追加和重写索引时对索引文件加锁。
+"""
+
+import os
+import json
+import mmap
+import zlib
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from .atomic_file import atomic_write, file_lock
+
+INDEX_FILENAME = 'index.jsonl'
+SEGMENT_TEMPLATE = 'segment_{:05d}.dat'
+
+class TextStore:
+    """基于段文件和偏移索引的全文存储"""
+
+    def __init__(self, store_dir=None, segment_size=256 * 1024 * 1024, compress_level=6):
+        """初始化全文存储
+
+        Args:
+            store_dir: 存储目录
+            segment_size: 单个段文件的最大字节数，超过后滚动到新段
+            compress_level: zlib压缩级别
+        """
+        self.logger = logging.getLogger(__name__)
+        self.segment_size = segment_size
+        self.compress_level = compress_level
+
+        if store_dir:
+            self.store_dir = store_dir
+        else:
+            # 默认存储目录
+            self.store_dir = os.path.join(
+                os.path.dirname(__file__),
+                '..',
+                'data',
+                'fulltext'
+            )
+
+        # 确保目录存在
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        self.index_file = os.path.join(self.store_dir, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._maps = {}
+
+        # 加载索引
+        self.index = self._load_index()
+        self.segment = self._current_segment()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __contains__(self, arxiv_id):
+        return arxiv_id in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def _segment_path(self, segment):
+        return os.path.join(self.store_dir, SEGMENT_TEMPLATE.format(segment))
+
+    def _load_index(self):
+        """加载索引，后写入的条目覆盖先写入的条目"""
+        index = {}
+        if not os.path.exists(self.index_file):
+            return index
+
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 进程中断时可能留下不完整的最后一行
+                    self.logger.warning("跳过损坏的全文索引行")
+                    continue
+                index[entry['id']] = (entry['seg'], entry['pages'])
+
+        return index
+
+    def _current_segment(self):
+        """获取当前可追加写入的段编号"""
+        segment = max((seg for seg, _ in self.index.values()), default=0)
+        path = self._segment_path(segment)
+        if os.path.exists(path) and os.path.getsize(path) >= self.segment_size:
+            segment += 1
+        return segment
+
+    def put(self, arxiv_id: str, pages: List[str]):
+        """写入一篇论文的全文
+
+        Args:
+            arxiv_id: 论文ID
+            pages: 每页文本组成的列表
+        """
+        blocks = [zlib.compress(page.encode('utf-8'), self.compress_level) for page in pages]
+
+        with self._lock, file_lock(self.index_file):
+            # 其他进程可能已经写满当前段
+            path = self._segment_path(self.segment)
+            while os.path.exists(path) and os.path.getsize(path) >= self.segment_size:
+                self.segment += 1
+                path = self._segment_path(self.segment)
+
+            # 先写数据再写索引，中断时索引不会指向不完整的数据
+            entries = []
+            with open(path, 'ab') as f:
+                offset = f.tell()
+                for block in blocks:
+                    f.write(block)
+                    entries.append([offset, len(block)])
+                    offset += len(block)
+
+            record = json.dumps({'id': arxiv_id, 'seg': self.segment, 'pages': entries}) + '\n'
+            with open(self.index_file, 'a+b') as f:
+                # 进程中断时最后一行可能不完整，新记录从新的一行开始，不与其拼接
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        record = '\n' + record
+                f.write(record.encode('utf-8'))
+
+            self.index[arxiv_id] = (self.segment, entries)
+
+    def _mapping(self, segment, end):
+        """获取覆盖到指定位置的段文件内存映射"""
+        mapping = self._maps.get(segment)
+        if mapping is None or len(mapping) < end:
+            if mapping is not None:
+                mapping.close()
+            with open(self._segment_path(segment), 'rb') as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mapping
+        return mapping
+
+    def page_count(self, arxiv_id: str) -> int:
+        """获取论文的页数
+
+        Args:
+            arxiv_id: 论文ID
+
+        Returns:
+            页数，不存在时为0
+        """
+        entry = self.index.get(arxiv_id)
+        return len(entry[1]) if entry else 0
+
+    def get_page(self, arxiv_id: str, page_num: int) -> Optional[str]:
+        """读取论文指定页的文本
+
+        Args:
+            arxiv_id: 论文ID
+            page_num: 页码（从0开始）
+
+        Returns:
+            页面文本，不存在时为None
+        """
+        entry = self.index.get(arxiv_id)
+        if not entry:
+            return None
+
+        segment, pages = entry
+        if not 0 <= page_num < len(pages):
+            return None
+
+        offset, length = pages[page_num]
+        with self._lock:
+            mapping = self._mapping(segment, offset + length)
+            block = mapping[offset:offset + length]
+        return zlib.decompress(block).decode('utf-8')
+
+    def get_pages(self, arxiv_id: str) -> List[str]:
+        """读取论文全部页面的文本
+
+        Args:
+            arxiv_id: 论文ID
+
+        Returns:
+            每页文本组成的列表
+        """
+        return [self.get_page(arxiv_id, i) for i in range(self.page_count(arxiv_id))]
+
+    def get_text(self, arxiv_id: str) -> Optional[str]:
+        """读取论文全文
+
+        Args:
+            arxiv_id: 论文ID
+
+        Returns:
+            全文文本，不存在时为None
+        """
+        if arxiv_id not in self.index:
+            return None
+        return "\n".join(self.get_pages(arxiv_id))
+
+    def compact(self):
+        """重写索引文件，去除被覆盖的旧条目和损坏的行"""
+        with self._lock, file_lock(self.index_file):
+            # 重新加载索引，保留其他进程追加的条目
+            self.index = self._load_index()
+            with atomic_write(self.index_file) as f:
+                for arxiv_id, (segment, pages) in self.index.items():
+                    f.write(json.dumps({'id': arxiv_id, 'seg': segment, 'pages': pages}) + '\n')
+
+    def get_store_info(self) -> Dict[str, int]:
+        """获取存储信息
+
+        Returns:
+            存储信息
+        """
+        segments = {seg for seg, _ in self.index.values()}
+        size = sum(
+            os.path.getsize(self._segment_path(seg))
+            for seg in segments
+            if os.path.exists(self._segment_path(seg))
+        )
+        return {
+            'papers': len(self.index),
+            'segments': len(segments),
+            'bytes': size
+        }
+
+    def close(self):
+        """关闭所有内存映射"""
+        with self._lock:
+            for mapping in self._maps.values():
+                mapping.close()
+            self._maps = {}
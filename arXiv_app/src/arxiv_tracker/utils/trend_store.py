@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨日趋势聚合模块
+
+每次生成报告后把当天的论文汇总为一个固定大小的日聚合（类别计数、评分分布、
+评分最高的K篇论文、高频作者），保存在同一个存储文件中。查询最近N天的趋势时
+只合并窗口内的日聚合，耗时只与窗口天数有关，不需要重新读取历史报告文件。
+
+同一天重复更新时替换当天的日聚合，不会重复计数。作者频次每天只保留出现次数
+最多的前 author_limit 位，跨日合并结果是近似值。
+"""
+
+import os
+import json
+import heapq
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from .atomic_file import atomic_write_json
+
+DATE_FORMAT = '%Y%m%d'
+
+# 评分分布的区间数：0-1, 1-2, ..., 9-10
+SCORE_BINS = 10
+
+
+def summarize_day(papers: Iterable[Dict], top_k: int = 20, author_limit: int = 200) -> Dict:
+    """将一天的论文汇总为日聚合
+
+    Args:
+        papers: 论文列表
+        top_k: 保留评分最高的论文数
+        author_limit: 保留的高频作者数
+
+    Returns:
+        日聚合字典
+    """
+    total = 0
+    scored = 0
+    score_sum = 0.0
+    histogram = [0] * SCORE_BINS
+    categories = Counter()
+    authors = Counter()
+    top = []
+
+    for index, paper in enumerate(papers):
+        total += 1
+        categories[paper.get('category') or 'unknown'] += 1
+        authors.update(paper.get('authors') or [])
+
+        score = paper.get('score')
+        if not score or not isinstance(score, (int, float)):
+            continue
+        scored += 1
+        score_sum += score
+        histogram[min(SCORE_BINS - 1, max(0, int(score)))] += 1
+
+        # 近似重复论文与代表论文评分相同，只让代表论文进入排行
+        if paper.get('duplicate_of'):
+            continue
+        entry = (score, -index, paper.get('arxiv_id', ''), paper.get('title', ''), paper.get('category', ''))
+        if len(top) < top_k:
+            heapq.heappush(top, entry)
+        else:
+            heapq.heappushpop(top, entry)
+
+    return {
+        'papers': total,
+        'scored': scored,
+        'score_sum': round(score_sum, 4),
+        'score_hist': histogram,
+        'categories': dict(categories),
+        'authors': dict(authors.most_common(author_limit)),
+        'top': [
+            {'score': score, 'arxiv_id': arxiv_id, 'title': title, 'category': category}
+            for score, _, arxiv_id, title, category in sorted(top, reverse=True)
+        ]
+    }
+
+
+class TrendStore:
+    """跨日趋势聚合存储"""
+
+    def __init__(self, store_file=None, top_k=20, author_limit=200, retention_days=400):
+        """加载趋势存储
+
+        Args:
+            store_file: 存储文件路径
+            top_k: 每天保留评分最高的论文数
+            author_limit: 每天保留的高频作者数
+            retention_days: 保留最近多少天的日聚合
+        """
+        self.logger = logging.getLogger(__name__)
+
+        if store_file:
+            self.store_file = store_file
+        else:
+            # 默认存储文件路径
+            self.store_file = os.path.join(
+                os.path.dirname(__file__),
+                '..',
+                'data',
+                'trends',
+                'trends.json'
+            )
+
+        # 确保目录存在
+        os.makedirs(os.path.dirname(self.store_file), exist_ok=True)
+
+        self.top_k = top_k
+        self.author_limit = author_limit
+        self.retention_days = retention_days
+
+        self.days = {}
+        if os.path.exists(self.store_file):
+            try:
+                with open(self.store_file, 'r', encoding='utf-8') as f:
+                    self.days = json.load(f).get('days', {})
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"加载趋势存储失败，将重新开始聚合: {e}")
+
+    def update(self, date: str, papers: Iterable[Dict], save: bool = True):
+        """写入（或替换）某一天的日聚合
+
+        Args:
+            date: 日期 (YYYYMMDD)
+            papers: 当天的论文列表
+            save: 是否立即保存存储文件
+        """
+        self.days[date] = summarize_day(papers, self.top_k, self.author_limit)
+
+        # 删除超出保留期的日聚合
+        if self.retention_days:
+            newest = datetime.strptime(max(self.days), DATE_FORMAT)
+            cutoff = (newest - timedelta(days=self.retention_days - 1)).strftime(DATE_FORMAT)
+            for day in [day for day in self.days if day < cutoff]:
+                del self.days[day]
+
+        if save:
+            self.save()
+
+    def save(self):
+        """保存存储文件"""
+        atomic_write_json({'days': self.days}, self.store_file, separators=(',', ':'))
+
+    def dates(self) -> List[str]:
+        """获取已聚合的日期（升序）"""
+        return sorted(self.days)
+
+    def query(self, days: int = 7, end: Optional[str] = None, limit: int = 10) -> Dict:
+        """合并最近days天的日聚合
+
+        Args:
+            days: 窗口天数
+            end: 窗口最后一天 (YYYYMMDD)，默认为最近一次聚合的日期
+            limit: 返回的论文和作者排行数量
+
+        Returns:
+            趋势字典
+        """
+        if days < 1:
+            raise ValueError(f"窗口天数必须大于等于1: {days}")
+
+        end = end or (max(self.days) if self.days else datetime.now().strftime(DATE_FORMAT))
+        end_date = datetime.strptime(end, DATE_FORMAT)
+        window = [(end_date - timedelta(days=offset)).strftime(DATE_FORMAT) for offset in range(days - 1, -1, -1)]
+
+        total = 0
+        scored = 0
+        score_sum = 0.0
+        histogram = [0] * SCORE_BINS
+        categories = Counter()
+        authors = Counter()
+        daily = []
+        top = []
+        for day in window:
+            bucket = self.days.get(day)
+            if bucket is None:
+                continue
+            total += bucket['papers']
+            scored += bucket['scored']
+            score_sum += bucket['score_sum']
+            histogram = [a + b for a, b in zip(histogram, bucket['score_hist'])]
+            categories.update(bucket['categories'])
+            authors.update(bucket['authors'])
+            top.extend(dict(entry, date=day) for entry in bucket['top'])
+            daily.append({
+                'date': day,
+                'papers': bucket['papers'],
+                'avg_score': round(bucket['score_sum'] / bucket['scored'], 2) if bucket['scored'] else 0
+            })
+
+        return {
+            'start': window[0],
+            'end': window[-1],
+            'days': days,
+            'active_days': len(daily),
+            'papers': total,
+            'scored': scored,
+            'avg_score': round(score_sum / scored, 2) if scored else 0,
+            'score_hist': histogram,
+            'daily': daily,
+            'categories': categories.most_common(),
+            'authors': authors.most_common(limit),
+            'top': heapq.nlargest(limit, top, key=lambda entry: entry['score'])
+        }
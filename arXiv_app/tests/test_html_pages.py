@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML报告转义测试
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from arxiv_tracker.reporter import ArxivReporter
+from arxiv_tracker.utils import html_pages
+
+PAPER = {
+    'arxiv_id': '2601.00001',
+    'title': 'Title <img src=x onerror=alert(1)>',
+    'authors': ['<b>Author</b>'],
+    'abstract': 'Abstract <script>alert(1)</script> [link](javascript:alert(1))',
+    'score': 8.0,
+    'overall_evaluation': '<iframe src="https://example.com"></iframe>'
+}
+
+def test_paper_html_is_rendered_as_text(tmp_path):
+    reporter = ArxivReporter({'report_storage': str(tmp_path)})
+    section = reporter._format_paper_html_section(PAPER)
+    filepath = str(tmp_path / html_pages.page_filename(1))
+    html_pages.render_page(filepath, 'report', 1, 1, [{'anchor': 'paper-1', 'markdown': f"### 1. {section}"}])
+
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    assert '&lt;script&gt;alert(1)&lt;/script&gt;' in content
+    for tag in ('<script>alert', '<img', '<b>', '<iframe', 'href="javascript:'):
+        assert tag not in content
+
+def test_markdown_report_is_not_escaped(tmp_path):
+    reporter = ArxivReporter({'report_storage': str(tmp_path)})
+    assert '<script>alert(1)</script>' in reporter._format_paper_section(PAPER)
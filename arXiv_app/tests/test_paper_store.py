@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+论文存储测试
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from arxiv_tracker.utils.paper_store import PaperStore
+
+PAPER = {
+    'arxiv_id': '2601.00001',
+    'title': 'Graph networks',
+    'abstract': 'Abstract',
+    'category': 'cs.LG'
+}
+
+def test_reanalysis_clears_failure_flag(tmp_path):
+    with PaperStore(str(tmp_path / 'papers.db')) as store:
+        store.upsert([dict(PAPER, analysis_failed=True)], '20260101')
+        assert store.get('2601.00001')['analysis_failed'] is True
+
+        # 重新分析成功后，分析器删除analysis_failed并写入评分
+        store.upsert([dict(PAPER, score=8.5, overall_evaluation='good')], '20260102')
+        paper = store.get('2601.00001')
+
+    assert 'analysis_failed' not in paper
+    assert paper['score'] == 8.5
+    assert paper['overall_evaluation'] == 'good'
+    # 日期保留首次写入的值
+    assert paper['date'] == '20260101'
+
+def test_rerun_replaces_score_and_analysis(tmp_path):
+    with PaperStore(str(tmp_path / 'papers.db')) as store:
+        store.upsert([dict(PAPER, score=8.5, overall_evaluation='good')], '20260101')
+        store.upsert([dict(PAPER, analysis_skipped=True)], '20260101')
+        paper = store.get('2601.00001')
+        assert store.count(min_score=0) == 0
+
+    assert paper['analysis_skipped'] is True
+    assert 'score' not in paper
+    assert 'overall_evaluation' not in paper